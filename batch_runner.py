@@ -0,0 +1,253 @@
+# batch_runner.py
+"""
+Unbeaufsichtigter Batchbetrieb: liest ein Manifest mit Box-Plätzen, Kandidaten-Passwörtern und Ziel-Firmware,
+arbeitet alle Boxen ohne Rückfragen ab und schreibt eine Ergebnisdatei (CSV oder JSON).
+
+Manifest als JSON:
+    {
+      "passwoerter": ["standard-pw"],            # Vorgabe für alle Boxen
+      "ziel_firmware": null,                     # null = Ziel aus der Firmware-Zuordnung
+      "max_parallel": 4,
+      "politik": {"max_versuche": 2, "optionale_schritte": ["wlan_antennen"], "box_wiederholungen": 1},
+      "boxen": [
+        {"slot": "R1-01", "url": "http://192.168.178.1", "passwoerter": ["pw1", "pw2"], "ziel_firmware": "07.59"},
+        {"slot": "R1-02", "url": "http://192.168.179.1"}
+      ]
+    }
+oder als CSV mit den Spalten slot,url,passwoerter,ziel_firmware (mehrere Passwörter durch "|" getrennt).
+Eine CSV-Datei kann selbst keine Politik setzen; dafür wird eine optionale Datei "<name>.politik.json"
+neben dem Manifest gelesen (z.B. rack.csv → rack.politik.json), Inhalt wie "politik" oben.
+
+Versionen müssen als Text angegeben werden ("07.50", nicht 7.5 – als Zahl wären 07.50 und 07.05 nicht
+unterscheidbar). Unbekannte Politik-Schlüssel und Schritt-ids werden beim Laden abgelehnt.
+"""
+from datetime import datetime
+from pathlib import Path
+import csv
+import json
+import os
+import time
+
+from firmware_planner import FritzOSVersion
+from multi_box_runner import MultiBoxRunner
+from workflow_orchestrator import WORKFLOW_SCHRITT_IDS
+
+STANDARD_POLITIK = {
+    "max_versuche": 2,  # Versuche pro Schritt
+    "optionale_schritte": [],  # Schritt-ids, deren Fehlschlag die Box nicht abbricht
+    "box_wiederholungen": 1,  # zusätzliche Durchläufe einer fehlgeschlagenen Box (setzen am Checkpoint auf)
+}
+# Untergrenzen der ganzzahligen Politik-Werte
+POLITIK_MINIMUM = {"max_versuche": 1, "box_wiederholungen": 0}
+ERGEBNIS_FELDER = ["slot", "url", "ergebnis", "durchlaeufe", "fehler_schritt", "fehler_klasse", "serial",
+                   "box_model", "os_version", "start", "ende", "dauer_s"]
+
+
+def _text(wert, feld: str, ort: str) -> str:
+    """Text-Wert eines Manifests (leer bei fehlendem Wert); ganze Zahlen (z.B. Slot 12) werden übernommen."""
+    if wert is None:
+        return ""
+    if isinstance(wert, bool) or not isinstance(wert, (str, int)):
+        raise ValueError(f"{ort}: '{feld}' muss Text sein, nicht {wert!r}.")
+    return str(wert).strip()
+
+
+def _version(wert, ort: str) -> str | None:
+    """Zielversion als Text ("07.59"); Zahlen sind mehrdeutig (7.5 = 07.50 oder 07.05?) und werden abgelehnt."""
+    if wert is None or wert == "":
+        return None
+    if not isinstance(wert, str):
+        raise ValueError(f"{ort}: 'ziel_firmware' muss als Text angegeben werden (z.B. \"07.59\"), nicht {wert!r}.")
+    version = FritzOSVersion.parse(wert)
+    if version is None:
+        raise ValueError(f"{ort}: 'ziel_firmware' {wert!r} ist keine FRITZ!OS-Version.")
+    return str(version)
+
+
+def _ganzzahl(wert, feld: str, minimum: int, ort: str) -> int:
+    """Ganze Zahl ≥ minimum; Text aus CSV-/JSON-Dateien ("3") wird umgewandelt."""
+    if isinstance(wert, str) and wert.strip().isdigit():
+        wert = int(wert)
+    if isinstance(wert, bool) or not isinstance(wert, int) or wert < minimum:
+        raise ValueError(f"{ort}: '{feld}' muss eine ganze Zahl ≥ {minimum} sein, nicht {wert!r}.")
+    return wert
+
+
+def _passwort_liste(wert, ort: str) -> list[str]:
+    if not wert:
+        return []
+    if isinstance(wert, str):
+        return [p for p in (teil.strip() for teil in wert.split("|")) if p]
+    if not isinstance(wert, list):
+        raise ValueError(f"{ort}: 'passwoerter' muss eine Liste oder durch \"|\" getrennter Text sein.")
+    return [p for p in (_text(teil, "passwoerter", ort) for teil in wert) if p]
+
+
+def _politik(werte, ort: str) -> dict:
+    """Prüft die Fehler-Politik und ergänzt fehlende Werte aus STANDARD_POLITIK."""
+    if werte is None:
+        werte = {}
+    if not isinstance(werte, dict):
+        raise ValueError(f"{ort}: 'politik' muss ein Objekt sein.")
+    unbekannt = set(werte) - set(STANDARD_POLITIK)
+    if unbekannt:
+        raise ValueError(f"{ort}: unbekannte Politik-Schlüssel {sorted(unbekannt)}.")
+    politik = {**STANDARD_POLITIK, **werte}
+    for feld, minimum in POLITIK_MINIMUM.items():
+        politik[feld] = _ganzzahl(politik[feld], feld, minimum, ort)
+    schritte = politik["optionale_schritte"]
+    if not isinstance(schritte, list) or not all(isinstance(schritt, str) for schritt in schritte):
+        raise ValueError(f"{ort}: 'optionale_schritte' muss eine Liste von Schritt-ids sein.")
+    unbekannt = set(schritte) - set(WORKFLOW_SCHRITT_IDS)
+    if unbekannt:
+        raise ValueError(f"{ort}: unbekannte Schritt-ids in 'optionale_schritte' {sorted(unbekannt)} "
+                         f"(bekannt: {', '.join(WORKFLOW_SCHRITT_IDS)}).")
+    politik["optionale_schritte"] = list(schritte)
+    return politik
+
+
+def lade_manifest(pfad: str | Path) -> dict:
+    """
+    Liest ein JSON- oder CSV-Manifest und liefert {"boxen": [...], "politik": {...}, "max_parallel": int | None}.
+    Jede Box enthält slot, url, passwoerter (Liste) und ziel_firmware; fehlende Werte kommen aus den Vorgaben.
+    Werte werden geprüft und umgewandelt; ungültige Angaben lösen ValueError mit Angabe der Stelle aus.
+    """
+    pfad = Path(pfad)
+    if pfad.suffix.lower() == ".csv":
+        with pfad.open(newline="", encoding="utf-8-sig") as f:
+            daten = {"boxen": list(csv.DictReader(f))}
+        politik_datei = pfad.with_name(f"{pfad.stem}.politik.json")
+        if politik_datei.is_file():
+            daten["politik"] = json.loads(politik_datei.read_text(encoding="utf-8"))
+    else:
+        daten = json.loads(pfad.read_text(encoding="utf-8"))
+    if not isinstance(daten, dict):
+        raise ValueError(f"Manifest {pfad.name}: erwartet ein Objekt mit 'boxen'.")
+
+    ort = f"Manifest {pfad.name}"
+    vorgabe_passwoerter = _passwort_liste(daten.get("passwoerter"), ort)
+    vorgabe_ziel = _version(daten.get("ziel_firmware"), ort)
+    boxen = []
+    for nummer, eintrag in enumerate(daten.get("boxen") or [], start=1):
+        box_ort = f"{ort}, Box {nummer}"
+        if not isinstance(eintrag, dict):
+            raise ValueError(f"{box_ort}: erwartet ein Objekt.")
+        url = _text(eintrag.get("url"), "url", box_ort)
+        if not url:
+            raise ValueError(f"{box_ort}: keine URL.")
+        passwoerter = _passwort_liste(eintrag.get("passwoerter"), box_ort) or vorgabe_passwoerter
+        if not passwoerter:
+            raise ValueError(f"{ort}: keine Passwörter für {url}.")
+        boxen.append({
+            "slot": _text(eintrag.get("slot"), "slot", box_ort) or f"#{nummer}",
+            "url": url.rstrip("/"),
+            "passwoerter": passwoerter,
+            "ziel_firmware": _version(eintrag.get("ziel_firmware"), box_ort) or vorgabe_ziel,
+        })
+    if not boxen:
+        raise ValueError(f"{ort} enthält keine Boxen.")
+    urls = [box["url"] for box in boxen]
+    if len(set(urls)) != len(urls):
+        raise ValueError(f"{ort}: URLs müssen eindeutig sein.")
+
+    max_parallel = daten.get("max_parallel")
+    if max_parallel is not None:
+        max_parallel = _ganzzahl(max_parallel, "max_parallel", 1, ort)
+    return {"boxen": boxen, "politik": _politik(daten.get("politik"), ort), "max_parallel": max_parallel}
+
+
+class BatchRunner(MultiBoxRunner):
+    """
+    Arbeitet alle Boxen eines Manifests parallel und ohne Rückfragen ab (Mehrplatzbetrieb wie MultiBoxRunner),
+    jede Box mit eigenen Kandidaten-Passwörtern, eigener Zielversion und der Fehler-Politik des Manifests.
+    Die Ergebnisdatei wird nach jeder fertigen Box neu geschrieben, ein Abbruch verliert also keine Ergebnisse.
+    """
+
+    def __init__(self, manifest: dict, ergebnis_datei: str | Path, max_parallel: int | None = None,
+                 browser_profil: str = "lean"):
+        self.boxen = manifest["boxen"]
+        self.politik = manifest["politik"]
+        super().__init__([box["url"] for box in self.boxen], max_parallel or manifest.get("max_parallel"),
+                         browser_profil)
+        self.ergebnis_datei = Path(ergebnis_datei)
+        self.ergebnisse = {}
+
+    def _bearbeite_manifest_box(self, box: dict) -> dict:
+        """Führt den Workflow einer Box aus, bei Fehlschlag bis zu box_wiederholungen weitere Male."""
+        orchestrator = self._orchestrator(box["url"], ziel_firmware=box["ziel_firmware"],
+                                          max_versuche=self.politik["max_versuche"],
+                                          optionale_schritte=self.politik["optionale_schritte"])
+        start = time.time()
+        ergebnis = None
+        durchlaeufe = 0
+        fehler_klasse = None
+        while durchlaeufe <= self.politik["box_wiederholungen"]:
+            durchlaeufe += 1
+            try:
+                ergebnis = orchestrator.run_full_workflow(box["passwoerter"])
+                fehler_klasse = orchestrator.fehler_klasse
+            except Exception as e:
+                print(f"❌ [{box['slot']}] Unerwarteter Fehler: {e}")
+                ergebnis = None
+                fehler_klasse = orchestrator.fehler_klasse or type(e).__name__
+            if ergebnis == "ok":
+                break
+            if durchlaeufe <= self.politik["box_wiederholungen"]:
+                print(f"🔁 [{box['slot']}] Durchlauf {durchlaeufe} fehlgeschlagen, neuer Versuch ab Checkpoint...")
+
+        fritzbox = orchestrator.fritzbox
+        ende = time.time()
+        ok = ergebnis == "ok"
+        return {
+            "slot": box["slot"],
+            "url": box["url"],
+            "ergebnis": "ok" if ok else "fehlgeschlagen",
+            "durchlaeufe": durchlaeufe,
+            "fehler_schritt": None if ok else orchestrator.fehler_schritt,
+            "fehler_klasse": None if ok else fehler_klasse,
+            "serial": getattr(fritzbox, "serial", None),
+            "box_model": getattr(fritzbox, "box_model", None),
+            "os_version": getattr(fritzbox, "os_version", None),
+            "start": datetime.fromtimestamp(start).isoformat(timespec="seconds"),
+            "ende": datetime.fromtimestamp(ende).isoformat(timespec="seconds"),
+            "dauer_s": round(ende - start, 1),
+        }
+
+    def _ergebnisse_schreiben(self):
+        """Schreibt alle bisherigen Ergebnisse atomar (CSV bei Endung .csv, sonst JSON) in Manifest-Reihenfolge."""
+        zeilen = [self.ergebnisse[box["url"]] for box in self.boxen if box["url"] in self.ergebnisse]
+        self.ergebnis_datei.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.ergebnis_datei.with_name(self.ergebnis_datei.name + ".tmp")
+        if self.ergebnis_datei.suffix.lower() == ".csv":
+            with tmp.open("w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=ERGEBNIS_FELDER)
+                writer.writeheader()
+                writer.writerows(zeilen)
+        else:
+            tmp.write_text(json.dumps(zeilen, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.ergebnis_datei)
+
+    def _box_fertig(self, box: dict, zeile: dict | None, fehler: Exception | None):
+        if fehler:
+            print(f"❌ [{box['slot']}] Unerwarteter Fehler: {fehler}")
+            zeile = {"slot": box["slot"], "url": box["url"], "ergebnis": "fehlgeschlagen",
+                     "fehler_klasse": type(fehler).__name__}
+        self.ergebnisse[box["url"]] = zeile
+        self._ergebnisse_schreiben()
+
+    def run(self) -> dict:
+        """Startet alle Boxen und gibt {url: Ergebnis-Dict} zurück."""
+        print(f"🚀 Starte Batchbetrieb für {len(self.boxen)} FritzBoxen (max. {self.max_parallel} parallel)...")
+        start = time.time()
+        self._parallel_ausfuehren(self.boxen, self._bearbeite_manifest_box, self._box_fertig, thread_name="batch")
+
+        dauer = time.time() - start
+        erfolgreich = sum(1 for zeile in self.ergebnisse.values() if zeile["ergebnis"] == "ok")
+        print(f"\n🏁 Batchbetrieb beendet: {erfolgreich}/{len(self.boxen)} Boxen erfolgreich in {dauer / 60:.1f} min.")
+        print(f"📄 Ergebnisse: {self.ergebnis_datei}")
+        for box in self.boxen:
+            zeile = self.ergebnisse.get(box["url"], {})
+            status = "✅" if zeile.get("ergebnis") == "ok" else "❌"
+            fehler = f" – fehlgeschlagen bei '{zeile['fehler_schritt']}'" if zeile.get("fehler_schritt") else ""
+            print(f"   {status} {box['slot']} ({box['url']}) {zeile.get('os_version') or ''}{fehler}")
+        return self.ergebnisse
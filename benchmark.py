@@ -0,0 +1,154 @@
+# benchmark.py
+"""
+End-to-End-Benchmark: misst run_full_workflow gegen eine lokale Fake-FritzBox (fake_fritzbox.py).
+Läuft auf jedem Rechner mit Chrome/Chromedriver, ohne echte Hardware.
+
+Aufruf z.B.:
+    python benchmark.py --runden 3 --ui js3 --latenz 0.02 --json ergebnis.json
+    python benchmark.py --vergleich ergebnis.json      # Abweichungen zu einem früheren Lauf anzeigen
+"""
+from pathlib import Path
+import argparse
+import io
+import json
+import os
+import statistics
+import tarfile
+import tempfile
+import time
+
+from fake_fritzbox import FakeFritzBox
+from fritz_boxinfo import modell_aus_name
+from workflow_log import SchrittProtokoll
+
+
+def erzeuge_test_image(verzeichnis: Path, box_name: str, version: str, praefix: str = "154",
+                       groesse_mb: float = 1.0) -> Path:
+    """Legt ein synthetisches .image (tar mit var/install und Füllbytes) für das Modell an."""
+    modell, _ = modell_aus_name(box_name)
+    pfad = Path(verzeichnis) / f"FRITZ.Box_{modell.replace('_', '-')}-{version}.image"
+    with tarfile.open(pfad, "w") as tar:
+        for name, daten in (("./var/install", f"#!/bin/sh\n# {box_name}\nnewFWver={praefix}.{version}\n".encode("ascii")),
+                            ("./var/tmp/filesystem.image", os.urandom(int(groesse_mb * 1024 * 1024)))):
+            info = tarfile.TarInfo(name)
+            info.size = len(daten)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(daten))
+    return pfad
+
+
+def lese_protokoll(datei: Path) -> list[dict]:
+    """Gruppiert die Schritt-Einträge des Protokolls pro Workflow-Lauf."""
+    laeufe, aktuell = [], []
+    if not datei.exists():
+        return laeufe
+    for zeile in datei.read_text(encoding="utf-8").splitlines():
+        eintrag = json.loads(zeile)
+        if eintrag["typ"] == "schritt":
+            aktuell.append(eintrag)
+        elif eintrag["typ"] == "workflow":
+            laeufe.append({"dauer_s": eintrag["dauer_s"], "ergebnis": eintrag["ergebnis"], "schritte": aktuell})
+            aktuell = []
+    return laeufe
+
+
+def auswerten(laeufe: list[dict]) -> dict:
+    """Median/Min/Max je Schritt (nach Position, da Schritte mehrfach vorkommen können) und für den Gesamtlauf."""
+    schritte = {}
+    for lauf in laeufe:
+        for position, schritt in enumerate(lauf["schritte"], start=1):
+            schritte.setdefault(f"{position:02d} {schritt['schritt']}", []).append(schritt["dauer_s"])
+    ergebnis = {name: {"median_s": statistics.median(werte), "min_s": min(werte), "max_s": max(werte)}
+                for name, werte in schritte.items()}
+    gesamt = [lauf["dauer_s"] for lauf in laeufe]
+    if gesamt:
+        ergebnis["Gesamt"] = {"median_s": statistics.median(gesamt), "min_s": min(gesamt), "max_s": max(gesamt)}
+    return ergebnis
+
+
+def drucke_tabelle(auswertung: dict, vergleich: dict | None = None):
+    breite = max(len("Schritt"), *(len(name) for name in auswertung))
+    kopf = f"{'Schritt':<{breite}}  {'Median':>8}  {'Min':>8}  {'Max':>8}"
+    if vergleich:
+        kopf += f"  {'Vorher':>8}  {'Δ':>8}"
+    print(kopf)
+    print("-" * len(kopf))
+    for name, werte in auswertung.items():
+        zeile = f"{name:<{breite}}  {werte['median_s']:>8.2f}  {werte['min_s']:>8.2f}  {werte['max_s']:>8.2f}"
+        if vergleich and name in vergleich:
+            vorher = vergleich[name]["median_s"]
+            zeile += f"  {vorher:>8.2f}  {werte['median_s'] - vorher:>+8.2f}"
+        print(zeile)
+
+
+def fuehre_benchmark_aus(runden: int = 3, ui: str = "classic", box_name: str = "FRITZ!Box 7590",
+                         start_version: str = "07.59", latenz: float = 0.0, neustart_dauer: float = 3.0,
+                         image_mb: float = 1.0, browser_profil: str = "lean", trace: bool = False) -> dict:
+    """Startet Fake-Box und Browser, führt `runden` komplette Workflows aus und liefert die Auswertung."""
+    from browser_pool import BrowserPool
+    from fritzbox_api import FirmwareManager
+    from workflow_orchestrator import WorkflowOrchestrator
+
+    passwort = "geheim"
+    with tempfile.TemporaryDirectory(prefix="fritz_benchmark_") as tmp:
+        tmp = Path(tmp)
+        firmware_dir = tmp / "firmware"
+        firmware_dir.mkdir()
+
+        firmware_manager = FirmwareManager(firmware_dir=firmware_dir, interaktiv=False)
+        modell, _ = modell_aus_name(box_name)
+        for version in firmware_manager.plane_update(modell, start_version) or []:
+            erzeuge_test_image(firmware_dir, box_name, version, groesse_mb=image_mb)
+        firmware_manager.katalog.aktualisieren()
+        firmware_manager.pruefer.im_hintergrund_pruefen(firmware_manager.katalog.pfade())
+
+        protokoll_datei = tmp / "benchmark.jsonl"
+        protokoll = SchrittProtokoll(protokoll_datei, station_id="benchmark")
+        browser_pool = BrowserPool(groesse=1, profil=browser_profil)
+        box = FakeFritzBox(name=box_name, os_version=start_version, passwort=passwort, ui=ui,
+                           latenz=latenz, neustart_dauer=neustart_dauer).starten()
+        print(f"🧪 Fake-FritzBox ({ui}) unter {box.url}, {runden} Runde(n).")
+        try:
+            browser_pool.vorwaermen()
+            for runde in range(1, runden + 1):
+                box.zuruecksetzen()
+                orchestrator = WorkflowOrchestrator(url=box.url, interaktiv=False,
+                                                    firmware_manager=firmware_manager, browser_pool=browser_pool,
+                                                    protokoll=protokoll, trace=trace)
+                start = time.time()
+                ergebnis = orchestrator.run_full_workflow(passwort)
+                print(f"⏱️ Runde {runde}: {ergebnis} nach {time.time() - start:.1f}s ({box.anfragen} HTTP-Anfragen)")
+        finally:
+            box.stoppen()
+            browser_pool.schliessen()
+            protokoll.schliessen()
+        return auswerten(lese_protokoll(protokoll_datei))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des FritzBox-Workflows gegen eine Fake-FritzBox")
+    parser.add_argument("--runden", type=int, default=3)
+    parser.add_argument("--ui", choices=("classic", "js3"), default="classic")
+    parser.add_argument("--name", default="FRITZ!Box 7590", help="Produktname der Fake-Box")
+    parser.add_argument("--version", default="07.59", help="FRITZ!OS-Version der Fake-Box beim Start")
+    parser.add_argument("--latenz", type=float, default=0.0, help="Verzögerung pro HTTP-Anfrage in Sekunden")
+    parser.add_argument("--neustart", type=float, default=3.0, help="Dauer eines simulierten Neustarts")
+    parser.add_argument("--image-mb", type=float, default=1.0, help="Größe der synthetischen Firmware-Images")
+    parser.add_argument("--profil", choices=("standard", "lean"), default="lean", help="Browser-Profil")
+    parser.add_argument("--trace", action="store_true", help="WebDriver-Roundtrips pro Schritt ausgeben")
+    parser.add_argument("--json", type=Path, help="Auswertung als JSON speichern")
+    parser.add_argument("--vergleich", type=Path, help="früher gespeicherte Auswertung zum Vergleich")
+    args = parser.parse_args()
+
+    auswertung = fuehre_benchmark_aus(args.runden, args.ui, args.name, args.version, args.latenz,
+                                      args.neustart, args.image_mb, args.profil, args.trace)
+    vergleich = json.loads(args.vergleich.read_text(encoding="utf-8")) if args.vergleich else None
+    print()
+    drucke_tabelle(auswertung, vergleich)
+    if args.json:
+        args.json.write_text(json.dumps(auswertung, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Auswertung gespeichert: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
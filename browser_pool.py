@@ -0,0 +1,137 @@
+# browser_pool.py
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+from browser_utils import setup_browser, Browser
+
+
+class BrowserPool:
+    """
+    Hält vorgestartete Browser-Instanzen warm, damit nicht jede FritzBox den
+    Start von Chrome und chromedriver bezahlt. Zwischen zwei Boxen wird ein
+    Browser nur günstig zurückgesetzt (Cookies/Storage leeren, about:blank).
+    Nach 'max_boxen_pro_browser' Boxen wird der Browser ersetzt; der Speicherverbrauch
+    wird nicht überwacht (dafür wäre psutil nötig), die feste Obergrenze begrenzt ihn.
+    """
+
+    def __init__(self, groesse: int = 1, max_boxen_pro_browser: int = 20, profil: str = "standard",
+                 browser_factory=setup_browser):
+        self.groesse = groesse
+        self.profil = profil
+        self.max_boxen_pro_browser = max_boxen_pro_browser
+        self.browser_factory = browser_factory
+        self._frei = queue.Queue()
+        self._nutzungen = {}
+        self._startend = 0
+        self._lock = threading.Lock()
+        self._starter = ThreadPoolExecutor(max_workers=max(1, groesse), thread_name_prefix="browser-start")
+
+    def _neuer_browser(self) -> Browser:
+        browser = Browser(self.browser_factory(self.profil))
+        with self._lock:
+            self._nutzungen[id(browser)] = 0
+        return browser
+
+    def _warm_starten(self):
+        """Startet im Hintergrund einen neuen Browser und legt ihn in den Pool."""
+        def starten():
+            try:
+                self._frei.put(self._neuer_browser())
+            except Exception as e:
+                print(f"⚠️ Browser für den Pool konnte nicht gestartet werden: {e}")
+            finally:
+                with self._lock:
+                    self._startend -= 1
+        with self._lock:
+            self._startend += 1
+        self._starter.submit(starten)
+
+    def vorwaermen(self):
+        """Startet 'groesse' Browser im Hintergrund vor."""
+        print(f"🌐 Wärme {self.groesse} Browser vor...")
+        for _ in range(self.groesse):
+            self._warm_starten()
+
+    def ausleihen(self, timeout: float = 60) -> Browser:
+        """Gibt einen lebendigen Browser aus dem Pool zurück (startet notfalls einen neuen)."""
+        while True:
+            try:
+                browser = self._frei.get_nowait()
+            except queue.Empty:
+                if not self._startend:
+                    return self._neuer_browser()
+                # Ein vorgewärmter Browser ist gerade im Start – darauf warten statt doppelt zu starten
+                try:
+                    browser = self._frei.get(timeout=timeout)
+                except queue.Empty:
+                    return self._neuer_browser()
+            if self._lebt(browser):
+                return browser
+            self._entsorgen(browser)
+
+    def zurueckgeben(self, browser: Browser):
+        """Setzt den Browser zurück und legt ihn für die nächste Box bereit oder ersetzt ihn."""
+        if browser is None:
+            return
+        with self._lock:
+            nutzungen = self._nutzungen.get(id(browser), 0) + 1
+            self._nutzungen[id(browser)] = nutzungen
+
+        grund = None
+        if not self._lebt(browser):
+            grund = "Browser reagiert nicht mehr"
+        elif nutzungen >= self.max_boxen_pro_browser:
+            grund = f"{nutzungen} Boxen bearbeitet"
+
+        if grund is None and self._zuruecksetzen(browser):
+            self._frei.put(browser)
+            return
+
+        print(f"♻️ Browser wird ersetzt ({grund or 'Zurücksetzen fehlgeschlagen'}).")
+        self._entsorgen(browser)
+        self._warm_starten()
+
+    def schliessen(self):
+        """Beendet alle Browser im Pool."""
+        self._starter.shutdown(wait=True)
+        while True:
+            try:
+                self._entsorgen(self._frei.get_nowait())
+            except queue.Empty:
+                break
+
+    def _zuruecksetzen(self, browser: Browser) -> bool:
+        """Günstiger Reset zwischen zwei Boxen: Cookies, Storage und Seite leeren."""
+        try:
+            driver = browser.driver
+            # delete_all_cookies() leert nur die aktuelle Domain – die nächste Box kann eine andere IP haben
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            try:
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": driver.execute_script("return location.origin;"),
+                    "storageTypes": "all",
+                })
+            except Exception:
+                pass  # about:blank oder fremde Origin – nichts zu leeren
+            # Über den Browser-Wrapper, damit Navigationszähler und Login-Cache den Seitenwechsel sehen
+            return browser.get_url("about:blank")
+        except Exception:
+            return False
+
+    def _entsorgen(self, browser: Browser):
+        with self._lock:
+            self._nutzungen.pop(id(browser), None)
+        try:
+            browser.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _lebt(browser: Browser) -> bool:
+        try:
+            browser.driver.title
+            return True
+        except Exception:
+            return False
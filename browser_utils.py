@@ -4,37 +4,353 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium import webdriver
+import os
 import time
 
-def setup_browser():
-    """Initialisiert und konfiguriert den Chrome WebDriver."""
+# Ressourcen, die im "lean"-Profil per DevTools blockiert werden (Bilder, Schriften, Medien)
+LEAN_BLOCKIERTE_ENDUNGEN = (
+    "png", "jpg", "jpeg", "gif", "webp", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "ogg", "mp3", "wav",
+)
+# FRITZ!OS hängt an Assets eine Version an ("/css/logo.png?v=..."), daher je Endung auch das Muster mit Query
+LEAN_BLOCKIERTE_URLS = [muster for endung in LEAN_BLOCKIERTE_ENDUNGEN for muster in (f"*.{endung}", f"*.{endung}?*")]
+
+def setup_browser(profil="standard"):
+    """
+    Initialisiert und konfiguriert den Chrome WebDriver.
+    profil="standard": sichtbares Fenster, lädt die komplette Oberfläche.
+    profil="lean": headless, blockiert Bilder/Schriften/Medien, "eager"-Seitenladen
+    und abgeschaltete Hintergrunddienste – weniger Latenz und RAM pro Browser.
+    """
+    if profil not in ("standard", "lean"):
+        raise ValueError(f"Unbekanntes Browser-Profil: {profil}")
+
     options = Options()
     # options.add_argument("--headless=new") # Optional: Für Headless-Betrieb
     options.add_argument("--disable-gpu")
     options.add_argument("--ignore-certificate-errors")
     options.add_argument("--log-level=3") # Weniger WebDriver-Logs
     options.add_argument("--window-size=1920,1080")
-    # Stelle sicher, dass chromedriver.exe im PATH oder im gleichen Verzeichnis ist
-    return webdriver.Chrome(service=Service("chromedriver.exe"), options=options)
+
+    if profil == "lean":
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+        options.add_argument("--no-first-run")
+        options.add_argument("--mute-audio")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # Nicht auf Bilder/Skripte nach DOMContentLoaded warten; Bereitschaft prüft Browser.get_url()
+        options.page_load_strategy = "eager"
+
+    # Unter Windows: chromedriver.exe im PATH oder im gleichen Verzeichnis;
+    # sonst sucht Selenium den passenden Treiber selbst (z.B. für Benchmarks unter Linux)
+    service = Service("chromedriver.exe") if os.name == "nt" else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+
+    if profil == "lean":
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKIERTE_URLS})
+            # Animationen der Oberfläche abschalten
+            driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {
+                "features": [{"name": "prefers-reduced-motion", "value": "reduce"}]
+            })
+        except Exception as e:
+            print(f"⚠️ DevTools-Blockierung für das lean-Profil nicht möglich: {e}")
+    return driver
+
+# Prüft eine Liste von XPaths in einem einzigen Round-Trip.
+# Ergebnis je XPath: [vorhanden, sichtbar, aktiviert] (sichtbar/aktiviert bezogen auf das erste sichtbare Element)
+XPATH_STATUS_JS = """
+const sichtbar = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+return arguments[0].map(xpath => {
+    let treffer;
+    try {
+        treffer = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        return [false, false, false];
+    }
+    if (!treffer.snapshotLength) return [false, false, false];
+    for (let i = 0; i < treffer.snapshotLength; i++) {
+        const el = treffer.snapshotItem(i);
+        if (el.nodeType === 1 && sichtbar(el)) return [true, true, !el.disabled];
+    }
+    return [true, false, false];
+});
+"""
+
+# Liefert das erste (optional sichtbare) Element zu einem XPath oder null – ohne Wartezeit.
+PROBE_JS = """
+const [xpath, nurSichtbar] = arguments;
+const treffer = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (let i = 0; i < treffer.snapshotLength; i++) {
+    const el = treffer.snapshotItem(i);
+    if (!nurSichtbar) return el;
+    if (el.nodeType === 1 && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && getComputedStyle(el).visibility !== 'hidden') return el;
+}
+return null;
+"""
+
+# Liefert je XPath das erste (optional sichtbare) Element oder null – alle Kandidaten in einem Round-Trip.
+ALLE_TREFFER_JS = """
+const [xpaths, nurSichtbar] = arguments;
+const sichtbar = el => el.nodeType === 1 && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+return xpaths.map(xpath => {
+    let treffer;
+    try {
+        treffer = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        return null;
+    }
+    for (let i = 0; i < treffer.snapshotLength; i++) {
+        const el = treffer.snapshotItem(i);
+        if (!nurSichtbar || sichtbar(el)) return el;
+    }
+    return null;
+});
+"""
+
+# Seitenbereitschaft nach eager-Laden: readyState "complete" oder – sobald das DOM geparst ist – ein
+# vom Aufrufer genanntes Element (XPath), das die eigentliche Oberfläche anzeigt.
+SEITE_BEREIT_JS = """
+const xpath = arguments[0];
+if (document.readyState === 'complete') return true;
+if (!xpath || document.readyState === 'loading') return false;
+try {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+        .singleNodeValue !== null;
+} catch (e) {
+    return false;
+}
+"""
+
+# Wartet in der Seite per MutationObserver auf den ersten passenden Locator (Liste nach Priorität, je
+# [art, ausdruck] mit art "xpath" oder "css") und antwortet erst bei Treffer oder Fristablauf – ein Round-Trip
+# statt Polling. Ein kurzer In-Page-Takt fängt Sichtbarkeitswechsel ohne DOM-Mutation ab (CSS-Übergänge, Layout).
+# Ergebnis: [index, element] bzw. [index, [elemente]] bei mehrere=true, null bei Fristablauf.
+BEOBACHTER_WARTEN_JS = """
+const fertig = arguments[arguments.length - 1];
+const [locators, nurSichtbar, mehrere, fristMs] = arguments;
+const sichtbar = el => el.nodeType === 1 && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+const suchen = ([art, ausdruck]) => {
+    try {
+        if (art === 'css') return Array.from(document.querySelectorAll(ausdruck));
+        const treffer = document.evaluate(ausdruck, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const liste = [];
+        for (let i = 0; i < treffer.snapshotLength; i++) liste.push(treffer.snapshotItem(i));
+        return liste;
+    } catch (e) {
+        return [];
+    }
+};
+const pruefen = () => {
+    for (let i = 0; i < locators.length; i++) {
+        const liste = suchen(locators[i]);
+        if (!liste.length) continue;
+        if (mehrere) {
+            if (!nurSichtbar || liste.every(sichtbar)) return [i, liste];
+            continue;
+        }
+        const element = nurSichtbar ? liste.find(sichtbar) : liste[0];
+        if (element) return [i, element];
+    }
+    return null;
+};
+
+let erledigt = false, beobachter = null, takt = null, frist = null;
+const beenden = ergebnis => {
+    if (erledigt) return;
+    erledigt = true;
+    if (beobachter) beobachter.disconnect();
+    clearInterval(takt);
+    clearTimeout(frist);
+    fertig(ergebnis);
+};
+const sofort = pruefen();
+if (sofort) return beenden(sofort);
+const erneut = () => { const treffer = pruefen(); if (treffer) beenden(treffer); };
+beobachter = new MutationObserver(erneut);
+beobachter.observe(document.documentElement || document,
+    {childList: true, subtree: true, attributes: true, characterData: true});
+takt = setInterval(erneut, 100);
+frist = setTimeout(() => beenden(null), fristMs);
+"""
+
+# Locator-Strategien, die BEOBACHTER_WARTEN_JS selbst auswerten kann (alle anderen: WebDriverWait)
+BEOBACHTER_STRATEGIEN = {By.XPATH: "xpath", By.CSS_SELECTOR: "css"}
+# Länge eines execute_async_script-Abschnitts; bleibt unter dem Standard-Script-Timeout von Chromedriver (30 s)
+BEOBACHTER_ABSCHNITT = 20.0
+
+# JS3-Runtime: wird einmal pro Seite injiziert (window.__fritzJs3) und hält einen Index aller offenen
+# Shadow Roots. Neue Roots melden sich über ein umschlossenes attachShadow selbst an, ein MutationObserver
+# je Root erhöht bei Änderungen die Version und verwirft damit den Treffer-Cache.
+# Selektor: {css, ta_id, text, attribute: {name: wert|null}, sichtbar} – css ohne Komma-Liste.
+JS3_RUNTIME_JS = """
+if (window.__fritzJs3) return true;
+const wurzeln = new Set([document]);
+const cache = new Map();
+let version = 0;
+const beobachter = new MutationObserver(() => { version++; });
+const beobachten = wurzel => beobachter.observe(wurzel,
+    {childList: true, subtree: true, attributes: true, characterData: true});
+const registrieren = wurzel => {
+    if (wurzeln.has(wurzel)) return;
+    wurzeln.add(wurzel);
+    beobachten(wurzel);
+    version++;
+};
+const einsammeln = wurzel => wurzel.querySelectorAll('*').forEach(el => {
+    if (el.shadowRoot) { registrieren(el.shadowRoot); einsammeln(el.shadowRoot); }
+});
+beobachten(document);
+einsammeln(document);
+const attachShadow = Element.prototype.attachShadow;
+Element.prototype.attachShadow = function (init) {
+    const wurzel = attachShadow.call(this, init);
+    if (init && init.mode === 'open') registrieren(wurzel);
+    return wurzel;
+};
+
+const normalisieren = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+// Text eines Elements einschließlich seiner Shadow Roots (textContent endet am Host), ohne Style/Skript
+const tiefenText = knoten => {
+    if (knoten.nodeType === Node.TEXT_NODE) return knoten.data;
+    if (knoten.nodeType !== Node.ELEMENT_NODE && knoten.nodeType !== Node.DOCUMENT_FRAGMENT_NODE) return '';
+    if (knoten.tagName === 'STYLE' || knoten.tagName === 'SCRIPT') return '';
+    let text = knoten.shadowRoot ? tiefenText(knoten.shadowRoot) : '';
+    for (const kind of knoten.childNodes) text += ' ' + tiefenText(kind);
+    return text;
+};
+const sichtbar = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+const cssAus = sel => {
+    let css = sel.css || '*';
+    if (sel.ta_id) css += `[ta-id="${CSS.escape(sel.ta_id)}"]`;
+    for (const [name, wert] of Object.entries(sel.attribute || {})) {
+        css += wert === null ? `[${CSS.escape(name)}]` : `[${CSS.escape(name)}="${CSS.escape(String(wert))}"]`;
+    }
+    return css;
+};
+const alle = sel => {
+    const css = cssAus(sel);
+    const text = normalisieren(sel.text);
+    const treffer = [];
+    for (const wurzel of Array.from(wurzeln)) {
+        if (wurzel !== document && !wurzel.host.isConnected) { wurzeln.delete(wurzel); continue; }
+        wurzel.querySelectorAll(css).forEach(el => {
+            if (text && !normalisieren(tiefenText(el)).includes(text)) return;
+            if (sel.sichtbar && !sichtbar(el)) return;
+            treffer.push(el);
+        });
+    }
+    return treffer;
+};
+// Gemerkt werden nur Treffer ohne Sichtbarkeitsfilter: Sichtbarkeit ändert sich auch ohne DOM-Mutation
+// (CSS-Übergänge, Layout), und ein Fehltreffer soll beim nächsten Aufruf neu gesucht werden.
+const finden = sel => {
+    const schluessel = JSON.stringify(sel);
+    const eintrag = cache.get(schluessel);
+    if (eintrag && eintrag.version === version && eintrag.element.isConnected) return eintrag.element;
+    const element = alle(sel)[0] || null;
+    if (element && !sel.sichtbar) cache.set(schluessel, {version, element});
+    else cache.delete(schluessel);
+    return element;
+};
+
+window.__fritzJs3 = {
+    finden,
+    alle,
+    klicken: sel => {
+        const el = finden(sel);
+        if (!el) return false;
+        el.click();
+        return true;
+    },
+    wert: sel => {
+        const el = finden(sel);
+        if (!el) return null;
+        return ('value' in el && el.tagName !== 'BUTTON') ? el.value : tiefenText(el).replace(/\\s+/g, ' ').trim();
+    },
+};
+return true;
+"""
+
+# Ruft eine Methode der JS3-Runtime auf; {fehlt: true}, wenn sie auf dieser Seite noch nicht injiziert ist.
+JS3_AUFRUF_JS = """
+const runtime = window.__fritzJs3;
+if (!runtime) return {fehlt: true};
+return {wert: runtime[arguments[0]](arguments[1])};
+"""
+
+# Wie lange ein "nicht vorhanden" für dieselbe Seite höchstens gilt (dynamische Dialoge)
+NEGATIV_CACHE_TTL = 2.0
 
 class Browser:
     """Kapselt Browser-spezifische Operationen mit Selenium WebDriver."""
 
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: webdriver.Chrome, beobachten: bool = True):
         if not isinstance(driver, webdriver.Chrome):
             raise TypeError("Der übergebene Treiber muss eine Instanz von selenium.webdriver.Chrome sein.")
         self.driver = driver
+        # Wartet sicher_warten/erster_treffer per MutationObserver in der Seite statt per Polling
+        self.beobachten = beobachten
+        # Bei "eager" kehrt driver.get() schon nach DOMContentLoaded zurück → explizite Bereitschaftsprüfung
+        self.eager = (driver.capabilities or {}).get("pageLoadStrategy") == "eager"
+        # Negativ-Cache der Proben: {(xpath, sichtbar): Zeitpunkt}, gilt nur bis zur nächsten Aktion/Navigation
+        self._nicht_vorhanden = {}
+        # Optionaler XPath, an dem eine eager geladene Seite als bereit gilt (setzt z.B. FritzBox)
+        self.bereit_xpath = None
+        # Zähler vollständiger Seitenladevorgänge (get_url/reload), z.B. zum Verwerfen des Login-Caches
+        self.navigationen = 0
+
+    def warte_auf_seite(self, timeout=10) -> bool:
+        """
+        Wartet, bis die Seite bereit ist: Dokument vollständig geladen oder – früher – das Element
+        aus 'bereit_xpath' vorhanden (z.B. Menü oder Login-Feld), ohne auf spät ladende Skripte zu warten.
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda d: d.execute_script(SEITE_BEREIT_JS, self.bereit_xpath))
+            return True
+        except Exception:
+            return False
 
     def sicher_warten(self, locator, timeout=10, verbose=False, sichtbar=True, mehrere=False):
         """
         Wartet sicher auf ein Element oder Elemente.
         Locator kann ein (By.XPATH, "xpath_string") Tupel oder ein reiner XPath-String sein.
+        XPath- und CSS-Locatoren werden per MutationObserver in der Seite abgewartet (ein Round-Trip, Reaktion
+        sofort bei Änderung). Andere Locatoren, beobachten=False oder ein abgebrochener Beobachter (z.B. Navigation)
+        nutzen für die restliche Zeit WebDriverWait. In beiden Fällen zählt bei sichtbar=True das erste sichtbare
+        Element (bei mehrere=True müssen alle Treffer sichtbar sein).
         """
         if isinstance(locator, str):
             locator = (By.XPATH, locator) # Standardmäßig XPath verwenden
 
-        wait = WebDriverWait(self.driver, timeout)
+        if self.beobachten and locator[0] in BEOBACHTER_STRATEGIEN:
+            start = time.time()
+            ergebnis = self._beobachtend_warten([locator], timeout, sichtbar, mehrere)
+            if ergebnis is not None:
+                if ergebnis[1] is not None:
+                    return ergebnis[1]
+                if verbose:
+                    raise Exception(f"❌ Fehler beim Warten auf Element {locator} (Timeout/Nicht gefunden)")
+                raise Exception
+            timeout = max(0.0, timeout - (time.time() - start))
+
+        # Gleiche Regeln wie im Beobachter: erstes sichtbare Element bzw. alle Elemente sichtbar
+        wait = WebDriverWait(self.driver, timeout, ignored_exceptions=(StaleElementReferenceException,))
         try:
             if mehrere:
                 if sichtbar:
@@ -43,7 +359,7 @@ class Browser:
                     return wait.until(EC.presence_of_all_elements_located(locator))
             else:
                 if sichtbar:
-                    return wait.until(EC.visibility_of_element_located(locator))
+                    return wait.until(lambda d: next((e for e in d.find_elements(*locator) if e.is_displayed()), False))
                 else:
                     return wait.until(EC.presence_of_element_located(locator))
         except Exception as e:
@@ -54,6 +370,177 @@ class Browser:
             else:
                 raise Exception
 
+    def _beobachtend_warten(self, locators, timeout, sichtbar, mehrere):
+        """
+        Wartet per BEOBACHTER_WARTEN_JS in Abschnitten von höchstens BEOBACHTER_ABSCHNITT Sekunden.
+        Gibt (index, treffer) zurück, (None, None) nach Ablauf von 'timeout' oder None, wenn das Warten
+        in der Seite abgebrochen ist (Navigation, Skriptfehler) – dann wartet der Aufrufer klassisch weiter.
+        """
+        locators = [[BEOBACHTER_STRATEGIEN[strategie], ausdruck] for strategie, ausdruck in locators]
+        ende = time.time() + timeout
+        while True:
+            abschnitt = min(max(0.0, ende - time.time()), BEOBACHTER_ABSCHNITT)
+            try:
+                antwort = self.driver.execute_async_script(BEOBACHTER_WARTEN_JS, locators, sichtbar, mehrere,
+                                                           int(abschnitt * 1000))
+            except Exception:
+                return None
+            if antwort:
+                return antwort[0], antwort[1]
+            if time.time() >= ende:
+                return None, None
+
+    def xpath_status(self, xpaths):
+        """
+        Momentaufnahme mehrerer XPaths in einem einzigen execute_script-Aufruf, ohne Wartezeit.
+        Gibt je XPath ein Tupel (vorhanden, sichtbar, aktiviert) zurück.
+        """
+        return [tuple(status) for status in self.driver.execute_script(XPATH_STATUS_JS, list(xpaths))]
+
+    def seite_geaendert(self):
+        """Verwirft den Negativ-Cache der Proben (nach Navigation, Klick oder Eingabe)."""
+        self._nicht_vorhanden.clear()
+
+    def pruefen(self, xpath, budget=0.0, sichtbar=False):
+        """
+        Probe für optionale Elemente: prüft sofort (bzw. innerhalb von 'budget' Sekunden) ohne Wiederholungen
+        und ohne Exception. Gibt das Element oder None zurück.
+        Fehltreffer werden pro Seitenstand zwischengespeichert, damit wiederholte Proben nichts kosten.
+        """
+        schluessel = (xpath, sichtbar)
+        zeitpunkt = self._nicht_vorhanden.get(schluessel)
+        if not budget and zeitpunkt and time.time() - zeitpunkt < NEGATIV_CACHE_TTL:
+            return None
+
+        ende = time.time() + budget
+        while True:
+            try:
+                element = self.driver.execute_script(PROBE_JS, xpath, sichtbar)
+            except Exception:
+                element = None
+            if element:
+                self._nicht_vorhanden.pop(schluessel, None)
+                return element
+            if time.time() >= ende:
+                break
+            time.sleep(min(0.1, max(0.0, ende - time.time())))
+
+        self._nicht_vorhanden[schluessel] = time.time()
+        return None
+
+    def alle_treffer(self, xpaths, sichtbar=False):
+        """Wertet alle XPaths in einem Round-Trip aus; gibt je XPath das erste Element oder None zurück."""
+        try:
+            return self.driver.execute_script(ALLE_TREFFER_JS, list(xpaths), sichtbar) or [None] * len(xpaths)
+        except Exception:
+            return [None] * len(xpaths)
+
+    def erster_treffer(self, xpaths, timeout=5, sichtbar=False, intervall=0.2):
+        """
+        Wartet, bis einer der XPaths (geordnete Kandidatenliste) passt, und liefert den Treffer mit der
+        höchsten Priorität als (index, element). Alle Kandidaten werden pro Prüfung in einem Round-Trip
+        ausgewertet. Ohne Treffer innerhalb von 'timeout' wird (None, None) zurückgegeben.
+        Mit beobachten=True wartet ein MutationObserver in der Seite, Polling nur als Rückfallebene.
+        """
+        ende = time.time() + timeout
+        if self.beobachten:
+            ergebnis = self._beobachtend_warten([(By.XPATH, xpath) for xpath in xpaths], timeout, sichtbar, False)
+            if ergebnis is not None:
+                return ergebnis
+        while True:
+            for index, element in enumerate(self.alle_treffer(xpaths, sichtbar=sichtbar)):
+                if element is not None:
+                    return index, element
+            if time.time() >= ende:
+                return None, None
+            time.sleep(min(intervall, max(0.0, ende - time.time())))
+
+    def klicken_falls_vorhanden(self, xpath, budget=0.0):
+        """Klickt ein optionales Element, falls es (innerhalb von 'budget') sichtbar ist. Gibt True bei Klick zurück."""
+        element = self.pruefen(xpath, budget=budget, sichtbar=True)
+        if element is None:
+            return False
+        return self.element_klicken(element)
+
+    def element_klicken(self, element) -> bool:
+        """
+        Klickt ein bereits gefundenes Element; scheitert der direkte Klick (z.B. verdeckt),
+        wird es per JavaScript in den sichtbaren Bereich gescrollt und geklickt.
+        Gibt False zurück, wenn auch das nicht möglich war (z.B. Element inzwischen aus dem DOM entfernt).
+        """
+        self.seite_geaendert()
+        try:
+            element.click()
+        except Exception:
+            try:
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();",
+                                           element)
+            except Exception:
+                return False
+        return True
+
+    @staticmethod
+    def _js3_selektor(css=None, ta_id=None, text=None, attribute=None, sichtbar=False) -> dict:
+        selektor = {"css": css, "ta_id": ta_id, "text": text, "attribute": attribute, "sichtbar": sichtbar}
+        return {schluessel: wert for schluessel, wert in selektor.items() if wert}
+
+    def _js3(self, methode, selektor):
+        """
+        Ein Aufruf der JS3-Runtime. Fehlt sie (neue Seite), wird sie einmalig injiziert und der Aufruf
+        wiederholt – danach ist jede Abfrage ein kurzer Round-Trip gegen den Shadow-Root-Index.
+        """
+        antwort = self.driver.execute_script(JS3_AUFRUF_JS, methode, selektor)
+        if antwort and antwort.get("fehlt"):
+            self.driver.execute_script(JS3_RUNTIME_JS)
+            antwort = self.driver.execute_script(JS3_AUFRUF_JS, methode, selektor)
+        return (antwort or {}).get("wert")
+
+    def js3_finden(self, css=None, *, ta_id=None, text=None, attribute=None, sichtbar=False):
+        """
+        Erstes Element über alle offenen Shadow Roots der Seite (JS3-Oberflächen) oder None.
+        css: CSS-Selektor, ta_id: Wert des ta-id-Attributs, text: Teiltext (ohne Groß-/Kleinschreibung),
+        attribute: {name: wert} (wert None = Attribut muss nur vorhanden sein).
+        """
+        try:
+            return self._js3("finden", self._js3_selektor(css, ta_id, text, attribute, sichtbar))
+        except Exception:
+            return None
+
+    def js3_alle(self, css=None, *, ta_id=None, text=None, attribute=None, sichtbar=False) -> list:
+        """Alle passenden Elemente über alle offenen Shadow Roots (Selektor wie js3_finden)."""
+        try:
+            return self._js3("alle", self._js3_selektor(css, ta_id, text, attribute, sichtbar)) or []
+        except Exception:
+            return []
+
+    def js3_klicken(self, css=None, *, ta_id=None, text=None, attribute=None, sichtbar=False) -> bool:
+        """Klickt das erste passende Element per JavaScript. Gibt True bei Klick zurück."""
+        try:
+            geklickt = bool(self._js3("klicken", self._js3_selektor(css, ta_id, text, attribute, sichtbar)))
+        except Exception:
+            return False
+        if geklickt:
+            self.seite_geaendert()
+        return geklickt
+
+    def js3_wert(self, css=None, *, ta_id=None, text=None, attribute=None, sichtbar=False):
+        """Wert (Eingabefelder) bzw. Text des ersten passenden Elements oder None."""
+        try:
+            return self._js3("wert", self._js3_selektor(css, ta_id, text, attribute, sichtbar))
+        except Exception:
+            return None
+
+    def js3_warten(self, css=None, *, ta_id=None, text=None, attribute=None, sichtbar=False,
+                   timeout=10, intervall=0.2):
+        """Wartet bis zu 'timeout' Sekunden auf ein passendes JS3-Element; gibt das Element oder None zurück."""
+        ende = time.time() + timeout
+        while True:
+            element = self.js3_finden(css, ta_id=ta_id, text=text, attribute=attribute, sichtbar=sichtbar)
+            if element is not None:
+                return element
+            if time.time() >= ende:
+                return None
+            time.sleep(min(intervall, max(0.0, ende - time.time())))
 
     def klicken(self, xpath, timeout=15, versuche=3, verbose=False):
         """
@@ -63,15 +550,10 @@ class Browser:
         for i in range(versuche):
             try:
                 element = self.sicher_warten(xpath, timeout, verbose=verbose)
-                try:
-                    element.click()
+                if self.element_klicken(element):
                     return True
-                except Exception as e:
-                    # Direkter Klick fehlgeschlagen, versuche JavaScript-Klick
-                    if verbose:
-                        print(f"⚠️ Klick direkt nicht möglich (Versuch {i + 1}) für {xpath}")
-                    self.driver.execute_script("arguments[0].click();", element)
-                    return True # JavaScript-Klick war (wahrscheinlich) erfolgreich
+                if verbose:
+                    print(f"⚠️ Klick auch per JavaScript nicht möglich (Versuch {i + 1}) für {xpath}")
             except Exception as e:
                 if verbose:
                     print(f"⚠️ Element {xpath} beim Warten nicht gefunden (Versuch {i + 1})")
@@ -86,6 +568,7 @@ class Browser:
         """Schreibt Text in ein Feld."""
         try:
             element = self.sicher_warten(xpath, timeout)
+            self.seite_geaendert()
             element.send_keys(text)
             return True
         except Exception as e:
@@ -95,7 +578,11 @@ class Browser:
     def get_url(self, url):
         """Navigiert zu einer URL."""
         try:
+            self.seite_geaendert()
+            self.navigationen += 1
             self.driver.get(url)
+            if self.eager:
+                self.warte_auf_seite()
             return True
         except Exception as e:
             print(f"❌ Fehler beim Navigieren zu {url}")
@@ -117,7 +604,11 @@ class Browser:
                 ts = int(time.time() * 1000)
                 sep = '&' if ('?' in url) else '?'
                 final = f"{url}{sep}_={ts}"
+            self.seite_geaendert()
+            self.navigationen += 1
             self.driver.get(final)
+            if self.eager:
+                self.warte_auf_seite()
             return True
         except Exception:
             print("❌ Fehler bei reload()")
@@ -0,0 +1,613 @@
+# fake_fritzbox.py
+"""
+Lokaler Stellvertreter einer FritzBox für Entwicklung und Benchmarks.
+Liefert minimale Versionen aller Seiten, die FritzBox (fritzbox_api.py) benutzt – klassische Oberfläche
+und JS3 (Shadow DOM) –, dazu login_sid.lua, jason_boxinfo.xml und den Firmware-Upload.
+Latenzen, Neustart-, Scan- und Tastendruck-Dauern sind einstellbar.
+
+Nicht gegen echte Boxen validiert – diese Teile bilden nur die Annahmen von fritzbox_api.py ab:
+- die Übergabe einer per login_sid.lua geholten SID an den Browser über "/?sid=..." (wird hier als Cookie übernommen),
+- Feldnamen des Update-Formulars (ConfigExport/ImportExportPassword) und die Antwort von /cgi-bin/firmwarecfg,
+- Aufbau und Attribute der JS3-Seiten (Shadow Roots, ta-id, level="critical").
+Schlägt einer dieser Wege an einer echten Box fehl, greifen die Rückfallpfade (Selenium-Login, Upload über die Oberfläche).
+
+Aufruf z.B.: python fake_fritzbox.py --port 8080 --ui js3 --latenz 0.05
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import hashlib
+import html
+import json
+import re
+import secrets
+import threading
+import time
+
+SID_UNGUELTIG = "0000000000000000"
+# PBKDF2-Parameter der Login-Challenge (echte Boxen nutzen deutlich mehr Iterationen)
+PBKDF2_ITERATIONEN = (1000, 100)
+UPLOAD_VERSION_MUSTER = re.compile(rb'newFWver=([\d.]+)')
+UPLOAD_SID_MUSTER = re.compile(rb'name="sid"\r\n\r\n([0-9a-f]{16})\r\n')
+UPLOAD_EXPORT_MUSTER = re.compile(rb'name="ConfigExport"\r\n\r\n([^\r]*)\r\n')
+
+STANDARD_NETZWERKE = [
+    ("FRITZ!Box 7530 XY", "2,4 GHz", "1", "3C:A6:2F:11:22:33", "80%"),
+    ("Nachbar-WLAN", "5 GHz", "36", "DC:39:6F:44:55:66", "45%"),
+    ("Gast", "2,4 GHz", "11", "E0:28:6D:77:88:99", "20%"),
+]
+
+STIL = """
+body { font-family: sans-serif; }
+#menu a, #submenu a { margin-right: 1em; }
+.dialog_content { border: 1px solid #888; padding: 1em; margin-top: 1em; }
+"""
+
+JS3_VIEW_SKRIPT = """
+// Baut die JS3-Struktur auf: #js3ContentBox (Shadow Root) → .js3-view (Shadow Root) → Inhalt
+function js3View() {
+    const box = document.querySelector('#js3ContentBox');
+    const shadow1 = box.shadowRoot || box.attachShadow({mode: 'open'});
+    const view = document.createElement('div');
+    view.className = 'js3-view';
+    shadow1.appendChild(view);
+    return {shadow1: shadow1, shadow2: view.attachShadow({mode: 'open'})};
+}
+"""
+
+
+class FakeFritzBox:
+    """
+    Simulierte FritzBox mit eigenem HTTP-Server (ThreadingHTTPServer, ein Thread pro Anfrage).
+    ui="classic" oder "js3" bestimmt die Oberfläche der Update-, Sicherungs- und WLAN-Seiten.
+    werkszustand=True startet mit Sprachauswahl, Login-Formular und "Informiert bleiben"-Dialog.
+    """
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1", name: str = "FRITZ!Box 7590",
+                 os_version: str = "07.59", firmware_praefix: str = "154", serial: str = "FAKE0000000001",
+                 passwort: str = "geheim", ui: str = "classic", werkszustand: bool = False,
+                 latenz: float = 0.0, latenzen: dict | None = None, neustart_dauer: float = 5.0,
+                 flash_dauer: float = 1.0, scan_dauer: float = 1.0, tasten_dauer: float = 2.0,
+                 netzwerke: list | None = None):
+        if ui not in ("classic", "js3"):
+            raise ValueError(f"Unbekannte Oberfläche: {ui}")
+        self.host = host
+        self.port = port
+        self.start_konfiguration = {"os_version": os_version, "werkszustand": werkszustand}
+        self.name = name
+        self.firmware_praefix = firmware_praefix
+        self.serial = serial
+        self.passwort = passwort
+        self.ui = ui
+        self.latenz = latenz
+        self.latenzen = latenzen or {}
+        self.neustart_dauer = neustart_dauer
+        self.flash_dauer = flash_dauer
+        self.scan_dauer = scan_dauer
+        self.tasten_dauer = tasten_dauer
+        self.netzwerke = netzwerke if netzwerke is not None else STANDARD_NETZWERKE
+
+        self.lock = threading.Lock()
+        self.anfragen = 0
+        self._server = None
+        self._thread = None
+        self.zuruecksetzen()
+
+    # ------------------------------------------------------------------ Zustand
+
+    def zuruecksetzen(self):
+        """Stellt den Ausgangszustand wieder her (z.B. zwischen zwei Benchmark-Runden)."""
+        with self.lock:
+            self.os_version = self.start_konfiguration["os_version"]
+            self.werkszustand = self.start_konfiguration["werkszustand"]
+            self.sprache_gewaehlt = not self.werkszustand
+            self.dialog_offen = False
+            self.sids = set()
+            self.letzte_challenge = None
+            # Von login_sid.lua gemeldete Login-Sperre in Sekunden (BlockTime)
+            self.sperrzeit = 0
+            self.offline_ab = None
+            self.offline_bis = None
+            self._nach_neustart = {}
+            # Zuletzt angenommener Firmware-Upload: {"version": ..., "export": Einstellungen vorher sichern?}
+            self.letzter_upload = None
+
+    def _zustand_aktualisieren(self):
+        """Wendet ausstehende Änderungen an, sobald ein simulierter Neustart vorbei ist (Aufruf unter Lock)."""
+        if self.offline_bis is not None and time.time() >= self.offline_bis:
+            for attribut, wert in self._nach_neustart.items():
+                setattr(self, attribut, wert)
+            self._nach_neustart = {}
+            self.offline_ab = self.offline_bis = None
+
+    def ist_offline(self) -> bool:
+        with self.lock:
+            self._zustand_aktualisieren()
+            return self.offline_ab is not None and time.time() >= self.offline_ab
+
+    def neustart_planen(self, verzoegerung: float, **nach_neustart):
+        """Die Box geht nach `verzoegerung` Sekunden für neustart_dauer offline und übernimmt danach `nach_neustart`."""
+        with self.lock:
+            self.offline_ab = time.time() + verzoegerung
+            self.offline_bis = self.offline_ab + self.neustart_dauer
+            self._nach_neustart = {"sids": set(), "dialog_offen": False, **nach_neustart}
+
+    def neue_sid(self) -> str:
+        sid = secrets.token_hex(8)
+        with self.lock:
+            self.sids.add(sid)
+        return sid
+
+    def sid_gueltig(self, sid: str | None) -> bool:
+        with self.lock:
+            return bool(sid) and sid in self.sids
+
+    def pruefe_antwort(self, challenge: str, antwort: str) -> bool:
+        """Prüft eine PBKDF2-Antwort ('salt2$hash2') auf die ausgegebene Challenge."""
+        _, iter1, salt1, iter2, salt2 = challenge.split("$")
+        hash1 = hashlib.pbkdf2_hmac("sha256", self.passwort.encode("utf-8"), bytes.fromhex(salt1), int(iter1))
+        hash2 = hashlib.pbkdf2_hmac("sha256", hash1, bytes.fromhex(salt2), int(iter2))
+        return antwort == f"{salt2}${hash2.hex()}"
+
+    def latenz_fuer(self, pfad: str) -> float:
+        return self.latenzen.get(pfad, self.latenz)
+
+    # ------------------------------------------------------------------ Server
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def starten(self) -> "FakeFritzBox":
+        """Startet den Server in einem Hintergrund-Thread; port=0 wählt einen freien Port."""
+        self._server = ThreadingHTTPServer((self.host, self.port), FakeFritzBoxHandler)
+        self._server.daemon_threads = True
+        self._server.box = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-fritzbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stoppen(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.starten()
+
+    def __exit__(self, *exc):
+        self.stoppen()
+
+
+class FakeFritzBoxHandler(BaseHTTPRequestHandler):
+    """Beantwortet die Anfragen einer FakeFritzBox (self.server.box)."""
+
+    server_version = "FakeFRITZ!Box"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # keine Zugriffszeilen auf der Konsole
+
+    @property
+    def box(self) -> FakeFritzBox:
+        return self.server.box
+
+    # ------------------------------------------------------------------ Hilfen
+
+    def _vorbereiten(self) -> bool:
+        """Latenz simulieren; während eines Neustarts 503 antworten. Gibt False zurück, wenn schon geantwortet wurde."""
+        teile = urlsplit(self.path)
+        self.pfad = teile.path
+        self.query = {k: v[0] for k, v in parse_qs(teile.query).items()}
+        with self.box.lock:
+            self.box.anfragen += 1
+        verzoegerung = self.box.latenz_fuer(self.pfad)
+        if verzoegerung:
+            time.sleep(verzoegerung)
+        if self.box.ist_offline():
+            self._senden(503, "Box startet neu", "text/plain")
+            return False
+        return True
+
+    def _cookie_sid(self) -> str | None:
+        for teil in (self.headers.get("Cookie") or "").split(";"):
+            name, _, wert = teil.strip().partition("=")
+            if name == "sid":
+                return wert
+        return None
+
+    def _sid(self) -> str | None:
+        """Gültige SID aus Query oder Cookie, sonst None."""
+        for sid in (self.query.get("sid"), self._cookie_sid()):
+            if self.box.sid_gueltig(sid):
+                return sid
+        return None
+
+    def _formular(self) -> dict:
+        laenge = int(self.headers.get("Content-Length") or 0)
+        daten = self.rfile.read(laenge).decode("utf-8", "replace") if laenge else ""
+        return {k: v[0] for k, v in parse_qs(daten).items()}
+
+    def _senden(self, status: int, body: str | bytes = b"", content_type: str = "text/html; charset=utf-8",
+                headers: dict | None = None):
+        daten = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(daten)))
+        self.send_header("Cache-Control", "no-store")
+        for name, wert in (headers or {}).items():
+            self.send_header(name, wert)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(daten)
+
+    def _weiterleiten(self, ziel: str = "/", sid: str | None = None):
+        headers = {"Location": ziel}
+        if sid:
+            headers["Set-Cookie"] = f"sid={sid}; Path=/"
+        self._senden(303, "", headers=headers)
+
+    def _seite(self, titel: str, inhalt: str, menu: bool = True, untermenu: bool = False, skript: str = "",
+               headers: dict | None = None):
+        menu_html = ""
+        if menu:
+            menu_html = ('<div id="menu"><a id="overview" href="/">Übersicht</a><a id="internet" href="/">Internet</a>'
+                         '<a id="home" href="/">Heimnetz</a><a id="wlan" href="/wlan">WLAN</a>'
+                         '<a id="sys" href="/system">System</a></div>')
+        if untermenu:
+            sicherung_id = ' id="mSave"' if self.box.ui == "classic" else ""
+            menu_html += ('<div id="submenu"><a id="mUp" href="/system/update">Update</a>'
+                          f'<a{sicherung_id} href="/system/save">Sicherung</a></div>')
+        self._senden(200, f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>{html.escape(titel)}</title><style>{STIL}</style></head>
+<body><div id="blueBarTitel">{html.escape(self.box.name)}</div>{menu_html}
+{inhalt}
+<script>{skript}</script></body></html>""", headers=headers)
+
+    # ------------------------------------------------------------------ Routing
+
+    def do_HEAD(self):
+        if self._vorbereiten():
+            self._senden(200 if self.pfad == "/" else 404, "")
+
+    def do_GET(self):
+        if not self._vorbereiten():
+            return
+        routen = {
+            "/": self._startseite,
+            "/login_sid.lua": self._login_sid_get,
+            "/jason_boxinfo.xml": self._boxinfo,
+            "/wlan": self._wlan,
+            "/wlan/chan": self._wlan_kanal,
+            "/system": self._system,
+            "/system/update": self._update,
+            "/system/update/file": self._update_datei,
+            "/system/save": self._sicherung,
+            "/system/save/default": self._werkseinstellungen,
+        }
+        route = routen.get(self.pfad)
+        if route is None:
+            self._senden(404, "Nicht gefunden", "text/plain")
+        elif self.pfad in ("/", "/login_sid.lua", "/jason_boxinfo.xml") or self._sid():
+            route()
+        else:
+            self._weiterleiten("/")
+
+    def do_POST(self):
+        if not self._vorbereiten():
+            return
+        routen = {
+            "/login_sid.lua": self._login_sid_post,
+            "/sprache": self._sprache_post,
+            "/login": self._login_post,
+            "/dialog": self._dialog_post,
+            "/cgi-bin/firmwarecfg": self._firmware_upload,
+            "/api/werkseinstellungen": self._werkseinstellungen_post,
+        }
+        route = routen.get(self.pfad)
+        if route is None:
+            self._senden(404, "Nicht gefunden", "text/plain")
+        else:
+            route()
+
+    # ------------------------------------------------------------------ Endpunkte ohne Oberfläche
+
+    def _session_info(self, sid: str, challenge: str = ""):
+        self._senden(200, f"""<?xml version="1.0" encoding="utf-8"?>
+<SessionInfo><SID>{sid}</SID><Challenge>{challenge}</Challenge><BlockTime>{self.box.sperrzeit}</BlockTime><Rights></Rights>
+<Users><User last="1">fritz1234</User></Users></SessionInfo>""", "text/xml; charset=utf-8")
+
+    def _neue_challenge(self) -> str:
+        iter1, iter2 = PBKDF2_ITERATIONEN
+        return f"2${iter1}${secrets.token_hex(16)}${iter2}${secrets.token_hex(16)}"
+
+    def _login_sid_get(self):
+        if self.query.get("logout"):
+            with self.box.lock:
+                self.box.sids.discard(self.query.get("sid"))
+            self._session_info(SID_UNGUELTIG, self._neue_challenge())
+            return
+        sid = self.query.get("sid")
+        if self.box.sid_gueltig(sid):
+            self._session_info(sid)
+            return
+        challenge = self._neue_challenge()
+        with self.box.lock:
+            self.box.letzte_challenge = challenge
+        self._session_info(SID_UNGUELTIG, challenge)
+
+    def _login_sid_post(self):
+        formular = self._formular()
+        challenge = self.box.letzte_challenge
+        if challenge and self.box.pruefe_antwort(challenge, formular.get("response", "")):
+            self._session_info(self.box.neue_sid())
+        else:
+            self._session_info(SID_UNGUELTIG, self._neue_challenge())
+
+    def _boxinfo(self):
+        box = self.box
+        self._senden(200, f"""<j:BoxInfo xmlns:j="http://jason.avm.de/updatecheck/">
+<j:Name>{html.escape(box.name)}</j:Name><j:HW>226</j:HW>
+<j:Version>{box.firmware_praefix}.{box.os_version}</j:Version><j:Revision>100000</j:Revision>
+<j:Serial>{box.serial}</j:Serial><j:OEM>avm</j:OEM><j:Lang>de</j:Lang>
+<j:Annex>B</j:Annex><j:Lab/><j:Country>049</j:Country><j:Flag>mesh_master</j:Flag>
+<j:UpdateConfig>2</j:UpdateConfig></j:BoxInfo>""", "text/xml; charset=utf-8")
+
+    def _firmware_upload(self):
+        """Nimmt den Upload gestreamt entgegen, liest Version (var/install) und SID und plant den Neustart."""
+        laenge = int(self.headers.get("Content-Length") or 0)
+        if not laenge:
+            self._senden(411, "Content-Length fehlt", "text/plain")
+            return
+        version, sid, export, rest, puffer = None, None, None, laenge, b""
+        while rest:
+            block = self.rfile.read(min(rest, 1024 * 1024))
+            if not block:
+                break
+            rest -= len(block)
+            puffer = puffer[-64:] + block
+            if sid is None and (treffer := UPLOAD_SID_MUSTER.search(puffer)):
+                sid = treffer.group(1).decode("ascii")
+            if version is None and (treffer := UPLOAD_VERSION_MUSTER.search(puffer)):
+                version = treffer.group(1).decode("ascii")
+            if export is None and (treffer := UPLOAD_EXPORT_MUSTER.search(puffer)):
+                export = bool(treffer.group(1))
+
+        if not (self.box.sid_gueltig(sid) or self._sid()):
+            self._senden(403, "Keine gültige Session", "text/plain")
+            return
+        if not version:
+            self._senden(400, "Kein gültiges Firmware-Image", "text/plain")
+            return
+        neue_version = ".".join(version.split(".")[-2:])
+        with self.box.lock:
+            self.box.letzter_upload = {"version": neue_version, "export": bool(export)}
+        self.box.neustart_planen(self.box.flash_dauer, os_version=neue_version)
+        self._senden(200, "<html><body><p>Das Update wird durchgeführt. Die FRITZ!Box startet neu.</p></body></html>")
+
+    # ------------------------------------------------------------------ Login und Dialoge
+
+    def _startseite(self):
+        box = self.box
+        if box.werkszustand and not box.sprache_gewaehlt:
+            self._seite("Sprache", """<form method="post" action="/sprache">
+<label><input type="radio" name="lang" id="uiLanguage-de" value="de"> Deutsch</label>
+<label><input type="radio" name="lang" id="uiLanguage-en" value="en"> English</label>
+<button type="submit" id="submitLangBtn">Übernehmen</button></form>""", menu=False)
+            return
+
+        sid = self._sid()
+        if not sid:
+            self._seite("Anmeldung", """<form method="post" action="/login">
+<label>Kennwort <input type="password" id="uiPass" name="password"></label>
+<button type="submit" id="submitLoginBtn">Anmelden</button></form>
+<div id="dialogFoot"><a href="/">Kennwort vergessen?</a></div>""", menu=False)
+            return
+
+        # Per URL übergebene SID (?sid=...) für die folgenden Seiten als Cookie setzen (Annahme, siehe Moduldoku)
+        headers = {"Set-Cookie": f"sid={sid}; Path=/"} if self.query.get("sid") else None
+        if box.dialog_offen:
+            inhalt = """<div id="content"><h1>Informiert bleiben</h1>
+<div><p>Möchten Sie über neue FRITZ!OS-Versionen informiert werden?</p></div>
+<div><button type="button" onclick="fetch('/dialog', {method: 'POST'}).then(() => location.href = '/')">Später</button></div>
+</div>"""
+            self._seite("Informiert bleiben", inhalt, menu=False, headers=headers)
+            return
+
+        self._seite("Übersicht", f'<div id="content"><div class="boxInfo"><span>{html.escape(box.name)}</span>'
+                                 f'</div><p>FRITZ!OS {box.os_version}</p></div>', headers=headers)
+
+    def _sprache_post(self):
+        self._formular()
+        with self.box.lock:
+            self.box.sprache_gewaehlt = True
+        self._weiterleiten("/")
+
+    def _login_post(self):
+        formular = self._formular()
+        if formular.get("password") != self.box.passwort:
+            self._weiterleiten("/")
+            return
+        with self.box.lock:
+            # Nach den Werkseinstellungen folgt auf den ersten Login der "Informiert bleiben"-Dialog
+            self.box.dialog_offen = self.box.werkszustand
+            self.box.werkszustand = False
+        self._weiterleiten("/", sid=self.box.neue_sid())
+
+    def _dialog_post(self):
+        self._formular()
+        with self.box.lock:
+            self.box.dialog_offen = False
+        self._senden(204)
+
+    # ------------------------------------------------------------------ Oberfläche
+
+    def _system(self):
+        if self.box.ui == "js3":
+            # JS3: Kachel "Werkseinstellungen" → Dialog mit kritischem Button → nach Tastendruck OK-Button
+            skript = JS3_VIEW_SKRIPT + f"""
+const ansicht = js3View();
+const tile = document.createElement('js3-tile');
+tile.setAttribute('ta-id', 'ag6vu9');
+// Beschriftung im eigenen Shadow Root der Kachel (textContent des Hosts ist leer)
+tile.attachShadow({{mode: 'open'}}).innerHTML =
+    '<style>:host {{ display: inline-block; padding: 1em; }}</style><span>Werkseinstellungen</span>';
+ansicht.shadow2.appendChild(tile);
+const js3dialog = document.createElement('js3-dialog');
+ansicht.shadow1.appendChild(js3dialog);
+tile.addEventListener('click', () => {{
+    const dialog = document.createElement('dialog');
+    const rahmen = document.createElement('div');
+    const view = document.createElement('js3-view');
+    rahmen.appendChild(view);
+    dialog.appendChild(rahmen);
+    js3dialog.appendChild(dialog);
+    dialog.setAttribute('open', '');
+    const shadow3 = view.attachShadow({{mode: 'open'}});
+    const kritisch = document.createElement('js3-button');
+    kritisch.setAttribute('level', 'critical');
+    kritisch.textContent = 'Werkseinstellungen laden';
+    shadow3.appendChild(kritisch);
+    kritisch.addEventListener('click', () => {{
+        const hinweis = document.createElement('p');
+        hinweis.textContent = 'Bitte drücken Sie jetzt eine beliebige Taste an der FRITZ!Box.';
+        shadow3.appendChild(hinweis);
+        setTimeout(() => {{
+            const ok = document.createElement('button');
+            ok.title = 'OK';
+            ok.textContent = 'OK';
+            ok.addEventListener('click', () => fetch('/api/werkseinstellungen', {{method: 'POST'}}));
+            ansicht.shadow1.appendChild(ok);
+        }}, {int(self.box.tasten_dauer * 1000)});
+    }});
+}});
+"""
+            self._seite("System", '<div id="js3ContentBox"></div>', untermenu=True, skript=skript)
+        else:
+            self._seite("System", '<div id="content"><p>System</p></div>', untermenu=True)
+
+    def _update(self):
+        box = self.box
+        if box.ui == "js3":
+            skript = JS3_VIEW_SKRIPT + f"""
+const ansicht = js3View();
+const input = document.createElement('input');
+input.name = 'fritzOsVersion';
+input.readOnly = true;
+input.value = '{box.os_version}';
+ansicht.shadow2.appendChild(input);
+"""
+            self._seite("Update", '<div id="js3ContentBox"></div>'
+                                  '<a id="userUp" href="/system/update/file">FRITZ!OS-Datei</a>',
+                        untermenu=True, skript=skript)
+        else:
+            self._seite("Update", f'<div id="content"><div><div>FRITZ!OS: <span class="version_text">'
+                                  f'{box.os_version}</span></div></div>'
+                                  '<a id="userUp" href="/system/update/file">FRITZ!OS-Datei</a></div>',
+                        untermenu=True)
+
+    def _update_datei(self):
+        self._seite("FRITZ!OS-Datei", f"""<div id="content">
+<form method="post" action="/cgi-bin/firmwarecfg" enctype="multipart/form-data">
+<input type="hidden" name="sid" value="{self._sid()}">
+<input type="hidden" name="ImportExportPassword" value="">
+<input type="hidden" name="ConfigExport" id="uiConfigExport" value="1">
+<label><input type="checkbox" id="uiExportCheck" checked> Einstellungen vorher sichern</label>
+<input type="file" id="uiFile" name="UploadFile">
+<button type="submit" id="uiUpdate">Update starten</button></form></div>""", untermenu=True, skript="""
+document.querySelector('#uiExportCheck').addEventListener('change', e => {
+    document.querySelector('#uiConfigExport').value = e.target.checked ? '1' : '';
+});""")
+
+    def _sicherung(self):
+        self._seite("Sicherung", '<div id="content"><a id="default" href="/system/save/default">'
+                                 'Werkseinstellungen</a></div>', untermenu=True)
+
+    def _werkseinstellungen(self):
+        """Klassischer Reset: Button → Bestätigung (Button1) → nach simuliertem Tastendruck OK-Button."""
+        skript = f"""
+function bestaetigen() {{
+    const dialog = document.querySelector('.dialog_content');
+    dialog.innerHTML = '<p>Bitte drücken Sie jetzt eine beliebige Taste an der FRITZ!Box.</p>';
+    setTimeout(() => {{
+        const ok = document.createElement('button');
+        ok.textContent = 'OK';
+        ok.addEventListener('click', () => fetch('/api/werkseinstellungen', {{method: 'POST'}}));
+        dialog.appendChild(ok);
+    }}, {int(self.box.tasten_dauer * 1000)});
+}}
+document.querySelector('#uiDefaults').addEventListener('click', () => {{
+    const dialog = document.createElement('div');
+    dialog.className = 'dialog_content';
+    dialog.innerHTML = '<p>Alle Einstellungen gehen verloren.</p><button id="Button1">OK</button>';
+    document.body.appendChild(dialog);
+    document.querySelector('#Button1').addEventListener('click', bestaetigen);
+}});
+"""
+        self._seite("Werkseinstellungen", '<div id="content"><div><p>Werkseinstellungen laden</p></div>'
+                                          '<div><button id="uiDefaults">Werkseinstellungen laden</button></div></div>',
+                    untermenu=True, skript=skript)
+
+    def _werkseinstellungen_post(self):
+        self._formular()
+        if not self._sid():
+            self._senden(403, "Keine gültige Session", "text/plain")
+            return
+        self.box.neustart_planen(0.5, werkszustand=True, sprache_gewaehlt=False)
+        self._senden(204)
+
+    def _wlan(self):
+        self._seite("WLAN", '<div id="content"><a id="chan" href="/wlan/chan">Funkkanal</a></div>')
+
+    def _wlan_kanal(self):
+        """Scan-Ergebnisse erscheinen nach scan_dauer – klassisch als Tabelle, in JS3 als flexRow-Liste."""
+        zeilen = []
+        for name, band, kanal, mac, signal in self.box.netzwerke:
+            name, band, mac = html.escape(name), html.escape(band), html.escape(mac)
+            if self.box.ui == "js3":
+                zeilen.append(f'<div class="flexRow"><div prefid="rssi" title="{signal}"></div>'
+                              f'<div prefid="name">{name}</div><div prefid="band">{band}</div>'
+                              f'<div prefid="channel">{kanal}</div><div prefid="mac">{mac}</div></div>')
+            else:
+                zeilen.append(f'<tr><td title="{signal}"></td><td>{name}</td><td>{band}</td>'
+                              f'<td>{mac}</td><td>{kanal}</td></tr>')
+        if self.box.ui == "js3":
+            ziel, inhalt = "#uiScanResult", '<div id="uiScanResult"></div>'
+        else:
+            ziel, inhalt = "#uiScanResultBody", '<table><tbody id="uiScanResultBody"></tbody></table>'
+        skript = f"""
+setTimeout(() => {{
+    document.querySelector('{ziel}').innerHTML = {json.dumps("".join(zeilen))};
+}}, {int(self.box.scan_dauer * 1000)});
+"""
+        self._seite("Funkkanal", f'<div id="content">{inhalt}</div>', skript=skript)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokale Fake-FritzBox für Tests und Benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--name", default="FRITZ!Box 7590", help="Produktname, bestimmt das Modell")
+    parser.add_argument("--version", default="07.59", help="FRITZ!OS-Version beim Start")
+    parser.add_argument("--passwort", default="geheim")
+    parser.add_argument("--ui", choices=("classic", "js3"), default="classic")
+    parser.add_argument("--werkszustand", action="store_true", help="mit Sprachauswahl und Erstdialogen starten")
+    parser.add_argument("--latenz", type=float, default=0.0, help="Verzögerung pro Anfrage in Sekunden")
+    parser.add_argument("--neustart", type=float, default=5.0, help="Dauer eines Neustarts in Sekunden")
+    args = parser.parse_args()
+
+    box = FakeFritzBox(port=args.port, host=args.host, name=args.name, os_version=args.version,
+                       passwort=args.passwort, ui=args.ui, werkszustand=args.werkszustand,
+                       latenz=args.latenz, neustart_dauer=args.neustart).starten()
+    print(f"🧪 Fake-FritzBox ({args.ui}) läuft unter {box.url} – Abbruch mit Strg+C.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        box.stoppen()
+
+
+if __name__ == "__main__":
+    main()
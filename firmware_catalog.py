@@ -0,0 +1,141 @@
+# firmware_catalog.py
+import json
+import os
+import re
+import tarfile
+from pathlib import Path
+
+from fritz_boxinfo import modell_aus_name, version_aus_boxinfo
+
+KATALOG_CACHE_NAME = ".firmware_index.json"
+KATALOG_FORMAT = 2
+
+# z.B. FRITZ.Box_7590-07.59.image, FRITZ.Box_7590-AX-08.02.image, FRITZ.Box_6660_Cable-08.03.image
+DATEINAME_MUSTER = re.compile(r'FRITZ\.Box_(\d{4,})[-_]?(AX|Cable|LTE)?[-_](\d{1,2}\.\d{2})', re.IGNORECASE)
+# Versionszeile im Installationsskript des Images, z.B. newFWver=154.07.29
+INSTALL_VERSION_MUSTER = re.compile(rb'newFWver=([\d.]+)')
+# Produktname des Zielgeräts im Installationsskript (Hardware-Prüfung), z.B. "FRITZ!Box 7590 AX"
+INSTALL_PRODUKT_MUSTER = re.compile(rb'FRITZ!Box[ _](\d{4,})(?:[ _](AX|Cable|LTE)\b)?', re.IGNORECASE)
+# Nur kleine Metadaten-Dateien aus dem Archiv lesen
+MAX_METADATEN_GROESSE = 256 * 1024
+
+
+def lese_image_info(pfad: Path) -> dict | None:
+    """
+    Liest Modell und Version eines .image (tar-Archiv). Es werden nur die tar-Header
+    und das kleine Installationsskript gelesen, nie die eigentlichen Kernel-/Dateisystem-Daten.
+    Modell und Version kommen aus var/install; der Dateiname dient nur als Rückfall
+    (umbenannte Images werden so trotzdem dem richtigen Modell zugeordnet).
+    """
+    modell, version = None, None
+    mitglieder = []
+    try:
+        with tarfile.open(pfad, "r:") as tar:
+            for mitglied in tar:
+                mitglieder.append(mitglied.name)
+                if mitglied.name.endswith("var/install") and mitglied.size <= MAX_METADATEN_GROESSE:
+                    inhalt = tar.extractfile(mitglied).read()
+                    treffer = INSTALL_VERSION_MUSTER.search(inhalt)
+                    if treffer:
+                        version = version_aus_boxinfo(treffer.group(1).decode("ascii")) or version
+                    treffer = INSTALL_PRODUKT_MUSTER.search(inhalt)
+                    if treffer:
+                        nummer, variante = (g.decode("ascii") if g else "" for g in treffer.groups())
+                        modell, _ = modell_aus_name(f"{nummer} {variante}")
+    except (tarfile.TarError, OSError) as e:
+        print(f"⚠️ Firmware-Image {pfad.name} nicht lesbar: {e}")
+        return None
+
+    match = DATEINAME_MUSTER.search(pfad.name)
+    if match and not (modell and version):
+        nummer, variante, datei_version = match.groups()
+        modell = modell or modell_aus_name(f"{nummer} {variante or ''}")[0]
+        version = version or datei_version
+
+    if not modell or not version:
+        return None
+    return {"modell": modell, "version": version, "mitglieder": mitglieder}
+
+
+class FirmwareKatalog:
+    """
+    Index aller Firmware-Images eines Verzeichnisses nach (Modell, Version).
+    Der Index wird in einer kleinen JSON-Datei zwischengespeichert; beim Aktualisieren werden
+    nur neue oder geänderte Dateien (Größe/mtime) erneut gelesen.
+    """
+
+    def __init__(self, verzeichnis: Path, cache_datei: Path | None = None):
+        self.verzeichnis = Path(verzeichnis)
+        self.cache_datei = Path(cache_datei) if cache_datei else self.verzeichnis / KATALOG_CACHE_NAME
+        self._dateien = {}
+        self._index = {}
+        self._nach_modell = {}
+        self._lade_cache()
+
+    def _lade_cache(self):
+        try:
+            daten = json.loads(self.cache_datei.read_text(encoding="utf-8"))
+            if daten.get("format") == KATALOG_FORMAT:
+                self._dateien = daten.get("dateien", {})
+        except (OSError, ValueError):
+            self._dateien = {}
+
+    def _speichere_cache(self):
+        try:
+            tmp = self.cache_datei.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"format": KATALOG_FORMAT, "dateien": self._dateien}, indent=1),
+                           encoding="utf-8")
+            os.replace(tmp, self.cache_datei)
+        except OSError as e:
+            print(f"⚠️ Firmware-Index konnte nicht gespeichert werden: {e}")
+
+    def aktualisieren(self) -> int:
+        """Gleicht den Index mit dem Verzeichnis ab. Gibt die Anzahl neu gelesener Images zurück."""
+        if not self.verzeichnis.is_dir():
+            self._dateien, self._index, self._nach_modell = {}, {}, {}
+            return 0
+
+        neu_gelesen = 0
+        gefunden = {}
+        for eintrag in os.scandir(self.verzeichnis):
+            if not eintrag.is_file() or not eintrag.name.lower().endswith(".image"):
+                continue
+            stat = eintrag.stat()
+            alt = self._dateien.get(eintrag.name)
+            if alt and alt["groesse"] == stat.st_size and alt["mtime"] == stat.st_mtime:
+                gefunden[eintrag.name] = alt
+                continue
+            info = lese_image_info(Path(eintrag.path))
+            neu_gelesen += 1
+            if info:
+                gefunden[eintrag.name] = {"groesse": stat.st_size, "mtime": stat.st_mtime, **info}
+
+        geaendert = neu_gelesen or gefunden.keys() != self._dateien.keys()
+        self._dateien = gefunden
+        self._index = {(e["modell"], e["version"]): self.verzeichnis / name for name, e in gefunden.items()}
+        self._nach_modell = {}
+        for modell, version in self._index:
+            self._nach_modell.setdefault(modell, []).append(version)
+        for versionen in self._nach_modell.values():
+            versionen.sort(key=lambda v: tuple(int(x) for x in v.split(".")))
+        if geaendert:
+            print(f"📚 Firmware-Katalog: {len(gefunden)} Images ({neu_gelesen} neu eingelesen).")
+            self._speichere_cache()
+        return neu_gelesen
+
+    def pfade(self) -> list[Path]:
+        """Pfade aller katalogisierten Images."""
+        return list(self._index.values())
+
+    def finden(self, modell: str, version: str) -> Path | None:
+        """Pfad des Images für genau dieses Modell und diese Version."""
+        return self._index.get((modell, version))
+
+    def versionen(self, modell: str) -> list[str]:
+        """Alle verfügbaren Versionen eines Modells, aufsteigend sortiert."""
+        return list(self._nach_modell.get(modell, []))
+
+    def neueste(self, modell: str) -> Path | None:
+        """Pfad des Images mit der höchsten Version für dieses Modell."""
+        versionen = self.versionen(modell)
+        return self._index[(modell, versionen[-1])] if versionen else None
@@ -0,0 +1,159 @@
+# firmware_integrity.py
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import mmap
+import os
+import tarfile
+import threading
+from pathlib import Path
+
+PRUEFSUMMEN_CACHE_NAME = ".firmware_pruefsummen.json"
+SHA256SUMS_NAME = "SHA256SUMS"
+HASH_CHUNK_GROESSE = 4 * 1024 * 1024
+TAR_BLOCK = 512
+
+
+def sha256_datei(pfad: Path) -> str:
+    """Berechnet SHA-256 einer Datei über eine Speicherabbildung in festen Blöcken (ohne die Datei komplett zu lesen)."""
+    h = hashlib.sha256()
+    with open(pfad, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as ansicht:
+                for pos in range(0, len(ansicht), HASH_CHUNK_GROESSE):
+                    h.update(ansicht[pos:pos + HASH_CHUNK_GROESSE])
+    return h.hexdigest()
+
+
+def erwartete_pruefsumme(pfad: Path) -> str | None:
+    """Referenz-Prüfsumme aus '<image>.sha256' oder 'SHA256SUMS' im selben Verzeichnis, falls vorhanden."""
+    einzeln = pfad.with_name(pfad.name + ".sha256")
+    try:
+        if einzeln.is_file():
+            return einzeln.read_text(encoding="utf-8").split()[0].lower()
+        liste = pfad.with_name(SHA256SUMS_NAME)
+        if liste.is_file():
+            for zeile in liste.read_text(encoding="utf-8").splitlines():
+                teile = zeile.split()
+                if len(teile) == 2 and teile[1].lstrip("*") == pfad.name:
+                    return teile[0].lower()
+    except (OSError, IndexError):
+        pass
+    return None
+
+
+def tar_vollstaendig(pfad: Path) -> str | None:
+    """
+    Prüft die tar-Struktur des Images nur anhand der Header.
+    Gibt None zurück, wenn das Archiv vollständig ist, sonst den Grund.
+    """
+    groesse = pfad.stat().st_size
+    try:
+        with tarfile.open(pfad, "r:") as tar:
+            mitglieder = 0
+            for mitglied in tar:
+                mitglieder += 1
+                ende = mitglied.offset_data + (-(-mitglied.size // TAR_BLOCK)) * TAR_BLOCK
+                if ende > groesse:
+                    return f"'{mitglied.name}' reicht über das Dateiende hinaus"
+            if not mitglieder:
+                return "Archiv ist leer"
+            # Nach dem letzten Mitglied müssen zwei leere Blöcke (Archivende) folgen
+            if groesse < tar.offset + 2 * TAR_BLOCK:
+                return "Archivende fehlt"
+    except (tarfile.TarError, OSError) as e:
+        return f"tar-Struktur ungültig ({e})"
+    return None
+
+
+class FirmwarePruefer:
+    """
+    Prüft Firmware-Images auf Vollständigkeit (tar-Struktur und ggf. Referenz-SHA-256).
+    Gehasht wird nur, wenn eine Referenz ('<image>.sha256' oder SHA256SUMS) vorliegt.
+    Ergebnisse werden nach Pfad, Größe und mtime zwischengespeichert, unveränderte Dateien
+    also nie erneut gehasht. Die Prüfung kann beim Start im Hintergrund angestoßen werden.
+    """
+
+    def __init__(self, verzeichnis: Path, max_worker: int = 2):
+        self.cache_datei = Path(verzeichnis) / PRUEFSUMMEN_CACHE_NAME
+        self._pool = ThreadPoolExecutor(max_workers=max_worker, thread_name_prefix="firmware-pruefung")
+        self._lock = threading.Lock()
+        self._laufend = {}
+        try:
+            self._cache = json.loads(self.cache_datei.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def _aus_cache(self, pfad: Path, stat) -> dict | None:
+        eintrag = self._cache.get(str(pfad))
+        if eintrag and eintrag["groesse"] == stat.st_size and eintrag["mtime"] == stat.st_mtime:
+            # Referenz seit der Prüfung hinzugekommen oder geändert → erneut prüfen
+            if eintrag.get("referenz") != erwartete_pruefsumme(pfad):
+                return None
+            return eintrag
+        return None
+
+    def _pruefen(self, pfad: Path) -> dict:
+        stat = pfad.stat()
+        with self._lock:
+            eintrag = self._aus_cache(pfad, stat)
+        if eintrag:
+            return eintrag
+
+        grund = tar_vollstaendig(pfad)
+        erwartet = erwartete_pruefsumme(pfad)
+        # Ohne Referenz gibt es nichts zu vergleichen – dann nicht das ganze Image hashen
+        digest = sha256_datei(pfad) if erwartet and grund is None else None
+        if digest and erwartet != digest:
+            grund = "SHA-256 stimmt nicht mit der Referenz überein"
+
+        eintrag = {"groesse": stat.st_size, "mtime": stat.st_mtime, "sha256": digest, "referenz": erwartet,
+                   "ok": grund is None, "grund": grund}
+        with self._lock:
+            self._cache[str(pfad)] = eintrag
+            self._speichern()
+        return eintrag
+
+    def _speichern(self):
+        try:
+            tmp = self.cache_datei.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._cache, indent=1), encoding="utf-8")
+            os.replace(tmp, self.cache_datei)
+        except OSError as e:
+            print(f"⚠️ Prüfsummen-Cache konnte nicht gespeichert werden: {e}")
+
+    def _future(self, pfad: Path):
+        with self._lock:
+            future = self._laufend.get(pfad)
+            # Abgeschlossenes Ergebnis nur übernehmen, wenn sich die Datei seitdem nicht geändert hat
+            if future is not None and future.done():
+                if future.exception() or not self._aus_cache(pfad, pfad.stat()):
+                    future = None
+            if future is None:
+                future = self._pool.submit(self._pruefen, pfad)
+                self._laufend[pfad] = future
+            return future
+
+    def im_hintergrund_pruefen(self, pfade):
+        """Stößt die Prüfung mehrerer Images im Thread-Pool an, ohne zu warten."""
+        for pfad in pfade:
+            try:
+                self._future(Path(pfad))
+            except OSError:
+                pass
+
+    def ist_intakt(self, pfad) -> bool:
+        """Wartet auf das (ggf. bereits laufende) Prüfergebnis und gibt True zurück, wenn das Image intakt ist."""
+        pfad = Path(pfad)
+        try:
+            eintrag = self._future(pfad).result()
+        except Exception as e:
+            print(f"❌ Firmware-Image {pfad.name} konnte nicht geprüft werden: {e}")
+            return False
+        if not eintrag["ok"]:
+            print(f"❌ Firmware-Image {pfad.name} ist beschädigt: {eintrag['grund']}")
+        elif not eintrag.get("referenz"):
+            print(f"⚠️ Keine Referenz-Prüfsumme für {pfad.name} – nur die tar-Struktur wurde geprüft.")
+        return eintrag["ok"]
@@ -0,0 +1,113 @@
+# firmware_planner.py
+from collections import deque
+import re
+
+
+class FritzOSVersion:
+    """
+    FRITZ!OS-Version als vergleichbares (Major, Minor)-Paar.
+    Versteht u.a. "07.29", "7.29", "FRITZ!OS 7.29", "154.07.29" und Labor-Suffixe wie "07.29-101234".
+    """
+
+    MUSTER = re.compile(r'(?:\d+\.)?(\d{1,2})\.(\d{1,2})(?:-\d+)?\s*$')
+
+    def __init__(self, major: int, minor: int):
+        self.major = major
+        self.minor = minor
+
+    @classmethod
+    def parse(cls, text) -> "FritzOSVersion | None":
+        if isinstance(text, FritzOSVersion):
+            return text
+        match = cls.MUSTER.search(str(text or "").strip())
+        if not match:
+            return None
+        return cls(int(match.group(1)), int(match.group(2)))
+
+    def _schluessel(self):
+        return self.major, self.minor
+
+    def __eq__(self, other):
+        return isinstance(other, FritzOSVersion) and self._schluessel() == other._schluessel()
+
+    def __lt__(self, other):
+        return self._schluessel() < other._schluessel()
+
+    def __le__(self, other):
+        return self._schluessel() <= other._schluessel()
+
+    def __hash__(self):
+        return hash(self._schluessel())
+
+    def __str__(self):
+        return f"{self.major:02d}.{self.minor:02d}"
+
+    def __repr__(self):
+        return f"FritzOSVersion({self})"
+
+
+class UpgradePlaner:
+    """
+    Modelliert die erlaubten Update-Sprünge je Modell als Graph und berechnet den kürzesten
+    Update-Pfad (gemessen in Neustarts) von der aktuellen zur Zielversion.
+    Ein Sprung ist ein Image mit Zielversion und optionaler Mindest-Ausgangsversion.
+    """
+
+    def __init__(self, spruenge: dict[str, list[tuple[str, str | None]]], ziele: dict[str, str]):
+        self.spruenge = {
+            modell: [(FritzOSVersion.parse(ziel), FritzOSVersion.parse(ab) if ab else None) for ziel, ab in liste]
+            for modell, liste in spruenge.items()
+        }
+        self.ziele = {modell: FritzOSVersion.parse(ziel) for modell, ziel in ziele.items()}
+
+    @classmethod
+    def aus_mapping(cls, firmware_mapping: dict) -> "UpgradePlaner":
+        """
+        Baut den Planer aus FirmwareManager.firmware_mapping:
+        'bridge' ist von jeder Version aus erreichbar, 'final' ab 'final_ab' (falls angegeben).
+        """
+        spruenge, ziele = {}, {}
+        for modell, eintrag in firmware_mapping.items():
+            liste = []
+            if eintrag.get("bridge"):
+                liste.append((eintrag["bridge"], eintrag.get("bridge_ab")))
+            if eintrag.get("final"):
+                liste.append((eintrag["final"], eintrag.get("final_ab")))
+                ziele[modell] = eintrag["final"]
+            spruenge[modell] = liste
+        return cls(spruenge, ziele)
+
+    def plane(self, modell: str, aktuell, ziel=None) -> list[str] | None:
+        """
+        Liefert die zu flashenden Versionen in Reihenfolge ([] = bereits aktuell)
+        oder None, wenn für das Modell keine Regel existiert oder das Ziel unerreichbar ist.
+        Eine unbekannte aktuelle Version wird wie die älteste mögliche behandelt.
+        """
+        if modell not in self.spruenge:
+            return None
+        ziel = FritzOSVersion.parse(ziel) if ziel else self.ziele.get(modell)
+        if ziel is None:
+            return None
+        start = FritzOSVersion.parse(aktuell) or FritzOSVersion(0, 0)
+        if ziel <= start:
+            return []
+
+        # Breitensuche: jede Kante ist ein Flash-Vorgang (= ein Neustart)
+        vorgaenger = {start: None}
+        warteschlange = deque([start])
+        while warteschlange:
+            version = warteschlange.popleft()
+            if version == ziel:
+                pfad = []
+                while version != start:
+                    pfad.append(str(version))
+                    version = vorgaenger[version]
+                return pfad[::-1]
+            for sprung_ziel, ab in self.spruenge[modell]:
+                if sprung_ziel in vorgaenger or sprung_ziel <= version or sprung_ziel > ziel:
+                    continue
+                if ab is not None and version < ab:
+                    continue
+                vorgaenger[sprung_ziel] = version
+                warteschlange.append(sprung_ziel)
+        return None
@@ -0,0 +1,77 @@
+# fritz_boxinfo.py
+import re
+import xml.etree.ElementTree as ET
+
+# Unauthentifizierte Info-Endpunkte der Box, in dieser Reihenfolge versucht
+BOXINFO_PFADE = ["/jason_boxinfo.xml", "/juis_boxinfo.xml"]
+
+
+def modell_aus_name(name: str) -> tuple[str | None, str | None]:
+    """
+    Leitet Modell-Schlüssel und Variante aus dem Produktnamen ab,
+    z.B. "FRITZ!Box 7590 AX" → ("7590_AX", "AX"), "FRITZ!Box 6890 LTE" → ("6890_LTE", "LTE").
+    Die Schlüssel entsprechen denen aus FritzBox._extract_model_number bzw. der Firmware-Zuordnung.
+    """
+    match = re.search(r'(\d{4,})', name or "")
+    if not match:
+        return None, None
+    nummer = match.group(1)
+    variante = None
+    for kandidat in ("AX", "LTE", "Cable"):
+        if re.search(rf'\b{kandidat}\b', name, re.IGNORECASE):
+            variante = kandidat
+            break
+    if variante == "LTE" or int(nummer) == 6890:
+        return f"{nummer}_LTE", "LTE"
+    if variante == "AX":
+        return f"{nummer}_AX", variante
+    return nummer, variante
+
+
+def version_aus_boxinfo(version: str) -> str | None:
+    """Wandelt die Boxinfo-Version (z.B. "154.07.29") in die FRITZ!OS-Version ("07.29") um."""
+    match = re.search(r'(\d{1,2})\.(\d{2})(?:-\d+)?$', (version or "").strip())
+    if not match:
+        return None
+    return f"{int(match.group(1)):02d}.{match.group(2)}"
+
+
+def parse_boxinfo(xml_text: str) -> dict | None:
+    """Parst jason_boxinfo.xml / juis_boxinfo.xml (Namespaces werden ignoriert)."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError:
+        return None
+    felder = {element.tag.split('}')[-1]: (element.text or "").strip() for element in root.iter()}
+    name = felder.get("Name", "")
+    modell, variante = modell_aus_name(name)
+    if not modell:
+        return None
+    return {
+        "name": name,
+        "box_model": modell,
+        "variante": variante,
+        "os_version": version_aus_boxinfo(felder.get("Version", "")),
+        "serial": felder.get("Serial") or None,
+        "hw": felder.get("HW") or None,
+        "oem": felder.get("OEM") or None,
+    }
+
+
+def hole_boxinfo(http, url: str, sid: str | None = None, timeout: float = 3) -> dict | None:
+    """
+    Liest Modell, Variante, Seriennummer und FRITZ!OS-Version in einer Anfrage vom Info-Endpunkt der Box.
+    Gibt None zurück, wenn keiner der Endpunkte verwertbare Daten liefert.
+    """
+    params = {"sid": sid} if sid else None
+    for pfad in BOXINFO_PFADE:
+        try:
+            r = http.get(f"{url}{pfad}", timeout=timeout, params=params)
+            if r.status_code != 200:
+                continue
+            info = parse_boxinfo(r.text)
+            if info:
+                return info
+        except Exception:
+            continue
+    return None
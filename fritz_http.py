@@ -0,0 +1,54 @@
+# fritz_http.py
+import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+
+# Die Boxen werden per HTTP/selbstsigniertem HTTPS angesprochen – keine Zertifikatswarnungen ausgeben
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+class FritzHttpClient:
+    """
+    HTTP-Client für allen Nicht-Browser-Verkehr zu einer FritzBox.
+    Hält die Verbindungen per Keep-Alive offen (Connection-Pool) und bietet
+    günstige Lebenszeichen-Prüfungen per HEAD statt eines vollen GET der Startseite.
+    """
+
+    def __init__(self, timeout: float = 10, timeout_erreichbarkeit: float = 3, pool_groesse: int = 8):
+        self.timeout = timeout
+        self.timeout_erreichbarkeit = timeout_erreichbarkeit
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = HTTPAdapter(pool_connections=pool_groesse, pool_maxsize=pool_groesse, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def ist_erreichbar(self, url: str, timeout: float | None = None) -> bool:
+        """
+        Prüft, ob unter der URL eine FritzBox antwortet (Status 200).
+        Nutzt HEAD; lehnt die Box HEAD ab, wird ein GET ohne Body-Download gemacht.
+        """
+        timeout = timeout if timeout is not None else self.timeout_erreichbarkeit
+        try:
+            r = self.session.head(url, timeout=timeout, allow_redirects=False)
+            if r.status_code == 200:
+                return True
+            if r.status_code not in (400, 404, 405, 501):
+                return False
+            # HEAD nicht unterstützt → GET, aber nur die Header lesen
+            with self.session.get(url, timeout=timeout, allow_redirects=False, stream=True) as r:
+                return r.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def get(self, url: str, timeout: float | None = None, **kwargs) -> requests.Response:
+        """GET über die gepoolte Session mit konfigurierbarem Timeout."""
+        return self.session.get(url, timeout=timeout if timeout is not None else self.timeout, **kwargs)
+
+    def post(self, url: str, timeout: float | None = None, **kwargs) -> requests.Response:
+        """POST über die gepoolte Session mit konfigurierbarem Timeout."""
+        return self.session.post(url, timeout=timeout if timeout is not None else self.timeout, **kwargs)
+
+    def schliessen(self):
+        """Schließt alle offenen Verbindungen."""
+        self.session.close()
@@ -0,0 +1,108 @@
+# fritz_sid.py
+import hashlib
+import time
+import xml.etree.ElementTree as ET
+
+SID_UNGUELTIG = "0000000000000000"
+
+
+class SidLoginAbgelehnt(Exception):
+    """Die Box hat das Passwort abgelehnt."""
+
+    def __init__(self, meldung: str, block_time: int = 0):
+        super().__init__(meldung)
+        self.block_time = block_time
+
+
+class SidLoginGesperrt(Exception):
+    """Die Box sperrt Logins länger als erlaubt – über das Passwort ist damit nichts gesagt."""
+
+    def __init__(self, meldung: str, block_time: int):
+        super().__init__(meldung)
+        self.block_time = block_time
+
+
+def _md5_antwort(challenge: str, passwort: str) -> str:
+    """Challenge-Response nach altem MD5-Verfahren (FRITZ!OS < 7.24)."""
+    # Zeichen außerhalb von Latin-1 werden laut AVM durch '.' ersetzt
+    passwort = "".join(c if ord(c) < 256 else "." for c in passwort)
+    digest = hashlib.md5(f"{challenge}-{passwort}".encode("utf-16le")).hexdigest()
+    return f"{challenge}-{digest}"
+
+
+def _pbkdf2_antwort(challenge: str, passwort: str) -> str:
+    """Challenge-Response nach PBKDF2-Verfahren (FRITZ!OS ab 7.24, Challenge '2$iter1$salt1$iter2$salt2')."""
+    _, iter1, salt1, iter2, salt2 = challenge.split("$")
+    hash1 = hashlib.pbkdf2_hmac("sha256", passwort.encode("utf-8"), bytes.fromhex(salt1), int(iter1))
+    hash2 = hashlib.pbkdf2_hmac("sha256", hash1, bytes.fromhex(salt2), int(iter2))
+    return f"{salt2}${hash2.hex()}"
+
+
+def berechne_antwort(challenge: str, passwort: str) -> str:
+    """Berechnet die Antwort auf die Login-Challenge der Box (PBKDF2 oder MD5)."""
+    if challenge.startswith("2$"):
+        return _pbkdf2_antwort(challenge, passwort)
+    return _md5_antwort(challenge, passwort)
+
+
+def _parse_session_info(xml_text: str) -> dict:
+    root = ET.fromstring(xml_text)
+    benutzer = [u.text for u in root.iter("User") if u.text]
+    letzter = next((u.text for u in root.iter("User") if u.get("last") == "1"), None)
+    return {
+        "sid": root.findtext("SID") or SID_UNGUELTIG,
+        "challenge": root.findtext("Challenge") or "",
+        "block_time": int(root.findtext("BlockTime") or 0),
+        "benutzer": benutzer,
+        "letzter_benutzer": letzter,
+    }
+
+
+def hole_sid(http, url: str, passwort: str, benutzer: str | None = None, max_blockzeit: int = 60) -> str:
+    """
+    Holt eine Session-ID über login_sid.lua (ohne Browser).
+    Eine von der Box gemeldete Sperrzeit (BlockTime) wird abgewartet, sofern sie max_blockzeit nicht übersteigt.
+    Löst SidLoginAbgelehnt aus, wenn die Box das Passwort ablehnt, und SidLoginGesperrt, wenn sie länger
+    sperrt – ein weiterer Versuch (z.B. über die Oberfläche) würde die Sperrzeit nur verlängern.
+    """
+    login_url = f"{url}/login_sid.lua?version=2"
+    info = _parse_session_info(http.get(login_url).text)
+    if info["sid"] != SID_UNGUELTIG:
+        return info["sid"]
+
+    if info["block_time"] > 0:
+        if info["block_time"] > max_blockzeit:
+            print(f"⛔ Box sperrt Logins noch {info['block_time']}s – SID-Login übersprungen.")
+            raise SidLoginGesperrt(f"Box sperrt Logins noch {info['block_time']}s", info["block_time"])
+        print(f"⏳ Box sperrt Logins noch {info['block_time']}s, warte...")
+        time.sleep(info["block_time"])
+
+    if benutzer is None:
+        benutzer = info["letzter_benutzer"] or (info["benutzer"][0] if info["benutzer"] else "")
+
+    antwort = berechne_antwort(info["challenge"], passwort)
+    ergebnis = _parse_session_info(http.post(login_url, data={"username": benutzer, "response": antwort}).text)
+    if ergebnis["sid"] == SID_UNGUELTIG:
+        if ergebnis["block_time"]:
+            print(f"❌ SID-Login abgelehnt, nächste Sperrzeit {ergebnis['block_time']}s.")
+        raise SidLoginAbgelehnt("Passwort abgelehnt", ergebnis["block_time"])
+    return ergebnis["sid"]
+
+
+def sid_gueltig(http, url: str, sid: str | None) -> bool:
+    """Prüft, ob eine Session-ID noch gültig ist (die Box gibt eine gültige SID unverändert zurück)."""
+    if not sid or sid == SID_UNGUELTIG:
+        return False
+    try:
+        antwort = http.get(f"{url}/login_sid.lua?version=2", params={"sid": sid}, timeout=3)
+        return _parse_session_info(antwort.text)["sid"] == sid
+    except Exception:
+        return False
+
+
+def abmelden(http, url: str, sid: str):
+    """Meldet eine Session-ID wieder ab."""
+    try:
+        http.get(f"{url}/login_sid.lua?version=2", params={"logout": "1", "sid": sid}, timeout=3)
+    except Exception:
+        pass
@@ -1,12 +1,13 @@
 import time
-import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from browser_utils import klicken, schreiben, sicher_warten
+from fritz_http import FritzHttpClient
 
 FRITZ_URL = "http://fritz.box"
 tim_version_cache = {"version": None}
+http_client = FritzHttpClient()
 
 def beende_browser(driver):
     if driver:
@@ -25,14 +26,10 @@ def warte_auf_fritzbox(versuche=20, delay=5):
 
     for _ in range(versuche):
         for url in ip_list:
-            try:
-                r = requests.get(url, timeout=3, verify=False, allow_redirects=False)
-                if r.status_code == 200:
-                    FRITZ_URL = url
-                    print(f"✅ FritzBox erreichbar unter {url}")
-                    return True
-            except:
-                pass
+            if http_client.ist_erreichbar(url):
+                FRITZ_URL = url
+                print(f"✅ FritzBox erreichbar unter {url}")
+                return True
         time.sleep(delay)
 
     print("❌ FritzBox nicht erreichbar.")
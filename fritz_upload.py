@@ -0,0 +1,130 @@
+# fritz_upload.py
+import mmap
+import os
+import re
+import time
+import uuid
+
+FIRMWARE_UPLOAD_PFAD = "/cgi-bin/firmwarecfg"
+CHUNK_GROESSE = 1024 * 1024
+# Felder, die das Update-Formular bei abgewählter Checkbox "Einstellungen vorher sichern" (uiExportCheck) mitsendet:
+# kein Export der Einstellungen vor dem Flashen
+OHNE_EXPORT_FELDER = {"ImportExportPassword": "", "ConfigExport": ""}
+# Antwortseite nach angenommenem Upload ("Das Update wird durchgeführt ... startet neu") bzw. Login-Formular
+# bei abgelaufener Session; ein HTTP 200 allein belegt nicht, dass die Box das Image übernimmt
+UPLOAD_ERFOLG_MUSTER = re.compile(r"update wird durchgef|startet (jetzt )?neu|neu gestartet|neustart|restart|reboot",
+                                  re.IGNORECASE)
+UPLOAD_LOGIN_MUSTER = re.compile(r"uiPass|login_sid\.lua|uiLogin", re.IGNORECASE)
+
+
+class UploadAbgebrochen(Exception):
+    """Der Upload brach ab, nachdem bereits Image-Daten gesendet wurden – die Box kann das Image übernommen haben."""
+
+    def __init__(self, meldung: str, gesendet: int):
+        super().__init__(meldung)
+        self.gesendet = gesendet
+
+
+class StreamendeFormDaten:
+    """
+    multipart/form-data-Body, der die Datei stückweise aus einer Speicherabbildung (mmap) liefert.
+    Die Gesamtlänge ist vorab bekannt (Content-Length statt chunked), der Speicherbedarf bleibt
+    unabhängig von der Dateigröße bei etwa einer Chunk-Größe.
+    """
+
+    def __init__(self, felder: dict, datei_feld: str, datei_pfad: str, chunk_groesse: int = CHUNK_GROESSE,
+                 fortschritt=None):
+        self.boundary = uuid.uuid4().hex
+        self.datei_pfad = datei_pfad
+        self.datei_groesse = os.path.getsize(datei_pfad)
+        if not self.datei_groesse:
+            # mmap kann leere Dateien nicht abbilden – und ein leeres Image ist ohnehin keins
+            raise ValueError(f"{os.path.basename(datei_pfad)} ist leer")
+        self.chunk_groesse = chunk_groesse
+        self.fortschritt = fortschritt
+        # Bisher an die Verbindung übergebene Bytes des Images
+        self.gesendet = 0
+
+        teile = []
+        for name, wert in felder.items():
+            teile.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{wert}\r\n')
+        teile.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{datei_feld}"; '
+                     f'filename="{os.path.basename(datei_pfad)}"\r\nContent-Type: application/octet-stream\r\n\r\n')
+        self.kopf = "".join(teile).encode("utf-8")
+        self.ende = f'\r\n--{self.boundary}--\r\n'.encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self.kopf) + self.datei_groesse + len(self.ende)
+
+    def __iter__(self):
+        yield self.kopf
+        with open(self.datei_pfad, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            self.gesendet = 0
+            while self.gesendet < self.datei_groesse:
+                chunk = mm[self.gesendet:self.gesendet + self.chunk_groesse]
+                self.gesendet += len(chunk)
+                yield chunk
+                if self.fortschritt:
+                    self.fortschritt(self.gesendet, self.datei_groesse)
+        yield self.ende
+
+
+class UploadFortschritt:
+    """Gibt Fortschritt und Durchsatz eines Uploads in 10%-Schritten aus."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.time()
+        self._naechste_marke = 10
+
+    def __call__(self, gesendet: int, gesamt: int):
+        prozent = gesendet * 100 // gesamt if gesamt else 100
+        if prozent < self._naechste_marke and gesendet < gesamt:
+            return
+        self._naechste_marke = prozent // 10 * 10 + 10
+        dauer = max(time.time() - self.start, 1e-6)
+        print(f"📤 {self.name}: {prozent}% ({gesendet / 1e6:.1f}/{gesamt / 1e6:.1f} MB, {gesendet / 1e6 / dauer:.1f} MB/s)")
+
+
+def upload_angenommen(status_code: int, text: str) -> bool:
+    """True, wenn die Antwort des Update-Endpunkts den Beginn des Updates meldet (nicht Login- oder Fehlerseite)."""
+    if status_code != 200 or UPLOAD_LOGIN_MUSTER.search(text):
+        return False
+    return bool(UPLOAD_ERFOLG_MUSTER.search(text))
+
+
+def lade_firmware_hoch(http, url: str, sid: str, datei_pfad: str, timeout: tuple = (10, 300)) -> bool:
+    """
+    Lädt ein Firmware-Image direkt (ohne Browser) an den Update-Endpunkt der Box hoch – ohne vorherigen
+    Export der Einstellungen, wie das Formular bei abgewählter Sicherungs-Checkbox.
+    Gibt True zurück, wenn die Antwortseite den Beginn des Updates meldet; danach startet das Flashen.
+    Leere oder nicht lesbare Images werden gar nicht erst gesendet (False).
+    Bricht die Verbindung ab, nachdem schon Image-Daten gesendet wurden, wird UploadAbgebrochen ausgelöst.
+    """
+    try:
+        with open(datei_pfad, "rb"):
+            pass
+        body = StreamendeFormDaten({"sid": sid, **OHNE_EXPORT_FELDER}, "UploadFile", datei_pfad,
+                                   fortschritt=UploadFortschritt(os.path.basename(datei_pfad)))
+    except (OSError, ValueError) as e:
+        print(f"❌ Firmware-Image nicht lesbar: {e}")
+        return False
+    start = time.time()
+    try:
+        r = http.post(f"{url}{FIRMWARE_UPLOAD_PFAD}", data=body, timeout=timeout,
+                      headers={"Content-Type": body.content_type})
+    except Exception as e:
+        if body.gesendet:
+            raise UploadAbgebrochen(f"Upload nach {body.gesendet / 1e6:.1f} MB abgebrochen: {e}", body.gesendet) from e
+        raise
+    dauer = max(time.time() - start, 1e-6)
+    print(f"📤 Upload beendet: {body.datei_groesse / 1e6:.1f} MB in {dauer:.1f}s "
+          f"({body.datei_groesse / 1e6 / dauer:.1f} MB/s), HTTP {r.status_code}.")
+    if not upload_angenommen(r.status_code, r.text):
+        print("⚠️ Antwort der Box meldet keinen Update-Beginn (Fehler- oder Login-Seite).")
+        return False
+    return True
@@ -1,10 +1,8 @@
 import time
-import requests
 import os
 from pathlib import Path
-import tkinter as tk
-from tkinter import filedialog
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import re
 import sys
 from selenium.webdriver.common.by import By
@@ -12,48 +10,146 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 
 from browser_utils import Browser
+from fritz_http import FritzHttpClient
+from fritz_sid import hole_sid, sid_gueltig, abmelden, SidLoginAbgelehnt, SidLoginGesperrt
+from fritz_boxinfo import hole_boxinfo
+from fritz_upload import lade_firmware_hoch, UploadAbgebrochen
+from firmware_catalog import FirmwareKatalog
+from firmware_integrity import FirmwarePruefer
+from firmware_planner import UpgradePlaner, FritzOSVersion
+from wait_engine import PollStrategie, warte_bis, element_vorhanden, box_offline, wert_stabil
 
 FRITZ_DEFAULT_URL = "http://fritz.box"
 
+# Liest die WLAN-Scan-Tabelle (moderne flexRow/prefid-UI oder alte uiScanResultBody-Tabelle)
+# in einem einzigen execute_script-Aufruf aus.
+WLAN_SCAN_JS = """
+const text = el => el ? (el.innerText || '').trim() : '';
+const modern = Array.from(document.querySelectorAll('div.flexRow'))
+    .filter(row => row.getAttribute('class') === 'flexRow' && row.querySelector('div[prefid="rssi"]'));
+if (modern.length) {
+    return {layout: 'modern', rows: modern.map(row => {
+        const feld = name => row.querySelector('div[prefid="' + name + '"]');
+        return {
+            name: text(feld('name')),
+            frequency: text(feld('band')),
+            channel: text(feld('channel')),
+            mac: text(feld('mac')),
+            signal: (feld('rssi').getAttribute('title') || '').trim()
+        };
+    })};
+}
+const rows = [];
+document.querySelectorAll('tbody#uiScanResultBody > tr').forEach(row => {
+    const cols = row.querySelectorAll('td');
+    if (cols.length < 4) return;
+    rows.push({
+        signal: (cols[0].getAttribute('title') || '').trim(),
+        name: text(cols[1]),
+        frequency: text(cols[2]),  // this is apparently freq in the old Version
+        mac: text(cols[3]),
+        channel: text(cols[4])  // fragwürdig
+    });
+});
+return {layout: rows.length ? 'alt' : null, rows: rows};
+"""
+
+# Anzahl der bisher angezeigten Scan-Zeilen (beide Layouts), um das Ende des Scans zu erkennen
+WLAN_ZEILEN_JS = """
+return document.querySelectorAll('div.flexRow div[prefid="rssi"]').length
+    + document.querySelectorAll('tbody#uiScanResultBody > tr').length;
+"""
+
+
+# Hauptmenü-Punkte, an denen ein erfolgreicher Login erkannt wird
+MENU_XPATHS = [
+    '//*[@id="wlan"]',
+    '//*[@id="sys"]',
+    '//*[@id="internet"]',
+    '//*[@id="home"]',
+]
+LOGIN_FELD_XPATH = '//*[@id="uiPass" or @type="password"]'
+# Eine eager geladene Seite gilt als bereit, sobald Menü, Login-Feld, Sprachauswahl, ein Dialog oder JS3-Inhalt da ist
+SEITE_BEREIT_XPATH = " | ".join(MENU_XPATHS + [
+    LOGIN_FELD_XPATH,
+    '//*[@id="uiLanguage-de"]',
+    '//*[@class="dialog_content"]',
+    '//*[@id="js3ContentBox"]',
+])
+
+# Bekannte Dialoge nach dem Login: (Handler-Methode, Erkennungs-XPath, muss sichtbar sein), in Prioritätsreihenfolge
+DIALOG_MERKMALE = [
+    ("continue_setup",
+     '//button[contains(translate(text(), "Einrichtung jetzt beenden", "einrichtung jetzt beenden"), "einrichtung jetzt beenden")]',
+     True),
+    ("dsl_setup_init", '//*[@id="uiForward"]', False),
+    ("handle_registration_dialog", '//h1[contains(text(), "Informiert bleiben")]', False),
+    ("neue_firmware_dialog", '//h1[contains(text(), "FRITZ!OS wurde aktualisiert")]', False),
+    ("checkbox_fehlerdaten_dialog", '//*[@id="uiTr069diag"]', True),
+    ("skip_configuration", '//*[@id="Button1"]', False),
+]
+
+
+# Wie lange ein bestätigter Login ohne erneute DOM-Prüfung als gültig gilt (Sekunden)
+LOGIN_CACHE_TTL = 15
+
 
 class FirmwareManager:
     """Verwaltet Firmware-Dateien und deren Pfade für mehrstufige Updates."""
 
-    def __init__(self):
+    def __init__(self, firmware_dir: str | Path | None = None, interaktiv: bool = True):
+        # Zielversionen je Modell; die Dateien selbst liefert der Firmware-Katalog
         self.firmware_mapping = {
             "7590": {
                 "bridge": "07.59",
                 "final": "08.20",
-                "bridge_file": "FRITZ.Box_7590-07.59.image",
-                "final_file": "FRITZ.Box_7590-08.20.image"
+                "final_ab": "07.00"  # ältere Versionen müssen erst auf die Bridge-Version
             },
             "7590_AX": {
-                "final": "08.02",
-                "final_file": "FRITZ.Box_7590-AX-08.02.image"
+                "final": "08.02"
             },
             "7530": {
-                "final": "08.02",
-                "final_file": "FRITZ.Box_7530-08.02.image"
+                "final": "08.02"
             },
             "7490": {
-                "final": "07.60",
-                "final_file": "FRITZ.Box_7490-07.60.image"
+                "final": "07.60"
             },
             "7582": {
-                "final": "07.18",
-                "final_file": "FRITZ.Box_7582-07.18.image"
+                "final": "07.18"
             },
             "6660": {
-                "final": "08.03",
-                "final_file": "FRITZ.Box_6660_Cable-08.03.image"
+                "final": "08.03"
             },
-            "6890": {
-                "final": "07.57",
-                "final_file": "FRITZ.Box_6890_LTE-07.57.image"
+            "6890_LTE": {
+                "final": "07.57"
             }
         }
+        self.planer = UpgradePlaner.aus_mapping(self.firmware_mapping)
+        # Ohne Interaktion wird nie ein Dateidialog geöffnet (z.B. Mehrplatz-/Batchbetrieb)
+        self.interaktiv = interaktiv
+        if firmware_dir is None:
+            try:
+                firmware_dir = Path(sys.argv[0]).parent / "firmware und recovery"
+            except Exception:
+                firmware_dir = Path.cwd() / "firmware und recovery"
+        self.firmware_dir = Path(firmware_dir)
+        self.katalog = FirmwareKatalog(self.firmware_dir)
+        self.katalog.aktualisieren()
+        # Integritätsprüfung aller Images schon beim Start im Hintergrund anstoßen
+        self.pruefer = FirmwarePruefer(self.firmware_dir)
+        self.pruefer.im_hintergrund_pruefen(self.katalog.pfade())
+
+    def ist_intakt(self, firmware_path: str) -> bool:
+        """Prüft (bzw. wartet auf die Hintergrundprüfung), ob ein Firmware-Image vollständig ist."""
+        return self.pruefer.ist_intakt(firmware_path)
 
     def _select_firmware_path_manually(self):
+        if not self.interaktiv:
+            print("❌ Keine passende Firmware im Katalog und keine manuelle Auswahl im nicht-interaktiven Modus.")
+            return None
+        import tkinter as tk
+        from tkinter import filedialog
+
         root = tk.Tk()
         root.withdraw()
         file_path = filedialog.askopenfilename(
@@ -63,37 +159,52 @@ class FirmwareManager:
         root.destroy()
         return file_path
 
-    def get_firmware_path(self, box_model: str, version_type: str = "final") -> str | None:
+    def plane_update(self, box_model: str, os_version: str | None, ziel: str | None = None) -> list[str] | None:
+        """Kürzester Update-Pfad (in Neustarts) zur Zielversion; None, wenn keine Regel existiert."""
+        return self.planer.plane(box_model, os_version, ziel)
+
+    def bereite_update_vor(self, box_model: str, os_version: str | None, ziel: str | None = None) -> dict[str, str]:
         """
-        Sucht den Pfad für einen bestimmten Versionstyp ("bridge" or "final").
+        Sucht und prüft vorab alle Images des Update-Pfads (ohne Dateidialog), damit das Update selbst
+        nicht mehr auf Katalog oder Prüfsumme warten muss. Liefert {version: pfad} der intakten Images.
         """
-        if not box_model or box_model not in self.firmware_mapping:
-            print(f"⚠️ Kein Firmware-Eintrag für Modell '{box_model}' bekannt. Manuelle Auswahl.")
-            return self._select_firmware_path_manually()
-
-        model_files = self.firmware_mapping[box_model]
-        file_key = f"{version_type}_file"  # z.B. "bridge_file" oder "final_file"
+        pfade = {}
+        for version in self.plane_update(box_model, os_version, ziel) or []:
+            pfad = self.katalog.finden(box_model, version)
+            if pfad and self.ist_intakt(pfad):
+                pfade[version] = str(pfad)
+        return pfade
+
+    def get_firmware_path(self, box_model: str, version_type: str = "final", version: str | None = None) -> str | None:
+        """
+        Sucht den Pfad für einen bestimmten Versionstyp ("bridge" or "final") oder eine konkrete Version.
+        Die Suche läuft über den Firmware-Katalog; neu hinzugekommene Images werden
+        bei einem Fehltreffer per mtime-Abgleich nachgeladen.
+        """
+        model_files = self.firmware_mapping.get(box_model) if box_model else None
+        target_version = version or (model_files.get(version_type) if model_files else None)
+
+        for neu_scannen in (False, True):
+            if neu_scannen:
+                self.katalog.aktualisieren()
+            if target_version:
+                path = self.katalog.finden(box_model, target_version)
+            elif box_model and not model_files and version_type == "final":
+                # Modell ohne feste Zielversion: neuestes Image aus dem Katalog verwenden
+                path = self.katalog.neueste(box_model)
+            else:
+                path = None
+            if path:
+                print(f"✅ Firmware-Datei gefunden: {path}")
+                return str(path)
 
-        if file_key not in model_files:
+        if not model_files and not target_version:
+            print(f"⚠️ Kein Firmware-Eintrag für Modell '{box_model}' bekannt. Manuelle Auswahl.")
+        elif not target_version:
             print(f"⚠️ Kein '{version_type}'-Update für Modell {box_model} definiert. Manuelle Auswahl.")
-            return self._select_firmware_path_manually()
-
-        firmware_filename = model_files[file_key]
-
-        try:
-            current_dir = Path(sys.argv[0]).parent
-        except Exception:
-            current_dir = Path.cwd()
-
-        firmware_path_auto = current_dir / "firmware und recovery" / firmware_filename
-        print(f"ℹ️ Suche {version_type}-Firmware für {box_model} unter: {firmware_path_auto}")
-
-        if firmware_path_auto.is_file():
-            print(f"✅ Firmware-Datei gefunden: {firmware_path_auto}")
-            return str(firmware_path_auto)
         else:
-            print(f"❌ Firmware-Datei nicht gefunden. Bitte manuell auswählen.")
-            return self._select_firmware_path_manually()
+            print(f"❌ Firmware {target_version} für {box_model} nicht in {self.firmware_dir}. Bitte manuell auswählen.")
+        return self._select_firmware_path_manually()
 
 
 def require_login(func):
@@ -107,6 +218,10 @@ def require_login(func):
         # 'self' ist hier die Instanz der FritzBox-Klasse
         print(f"🕵️  Login-Prüfung für die Funktion '{func.__name__}'...")
 
+        # Kürzlich bestätigter Login ohne Seitenwechsel → DOM-Prüfung überspringen
+        if self.login_cache_gueltig():
+            return func(self, *args, **kwargs)
+
         if not self.is_logged_in_and_menu_ready(timeout=2):
             print("⚠️ Session abgelaufen oder nicht eingeloggt. Versuche automatischen Re-Login...")
 
@@ -126,53 +241,131 @@ def require_login(func):
 class FritzBox:
     """Repräsentiert eine FritzBox und kapselt ihre Interaktionen."""
 
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, url: str | None = None, firmware_manager: FirmwareManager | None = None):
         if not isinstance(browser, Browser):
             raise TypeError("Der übergebene Browser muss eine Instanz der Browser-Klasse sein.")
         self.browser = browser
-        self.url = FRITZ_DEFAULT_URL
+        self.browser.bereit_xpath = SEITE_BEREIT_XPATH
+        # Bei fest zugewiesener URL (Mehrplatzbetrieb) wird nur diese Adresse geprüft.
+        self.url = url or FRITZ_DEFAULT_URL
+        self.feste_url = url is not None
+        self.erreichbare_url = None
+        self.http = FritzHttpClient()
+        self.sid = None
         self.os_version = None
         self.is_reset = False
         self.language = None
         self.is_logged_in = False
+        self._login_bestaetigt = None  # (Zeitpunkt, Browser, Navigationszähler) des letzten bestätigten Logins
         self.password = None
         self.box_model = None
+        self.box_variant = None
+        self.serial = None
+        self.boxinfo = None
         self.is_wifi_checked = False
         self.wlan_scan_results = []
-        self.firmware_manager = FirmwareManager()
+        self.firmware_manager = firmware_manager or FirmwareManager()
+        # Optionaler Callback(version) nach jedem erfolgreich geflashten Image (z.B. für Checkpoints)
+        self.bei_update_fortschritt = None
+        # Ergebnis von bereite_firmware_update_vor(): (Ausgangsversion, {version: pfad})
+        self.update_vorbereitung = None
+        # Abweichende Zielversion (z.B. aus einem Batch-Manifest); None = Ziel aus der Firmware-Zuordnung
+        self.ziel_version = None
+
+    def browser_tauschen(self, browser: Browser):
+        """Übernimmt einen neuen Browser (der alte ist abgestürzt); SID, Modell und Version bleiben erhalten."""
+        if not isinstance(browser, Browser):
+            raise TypeError("Der übergebene Browser muss eine Instanz der Browser-Klasse sein.")
+        self.browser = browser
+        self.browser.bereit_xpath = SEITE_BEREIT_XPATH
+        self.is_logged_in = False
+        self._login_vergessen()
+
+    def schliessen(self):
+        """Meldet die SID ab und gibt die HTTP-Verbindungen zur Box frei (Ende des Workflows dieser Box)."""
+        self.logout_sid()
+        self.http.schliessen()
+
+    def _pruefe_url(self, url: str) -> bool:
+        """Interne Methode: Einzelne Erreichbarkeitsprüfung einer URL."""
+        try:
+            return self.http.ist_erreichbar(url)
+        except Exception as e:
+            print(f"Fehler beim Prüfen der URL {url}:")
+        return False
 
     def warte_auf_erreichbarkeit(self, versuche=20, delay=5) -> bool:
-        """Wartet, bis die FritzBox unter einer bekannten IP erreichbar ist."""
-        ip_list = [
+        """
+        Wartet, bis die FritzBox unter einer bekannten IP erreichbar ist.
+        Alle Kandidaten werden pro Runde gleichzeitig geprüft; die erste Antwort gewinnt
+        und wird für den Rest der Sitzung als bevorzugte Adresse gemerkt.
+        """
+        ip_list = [self.url] if self.feste_url else [
             "http://fritz.box",
             "http://192.168.178.1",
             "http://169.254.139.1",
             "http://169.254.1.1",
         ]
+        if self.erreichbare_url in ip_list:
+            ip_list.remove(self.erreichbare_url)
+            ip_list.insert(0, self.erreichbare_url)
 
         print("🔍 Suche erreichbare FritzBox...")
 
         for _ in range(versuche):
-            for url in ip_list:
-                try:
-                    r = requests.get(url, timeout=3, verify=False, allow_redirects=False)
-                    if r.status_code == 200:
-                        self.url = url
-                        print(f"✅ FritzBox erreichbar unter {url}")
-                        return True
-                except requests.exceptions.ConnectionError:
-                    pass
-                except Exception as e:
-                    print(f"Fehler beim Prüfen der URL {url}:")
-            time.sleep(delay)
+            runden_start = time.time()
+            pool = ThreadPoolExecutor(max_workers=len(ip_list), thread_name_prefix="erreichbarkeit")
+            try:
+                offen = {pool.submit(self._pruefe_url, url): url for url in ip_list}
+                while offen:
+                    fertig, _ = wait(offen, return_when=FIRST_COMPLETED)
+                    for future in fertig:
+                        url = offen.pop(future)
+                        if future.result():
+                            self.url = url
+                            self.erreichbare_url = url
+                            print(f"✅ FritzBox erreichbar unter {url}")
+                            return True
+            finally:
+                # Nicht auf langsamere Kandidaten warten
+                pool.shutdown(wait=False, cancel_futures=True)
+            time.sleep(max(0.0, delay - (time.time() - runden_start)))
 
         print("❌ FritzBox nicht erreichbar.")
         return False
 
+    def _warte_auf_neustart_beginn(self, max_wartezeit: float) -> bool:
+        """
+        Wartet, bis die Box nach einem Update/Reset nicht mehr antwortet, also der Neustart
+        begonnen hat. Endet, sobald die Box mehrmals in Folge nicht antwortet, spätestens nach max_wartezeit.
+        """
+        self._login_vergessen()  # Neustart beendet jede Session
+        print(f"...warte auf Beginn des Neustarts (max. {max_wartezeit}s).")
+        return bool(warte_bis(box_offline(self.http, self.url), timeout=max_wartezeit,
+                              strategie=PollStrategie(intervall=1, faktor=1, max_intervall=1),
+                              beschreibung="Neustart der Box"))
+
+    def _login_merken(self):
+        """Merkt sich einen eben bestätigten Login für den Login-Cache."""
+        self.is_logged_in = True
+        self._login_bestaetigt = (time.time(), self.browser, self.browser.navigationen)
+
+    def _login_vergessen(self):
+        """Verwirft den Login-Cache (Logout, Neustart, Reset oder fehlgeschlagene Prüfung)."""
+        self._login_bestaetigt = None
+
+    def login_cache_gueltig(self) -> bool:
+        """True, wenn der letzte bestätigte Login jünger als LOGIN_CACHE_TTL ist und seither keine Seite neu geladen wurde."""
+        if not self._login_bestaetigt:
+            return False
+        zeitpunkt, browser, navigationen = self._login_bestaetigt
+        return (time.time() - zeitpunkt < LOGIN_CACHE_TTL and browser is self.browser
+                and navigationen == self.browser.navigationen)
+
     def _check_if_login_required(self) -> bool:
         """Interne Methode: Prüft, ob das Passwortfeld auf der aktuellen Seite vorhanden ist."""
         try:
-            return bool(self.browser.sicher_warten('//*[@id="uiPass" or @type="password"]', timeout=1, sichtbar=False))
+            return bool(self.browser.sicher_warten(LOGIN_FELD_XPATH, timeout=1, sichtbar=False))
         except Exception:
             return False
 
@@ -180,8 +373,8 @@ class FritzBox:
         """Interne Methode: Behandelt die Sprachauswahl, falls sie erscheint."""
         try:
             # Hier keinen get_url aufruf! wird vor dem aufruf im login gemacht
-            # Prüfe, ob Sprachauswahl-Elemente da sind
-            if self.browser.sicher_warten('//*[@id="uiLanguage-de"]', timeout=2, sichtbar=False):
+            # Prüfe, ob Sprachauswahl-Elemente da sind (kurzes Budget: die Auswahl wird teils erst per Skript eingeblendet)
+            if self.browser.pruefen('//*[@id="uiLanguage-de"]', budget=2, sichtbar=True):
                 print("🌐 Sprachauswahl erkannt. Setze auf Deutsch...")
                 if self.browser.klicken('//*[@id="uiLanguage-de"]'):
                     if self.browser.klicken('//*[@id="submitLangBtn"]'):
@@ -201,25 +394,12 @@ class FritzBox:
         Prüft, ob die Hauptmenüstruktur der FritzBox geladen und interaktiv ist.
         Sucht nach Schlüssel-Menüpunkten wie WLAN, System etc.
         """
-        menu_xpaths = [
-            '//*[@id="wlan"]',
-            '//*[@id="sys"]',
-            '//*[@id="internet"]',
-            '//*[@id="home"]',
-        ]
-        # print(f"🔍 Prüfe auf geladenes und klickbares Hauptmenü (Timeout: {timeout}s)...")
-        for xpath in menu_xpaths:
-            try:
-                element = self.browser.sicher_warten(xpath,
-                                                     timeout=timeout / len(menu_xpaths) if menu_xpaths else timeout,
-                                                     sichtbar=True)
-                if element and element.is_displayed() and element.is_enabled():
-                    # print(f"✅ Hauptmenü-Element '{xpath}' gefunden und bereit.")
-                    return True
-            except Exception:
-                pass
-        # print("❌ Hauptmenü nicht gefunden oder nicht bereit.")
-        return False
+        # Alle Menüpunkte gemeinsam prüfen statt den Timeout auf einzelne Wartevorgänge aufzuteilen
+        _, element = self.browser.erster_treffer(MENU_XPATHS, timeout=timeout, sichtbar=True)
+        try:
+            return bool(element and element.is_enabled())
+        except Exception:
+            return False
 
     def is_logged_in_and_menu_ready(self, timeout=5) -> bool:
         """
@@ -231,17 +411,64 @@ class FritzBox:
         if self._check_if_login_required():
             # print("ℹ️ Login-Feld gefunden. Nicht eingeloggt oder ausgeloggt.")
             self.is_logged_in = False
+            self._login_vergessen()
             return False
 
         if self.is_main_menu_loaded_and_ready(timeout=timeout):
             # print("✅ Eingeloggt und Hauptmenü bereit.")
-            self.is_logged_in = True
+            self._login_merken()
             return True
         else:
             # print("❌ Weder Login-Feld noch Hauptmenü erkannt. Unerwarteter Zustand.")
             self.is_logged_in = False
+            self._login_vergessen()
             return False
 
+    def login_sid(self, password: str | None = None) -> bool | None:
+        """
+        Browserloser Login über den Challenge-Response-Endpunkt login_sid.lua.
+        Setzt self.sid bei Erfolg; eine noch gültige SID wird weiterverwendet statt neu angemeldet.
+        Steps ohne Oberfläche können allein mit der SID arbeiten.
+        Rückgabe: True bei Erfolg, False wenn die Box das Passwort abgelehnt hat,
+        None wenn der Weg nicht möglich war (kein Passwort, kein Endpunkt, z.B. Erstinstallations-Dialog).
+        Sperrt die Box Logins länger, als hole_sid wartet, wird SidLoginGesperrt weitergereicht:
+        das ist kein Beleg für ein falsches Passwort und darf keinen Reset auslösen.
+        """
+        if self.sid and sid_gueltig(self.http, self.url, self.sid):
+            return True
+        self.sid = None
+        password = password if password is not None else self.password
+        if password is None:
+            return None
+        try:
+            self.sid = hole_sid(self.http, self.url, password)
+        except SidLoginAbgelehnt as e:
+            print(f"❌ SID-Login abgelehnt: {e}")
+            return False
+        except SidLoginGesperrt:
+            raise
+        except Exception:
+            # z.B. Box im Erstinstallations-Dialog ohne login_sid.lua
+            return None
+        print("🔑 SID per HTTP erhalten.")
+        return True
+
+    def logout_sid(self):
+        """Meldet eine per HTTP erhaltene SID wieder ab (Ende des Workflows dieser Box)."""
+        if self.sid:
+            abmelden(self.http, self.url, self.sid)
+            self.sid = None
+
+    def _browser_mit_sid_anmelden(self) -> bool:
+        """Übergibt eine per HTTP erhaltene SID an den Browser und prüft, ob das Hauptmenü erreichbar ist."""
+        if not self.sid:
+            return False
+        self.browser.reload(f"{self.url}/?sid={self.sid}", clear_cookies=False)
+        if self.is_logged_in_and_menu_ready(timeout=3):
+            return True
+        print("ℹ️ SID-Übergabe an den Browser nicht möglich (z.B. Einrichtungsdialog aktiv).")
+        return False
+
     def login(self, password: str, force_reload=False) -> bool:
         """
         Führt den Login durch und arbeitet alle nachfolgenden Dialoge in einer
@@ -257,11 +484,27 @@ class FritzBox:
             try:
                 from browser_utils import setup_browser, Browser
                 new_driver = setup_browser()
-                self.browser = Browser(new_driver)
+                self.browser_tauschen(Browser(new_driver))
                 print("✅ Neuer Browser gestartet.")
             except Exception as e:
                 print(f"❌ Konnte keine neue Browser-Instanz erstellen: {e}")
                 return False
+        # Schneller Weg: SID per HTTP holen und an den Browser übergeben.
+        # Die Selenium-Strecke unten bleibt der Fallback, wenn login_sid.lua nicht nutzbar ist (Erstinstallations-Dialoge).
+        # Ein abgelehntes Passwort wird nicht noch einmal in die Oberfläche getippt – das verdoppelt nur die Sperrzeit.
+        # Eine lange Login-Sperre (SidLoginGesperrt) lässt den Schritt als Fehler scheitern, nicht als falsches Passwort.
+        sid_login = self.login_sid()
+        if sid_login is False:
+            self.is_logged_in = False
+            self._login_vergessen()
+            # Login-Seite trotzdem laden: ein folgender Reset über "Passwort vergessen" sucht den Link dort
+            self.browser.reload(self.url)
+            return False
+        if sid_login and self._browser_mit_sid_anmelden():
+            print("✅ Login per SID erfolgreich und Hauptmenü bereit.")
+            self._login_merken()
+            return True
+
         print("Reload der startseite")
         self.browser.reload(self.url)
         print("🔐 Login wird versucht...")
@@ -274,13 +517,11 @@ class FritzBox:
             # gelegentlich gibt es boxen, die keine PW nach reset haben, sondern mal muss es selbst vergeben
             # zuerst kommt Bitte drücken Sie kurz eine beliebige Taste an Ihrer FRITZ!Box, um sich anzumelden.
             # --- NEU: Prüfen auf "Bitte Taste drücken"-Dialog ---
-            try:
-                text_xpath = '//div[@class="dialog_content"]//p[contains(text(),"Bitte drücken Sie kurz eine beliebige Taste")]'
-                self.browser.sicher_warten(text_xpath, timeout=5)
+            text_xpath = '//div[@class="dialog_content"]//p[contains(text(),"Bitte drücken Sie kurz eine beliebige Taste")]'
+            if self.browser.pruefen(text_xpath, budget=1, sichtbar=True):
                 print("⚠️ℹ️⚠️ FritzBox verlangt physischen Tastendruck zur Anmeldung.")
                 print("👉 Bitte jetzt Taste an der Box drücken...")
-
-            except Exception:
+            else:
                 print("Kein physischer Tastendruck-Dialog gefunden. Fahre normal fort...")
 
             try:
@@ -313,36 +554,29 @@ class FritzBox:
             print("ℹ️ Kein Login-Feld gefunden. Gehe davon aus, dass ein initialer Dialog aktiv ist.")
 
         # --- FINALE DIALOG-SCHLEIFE (HYBRID-MODELL) ---
+        # Pro Runde eine einzige Momentaufnahme der Seite; nur der passende Handler wird ausgeführt.
         max_dialog_attempts = 15
         print("...starte Abarbeitung aller möglichen Dialoge...")
-        dialog_handlers = [
-            self.continue_setup,
-            self.dsl_setup_init,
-            self.handle_registration_dialog,
-            self.neue_firmware_dialog,
-            self.checkbox_fehlerdaten_dialog,
-            self.skip_configuration,
-        ]
 
         for attempt in range(max_dialog_attempts):
             print(f"   (Dialog-Runde {attempt + 1}/{max_dialog_attempts})")
 
-            if self.is_logged_in_and_menu_ready(timeout=2):
+            zustand = self._warte_auf_dialog_zustand()
+
+            if zustand["menu"]:
                 print("✅ Login erfolgreich und Hauptmenü zugänglich.")
-                self.is_logged_in = True
+                self._login_merken()
                 return True
 
-            if self._check_if_login_required():
+            if zustand["login"]:
                 print("❌ Zurück auf der Login-Seite. Der Login ist fehlgeschlagen.")
                 self.is_logged_in = False
                 return False
 
-            # Versuche, einen der spezifischen Dialoge zu behandeln
+            # Nur den Handler des erkannten Dialogs ausführen
             action_taken = False
-            for handler in dialog_handlers:
-                if handler():
-                    action_taken = True
-                    break
+            if zustand["dialog"]:
+                action_taken = getattr(self, zustand["dialog"])()
 
             if not action_taken:
                 print("   ...kein spezifischer Dialog gefunden, versuche generischen Fallback.")
@@ -352,6 +586,48 @@ class FritzBox:
         self.is_logged_in = False
         return False
 
+    def _dialog_momentaufnahme(self) -> dict:
+        """
+        Klassifiziert die aktuelle Seite in einem einzigen Round-Trip:
+        Hauptmenü bereit, Login-Feld sichtbar oder welcher bekannte Dialog (Name des Handlers) offen ist.
+        """
+        dialog_xpaths = [xpath for _, xpath, _ in DIALOG_MERKMALE]
+        status = self.browser.xpath_status(MENU_XPATHS + [LOGIN_FELD_XPATH] + dialog_xpaths)
+        menu_status = status[:len(MENU_XPATHS)]
+        login_status = status[len(MENU_XPATHS)]
+        dialog_status = status[len(MENU_XPATHS) + 1:]
+
+        dialog = None
+        for (handler, _, muss_sichtbar), (vorhanden, sichtbar, _) in zip(DIALOG_MERKMALE, dialog_status):
+            if sichtbar or (vorhanden and not muss_sichtbar):
+                dialog = handler
+                break
+        return {
+            "menu": any(sichtbar and aktiviert for _, sichtbar, aktiviert in menu_status),
+            "login": login_status[0],
+            "dialog": dialog,
+        }
+
+    def _warte_auf_dialog_zustand(self, timeout=5) -> dict:
+        """
+        Wartet kurz, bis die Momentaufnahme etwas Bekanntes zeigt (Menü oder Dialog).
+        Ein Login-Feld zählt erst, wenn es nach 2s noch da ist (Seite kann noch wechseln).
+        """
+        start = time.time()
+        letzter = {"menu": False, "login": False, "dialog": None}
+
+        def erkannt():
+            nonlocal letzter
+            letzter = self._dialog_momentaufnahme()
+            if letzter["menu"] or letzter["dialog"]:
+                return letzter
+            if letzter["login"] and time.time() - start >= 2:
+                return letzter
+            return None
+
+        warte_bis(erkannt, timeout=timeout, strategie=PollStrategie(intervall=0.25, faktor=1.5, max_intervall=1))
+        return letzter
+
     def continue_setup(self) -> bool:
         """prüft am Anfang, ob ein 'einrichtung fortsetzen' dialog aufgeht und beendet diesen"""
         try:
@@ -398,12 +674,12 @@ class FritzBox:
             '//*[@id="Button1"]'
         ]
 
-        for xpath in positive_buttons_xpaths:
-            # Wir nutzen einen sehr kurzen Timeout, da wir nur prüfen, ob der Button gerade da ist.
-            if self.browser.klicken(xpath, timeout=0.5, versuche=1, verbose=False):
-                print(f"✅ Generischen Dialog-Button geklickt: {xpath}")
-                return True
-        return False
+        # Reine Momentaufnahme aller Kandidaten in einem Round-Trip, da wir nur prüfen, ob ein Button gerade da ist.
+        index, button = self.browser.erster_treffer(positive_buttons_xpaths, timeout=0, sichtbar=True)
+        if button is None or not self.browser.element_klicken(button):
+            return False
+        print(f"✅ Generischen Dialog-Button geklickt: {positive_buttons_xpaths[index]}")
+        return True
 
     def neue_firmware_dialog(self) -> bool:
         """Behandelt den Dialog 'Neue Firmware wurde installiert'."""
@@ -505,16 +781,9 @@ class FritzBox:
             if self.browser.sicher_warten('//*[@id="Button1"]', timeout=1, sichtbar=False):
                 print("...überspringe generischen Konfigurations-Dialog.")
                 btn = self.browser.sicher_warten('//*[@id="Button1"]', timeout=1, sichtbar=False)
-                try:
-                    btn.click()
-                except Exception:
-                    try:
-                        self.browser.driver.execute_script("arguments[0].scrollIntoView(true);", btn)
-                        self.browser.driver.execute_script("arguments[0].click();", btn)
-                        print("✅ OK-Button via JavaScript-Klick gedrückt.")
-                    except Exception as e:
-                        print(f"❌ OK-Button konnte auch via JS nicht gedrückt werden: {e}")
-                        return False
+                if not self.browser.element_klicken(btn):
+                    print("❌ OK-Button konnte auch via JS nicht gedrückt werden.")
+                    return False
                 return True
         except Exception:
             pass
@@ -527,6 +796,7 @@ class FritzBox:
         Beendet NICHT mehr das Programm, falls der Button nicht verfügbar ist.
         """
         print("🚨 Werkseinstellungen einleiten (via 'Passwort vergessen')...")
+        self._login_vergessen()
 
         kandidaten_xpaths = [
             '//*[@id="dialogFoot"]/a',
@@ -538,16 +808,12 @@ class FritzBox:
             '//*[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "kennwort vergessen")]',
         ]
 
-        # Schritt 1: Link/Button finden und klicken
+        # Schritt 1: Link/Button finden und klicken (alle Kandidaten gleichzeitig, erster nach Priorität)
         found_reset_link = False
-        for xpath in kandidaten_xpaths:
-            try:
-                if self.browser.klicken(xpath, timeout=5, versuche=1):
-                    print(f"🔁 Reset-Link gefunden und geklickt ({xpath})")
-                    found_reset_link = True
-                    break
-            except Exception:
-                continue
+        index, link = self.browser.erster_treffer(kandidaten_xpaths, timeout=5, sichtbar=True)
+        if link is not None and self.browser.element_klicken(link):
+            print(f"🔁 Reset-Link gefunden und geklickt ({kandidaten_xpaths[index]})")
+            found_reset_link = True
 
         if not found_reset_link:
             print("❌ Kein Reset-Link gefunden – Werksreset via Passwort vergessen nicht möglich.")
@@ -558,22 +824,14 @@ class FritzBox:
         for attempt in range(1, max_versuche + 1):
             try:
                 btn = self.browser.sicher_warten('//*[@id="sendFacReset"]', timeout=8, sichtbar=True)
-
-                # Versuche normalen Klick
-                try:
-                    btn.click()
-                except Exception:
-                    # Fallback: Scroll + JS-Klick
-                    try:
-                        self.browser.driver.execute_script("arguments[0].scrollIntoView(true);", btn)
-                        self.browser.driver.execute_script("arguments[0].click();", btn)
-                        print("✅ sendFacReset via JavaScript-Klick ausgelöst.")
-                    except Exception as e:
-                        print(f"❌ Klick auf sendFacReset fehlgeschlagen: {e}")
-                        continue
+                if not self.browser.element_klicken(btn):
+                    print("❌ Klick auf sendFacReset fehlgeschlagen.")
+                    continue
 
                 print("🔁 Reset ausgelöst, warte auf Neustart...")
-                time.sleep(50)
+                if not self._warte_auf_neustart_beginn(max_wartezeit=90):
+                    print("❌ Box ist nach dem Auslösen nicht neu gestartet – Werksreset wurde nicht ausgeführt.")
+                    return False
                 return True
 
             except Exception:
@@ -605,7 +863,7 @@ class FritzBox:
             try:
                 print("...navigiere zur Update-Seite, um den Status zu prüfen.")
                 # VERSUCH 1: Klicke direkt auf "Update", falls Menü schon offen ist
-                if not self.browser.klicken('//*[@id="mUp"]', timeout=2, versuche=1):
+                if not self.browser.klicken_falls_vorhanden('//*[@id="mUp"]'):
                     # VERSUCH 2: Wenn das fehlschlägt, klicke erst auf "System" und dann auf "Update"
                     print("...'Update'-Menü nicht direkt sichtbar, öffne 'System'-Menü.")
                     if not self.browser.klicken('//*[@id="sys"]', timeout=5): return False
@@ -647,6 +905,7 @@ class FritzBox:
     @require_login
     def perform_factory_reset_from_ui(self) -> bool:
         print("🚨 Werkseinstellungen (aus der Oberfläche)...")
+        self._login_vergessen()
 
         try:
             # -------------------------
@@ -673,7 +932,7 @@ class FritzBox:
     def _factory_reset_classic(self) -> bool:
         """Alter Workflow mit erstem OK-Dialog"""
         try:
-            if not self.browser.klicken('//*[@id="mSave"]', timeout=2, versuche=1):
+            if not self.browser.klicken_falls_vorhanden('//*[@id="mSave"]'):
                 if not self.browser.klicken('//*[@id="sys"]', timeout=5):
                     return False
                 time.sleep(1)
@@ -684,9 +943,14 @@ class FritzBox:
             self.browser.klicken('//*[@id="default"]')
             time.sleep(1)
 
-            if not (self.browser.klicken('//*[@id="uiDefaults"]', timeout=3, versuche=1) or
-                    self.browser.klicken('//*[@id="content"]/div/button', timeout=3, versuche=1) or
-                    self.browser.klicken('//a[contains(text(),"Werkseinstellungen laden")]', timeout=3, versuche=1)):
+            # Einmal auf irgendeinen der Reset-Buttons warten, dann die Varianten ohne Wartezeit prüfen
+            reset_xpaths = [
+                '//*[@id="uiDefaults"]',
+                '//*[@id="content"]/div/button',
+                '//a[contains(text(),"Werkseinstellungen laden")]',
+            ]
+            self.browser.pruefen(" | ".join(reset_xpaths), budget=3, sichtbar=True)
+            if not any(self.browser.klicken_falls_vorhanden(xpath) for xpath in reset_xpaths):
                 return False
             time.sleep(2)
 
@@ -699,39 +963,27 @@ class FritzBox:
             return False
 
     def _factory_reset_js3(self) -> bool:
-        """Robuster Factory-Reset für JS3-Oberflächen (Shadow DOM + Fallback XPath)."""
+        """Factory-Reset für JS3-Oberflächen (Shadow DOM) über die JS3-Runtime des Browsers."""
         try:
-            # --- Schritt 1: Tile klicken ---
-            tile_selector = 'js3-tile--info a.js3-tile__container'
-            tile_clicked = self.browser.driver.execute_script("""
-            const contentBox = document.querySelector('#js3ContentBox');
-            const shadow1 = contentBox.shadowRoot;
-            
-            const js3view = shadow1.querySelector('.js3-view');
-            const shadow2 = js3view.shadowRoot;
-            
-            shadow2.querySelector('js3-tile[ta-id="ag6vu9"]').click(); //@todo more robust selector
-            
-            const js3modal = shadow1.querySelector('js3-dialog').querySelector('dialog').querySelector('div');
-            const shadow3 = js3modal.querySelector('js3-view').shadowRoot;
-            
-            await new Promise(r => setTimeout(r, 3000));
-            shadow3.querySelector('js3-button[level="critical"]').click();
-            """)
+            # --- Schritt 1: Kachel "Werkseinstellungen" klicken (ta-id, sonst über den Kacheltext) ---
+            if not (self.browser.js3_klicken("js3-tile", ta_id="ag6vu9")
+                    or self.browser.js3_klicken("js3-tile", text="Werkseinstellungen")):
+                print("❌ JS3: Kachel 'Werkseinstellungen' nicht gefunden.")
+                return False
 
-            for attempt in range(20):
-                return_value = self.browser.driver.execute_script("""
-                    const contentBox = document.querySelector('#js3ContentBox');
-                    if (!contentBox) return false;
-                    const shadow1 = contentBox.shadowRoot;
-                    const btn = shadow1.querySelector('button[title="OK"]');
-                    if (btn) {
-                        btn.click();
-                        return true;
-                    }
-                    return false;
-                """)
+            # --- Schritt 2: kritischen Bestätigungs-Button im Dialog abwarten und klicken ---
+            kritisch = {"level": "critical"}
+            if not self.browser.js3_warten("js3-button", attribute=kritisch, sichtbar=True, timeout=10):
+                print("❌ JS3: Bestätigungsdialog für die Werkseinstellungen erscheint nicht.")
+                return False
+            if not self.browser.js3_klicken("js3-button", attribute=kritisch, sichtbar=True):
+                print("❌ JS3: Bestätigungs-Button für die Werkseinstellungen konnte nicht geklickt werden.")
+                return False
 
+            # --- Schritt 3: OK nach dem physischen Tastendruck ---
+            return_value = False
+            for attempt in range(20):
+                return_value = self.browser.js3_klicken("button", attribute={"title": "OK"})
                 if return_value:
                     print(f"Ok-Button gefunden und geklickt: {return_value}")
                     return return_value
@@ -777,7 +1029,9 @@ class FritzBox:
                 return False
 
         print("...warte auf Neustart der Box (kann einige Minuten dauern).")
-        time.sleep(45)  # Grundwartezeit
+        if not self._warte_auf_neustart_beginn(max_wartezeit=90):
+            print("❌ Box ist nach dem Bestätigen nicht neu gestartet – Reset wurde nicht ausgeführt.")
+            return False
         if self.warte_auf_erreichbarkeit(versuche=40, delay=10):
             print("✅ Box ist nach dem Reset wieder erreichbar.")
             if self.ist_sprachauswahl():
@@ -793,29 +1047,15 @@ class FritzBox:
     def get_firmware_version_js3(self, timeout=5):
         """
         Versucht, die Firmware-Version zuverlässig aus dem dynamischen JS3-DOM auszulesen.
-        Shadow DOMs werden berücksichtigt.
+        Shadow DOMs werden über die JS3-Runtime des Browsers berücksichtigt.
         """
         end_time = time.time() + timeout
         version_text = ""
 
         while time.time() < end_time:
             try:
-                # JavaScript: rekursiv nach Input mit name="fritzOsVersion" suchen
-                js_code = """
-                function findInput(root) {
-                    if (!root) return null;
-                    if (root.shadowRoot) root = root.shadowRoot;
-                    let input = root.querySelector('input[name="fritzOsVersion"]');
-                    if (input) return input.value;
-                    for (let child of root.children) {
-                        let v = findInput(child);
-                        if (v) return v;
-                    }
-                    return null;
-                }
-                return findInput(document.querySelector('#js3ContentBox'));
-                """
-                version_text = self.browser.driver.execute_script(js_code)
+                # Ein kurzer Aufruf gegen den Shadow-Root-Index der JS3-Runtime statt eines Baumdurchlaufs
+                version_text = self.browser.js3_wert('input[name="fritzOsVersion"]')
                 if version_text:
                     print(f"✅ Firmware-Version gefunden: {version_text}")
                     return version_text
@@ -826,8 +1066,33 @@ class FritzBox:
         print("❌ JS-Fallback konnte keine Firmware-Version finden.")
         return ""
 
-    @require_login
+    def lade_boxinfo(self, neu_laden: bool = False) -> dict | None:
+        """
+        Liest Modell, Variante, Seriennummer und FRITZ!OS-Version in einer HTTP-Anfrage
+        (jason_boxinfo.xml, ohne Login). Das Ergebnis wird bis zum nächsten Update/Reset zwischengespeichert.
+        """
+        if self.boxinfo and not neu_laden:
+            return self.boxinfo
+        info = hole_boxinfo(self.http, self.url, sid=self.sid)
+        if info:
+            self.boxinfo = info
+            self.box_model = info["box_model"]
+            self.box_variant = info["variante"]
+            self.serial = info["serial"]
+            if info["os_version"]:
+                self.os_version = info["os_version"]
+        return info
+
     def get_firmware_version(self) -> str | bool:
+        """Ermittelt die Firmware-Version – zuerst per Boxinfo-Endpunkt, sonst über die Oberfläche."""
+        info = self.lade_boxinfo()
+        if info and info["os_version"]:
+            print(f"✅ Firmware-Version: {self.os_version} (per Boxinfo).")
+            return self.os_version
+        return self._get_firmware_version_ui()
+
+    @require_login
+    def _get_firmware_version_ui(self) -> str | bool:
         """Ermittelt die aktuelle Firmware-Version der FritzBox, inkl. JS3-Input für 08.20+."""
         print("ℹ️ Ermittle Firmware-Version...")
         self._close_any_overlay()
@@ -856,18 +1121,17 @@ class FritzBox:
             if not version_text:
                 try:
                     primary_selector = '//*[@class="fakeTextInput" or contains(@class, "version_text")]'
-                    version_elem = self.browser.sicher_warten(primary_selector, timeout=3)
-                    version_text = version_elem.text.strip()
-                except Exception:
-                    try:
-                        fallback_selector = '//*[@id="content"]/div[1]/div[div[contains(text(), "FRITZ!OS")]]'
-                        version_elem = self.browser.sicher_warten(fallback_selector, timeout=5)
-                        full_text = version_elem.text.strip()
-                        match = re.search(r'(\d{1,2}\.\d{1,2})', full_text)
+                    fallback_selector = '//*[@id="content"]/div[1]/div[div[contains(text(), "FRITZ!OS")]]'
+                    index, version_elem = self.browser.erster_treffer([primary_selector, fallback_selector],
+                                                                      timeout=5, sichtbar=True)
+                    if index == 0:
+                        version_text = version_elem.text.strip()
+                    elif index == 1:
+                        match = re.search(r'(\d{1,2}\.\d{1,2})', version_elem.text.strip())
                         if match:
                             version_text = match.group(1)
-                    except Exception:
-                        pass
+                except Exception:
+                    pass
 
             if version_text:
                 self.os_version = version_text
@@ -881,8 +1145,16 @@ class FritzBox:
             print(f"❌ Fehler beim Ermitteln der Firmware-Version: {e}")
             return False
 
-    @require_login
     def get_box_model(self) -> str | bool:
+        """Ermittelt das Box-Modell – zuerst per Boxinfo-Endpunkt, sonst über die Oberfläche."""
+        info = self.lade_boxinfo()
+        if info:
+            print(f"✅ Box-Modell: {self.box_model} ({info['name']}, per Boxinfo).")
+            return self.box_model
+        return self._get_box_model_ui()
+
+    @require_login
+    def _get_box_model_ui(self) -> str | bool:
         """
         Ermittelt das Fritzbox-Modell mit einer robusten 3-Stufen-Strategie.
         Gibt bei Fehlschlag False zurück, um den Workflow korrekt zu steuern.
@@ -902,35 +1174,37 @@ class FritzBox:
             '//div[@class="boxInfo"]/span',
             '//*[@id="uiVersion"]/div/div'
         ]
-        for xpath in xpaths_to_check:
-            try:
-                element = self.browser.sicher_warten(xpath, timeout=3, sichtbar=False)
-                model = self._extract_model_number(element)
-                if model:
-                    self.box_model = model
-                    print(f"✅ Box-Modell: {self.box_model} (gefunden auf aktueller Seite).")
-                    return self.box_model
-            except Exception:
-                continue
+        model = self._model_aus_kandidaten(xpaths_to_check)
+        if model:
+            self.box_model = model
+            print(f"✅ Box-Modell: {self.box_model} (gefunden auf aktueller Seite).")
+            return self.box_model
 
         print("   (Stufe 2/3: Suche auf Übersichtsseite)")
         if self.browser.klicken('//*[@id="overview"] | //*[@id="mHome"]', timeout=3):
             time.sleep(2)
-            for xpath in xpaths_to_check:
-                try:
-                    element = self.browser.sicher_warten(xpath, timeout=3, sichtbar=False)
-                    model = self._extract_model_number(element)
-                    if model:
-                        self.box_model = model
-                        print(f"✅ Box-Modell: {self.box_model} (gefunden auf Übersichtsseite).")
-                        return self.box_model
-                except Exception:
-                    continue
+            model = self._model_aus_kandidaten(xpaths_to_check)
+            if model:
+                self.box_model = model
+                print(f"✅ Box-Modell: {self.box_model} (gefunden auf Übersichtsseite).")
+                return self.box_model
 
         print("❌ Box-Modell konnte nicht identifiziert werden.")
         self.box_model = "UNKNOWN"
         return False  # KORREKTUR: Bei Fehlschlag False zurückgeben, nicht None.
 
+    def _model_aus_kandidaten(self, xpaths, timeout=3) -> str | None:
+        """Wartet auf einen der Kandidaten und liest das Modell aus allen vorhandenen Treffern (nach Priorität)."""
+        index, _ = self.browser.erster_treffer(xpaths, timeout=timeout)
+        if index is None:
+            return None
+        for element in self.browser.alle_treffer(xpaths):
+            if element is not None:
+                model = self._extract_model_number(element)
+                if model:
+                    return model
+        return None
+
     def _extract_model_number(self, element) -> str | None:
         """
         Extrahiert die 4-stellige Modellnummer aus dem textContent eines Elements.
@@ -1061,67 +1335,41 @@ class FritzBox:
                 time.sleep(1)
                 if not self.browser.klicken('//*[@id="chan"]', timeout=5): raise Exception(
                     "Konnte 'Funkkanal' nicht klicken.")
-                time.sleep(15)
-
-                try:
-                    self.browser.klicken('//button[contains(text(),"WLAN einschalten")]', timeout=5, versuche=1)
-                except Exception as e:
-                    print(e)
-                    pass
-                try:
-                    self.browser.klicken('//a[contains(text(),"WLAN einschalten")]', timeout=5, versuche=1)
-                except Exception as e:
-                    print(e)
-                    pass
-
-                # --- Logik für MODERNE UI (div-basiert) ---
-
-                modern_row_xpath = '//div[@class="flexRow" and .//div[@prefid="rssi"]]'
-                num_modern_rows = len(self.browser.driver.find_elements(By.XPATH, modern_row_xpath))
-
-                if num_modern_rows > 0:
-                    print(f"📶 Moderne UI erkannt. {num_modern_rows} Netzwerke gefunden.")
-                    print("\n📋 Ergebnisübersicht:\n")
-                    for i in range(num_modern_rows):
-                        try:
-                            row = self.browser.driver.find_element(By.XPATH, f"({modern_row_xpath})[{i + 1}]")
-                            name = row.find_element(By.XPATH, './/div[@prefid="name"]').text.strip()
-                            freq = row.find_element(By.XPATH, './/div[@prefid="band"]').text.strip()
-                            channel = row.find_element(By.XPATH, './/div[@prefid="channel"]').text.strip()
-                            mac = row.find_element(By.XPATH, './/div[@prefid="mac"]').text.strip()
-                            signal_title = row.find_element(By.XPATH, './/div[@prefid="rssi"]').get_attribute(
-                                "title").strip()
-                            self.print_wlan_entry(i, name, freq, channel, mac, signal_title)
-                            self.wlan_scan_results.append({
-                                "name": name,
-                                "frequency": freq,
-                                "channel": channel,
-                                "mac": mac,
-                                "signal": signal_title
-                            })
-                        except Exception as e:
-                            print(f"⚠️ Fehler beim Verarbeiten von Netzwerk #{i + 1}")
-                    self.is_wifi_checked = True
-                    return True
-
-                # --- Fallback-Logik für ALTE UI (Tabellen-basiert) ---
-                old_table_row_xpath = '//tbody[@id="uiScanResultBody"]/tr'
-                num_table_rows = len(self.browser.driver.find_elements(By.XPATH, old_table_row_xpath))
-
-                if num_table_rows > 0:
-                    print(f"📶 Alte Tabellen-UI erkannt. {num_table_rows} Netzwerke gefunden.")
+                # Warten, bis Scan-Ergebnisse oder der "WLAN einschalten"-Hinweis erscheinen
+                warte_bis(element_vorhanden(self.browser,
+                                            '//div[@class="flexRow" and .//div[@prefid="rssi"]]',
+                                            '//tbody[@id="uiScanResultBody"]/tr',
+                                            '//*[self::button or self::a][contains(text(),"WLAN einschalten")]'),
+                          timeout=15, beschreibung="WLAN-Scan")
+                # Der Scan fügt nach der ersten Zeile noch weitere hinzu → warten, bis die Anzahl stabil ist
+                zeilen = lambda: self.browser.driver.execute_script(WLAN_ZEILEN_JS)
+                if zeilen():
+                    warte_bis(wert_stabil(zeilen, ruhezeit=2), timeout=20,
+                              strategie=PollStrategie(intervall=0.5, faktor=1, max_intervall=0.5),
+                              beschreibung="WLAN-Scan abgeschlossen")
+
+                if self.browser.klicken_falls_vorhanden('//button[contains(text(),"WLAN einschalten")]'):
+                    print("📶 'WLAN einschalten' geklickt.")
+                if self.browser.klicken_falls_vorhanden('//a[contains(text(),"WLAN einschalten")]'):
+                    print("📶 'WLAN einschalten' geklickt.")
+
+                # Gesamte Tabelle (moderne und alte UI) in einem einzigen Round-Trip auslesen
+                scan = self.browser.driver.execute_script(WLAN_SCAN_JS) or {}
+                rows = scan.get("rows") or []
+
+                if rows:
+                    if scan.get("layout") == "modern":
+                        print(f"📶 Moderne UI erkannt. {len(rows)} Netzwerke gefunden.")
+                    else:
+                        print(f"📶 Alte Tabellen-UI erkannt. {len(rows)} Netzwerke gefunden.")
                     print("\n📋 Ergebnisübersicht:\n")
-                    for i in range(num_table_rows):
+                    for i, row in enumerate(rows):
                         try:
-                            row = self.browser.driver.find_element(By.XPATH, f"({old_table_row_xpath})[{i + 1}]")
-                            cols = row.find_elements(By.TAG_NAME, 'td')
-                            if len(cols) < 4: continue
-
-                            signal_title = cols[0].get_attribute("title").strip()
-                            name = cols[1].text.strip()
-                            freq = cols[2].text.strip()  # this is apparently freq in the old Version
-                            mac = cols[3].text.strip()
-                            channel = cols[4].text.strip()  # fragwürdig
+                            name = (row.get("name") or "").strip()
+                            freq = (row.get("frequency") or "").strip()
+                            channel = (row.get("channel") or "").strip()
+                            mac = (row.get("mac") or "").strip()
+                            signal_title = (row.get("signal") or "").strip()
                             self.print_wlan_entry(i, name, freq, channel, mac, signal_title)
                             self.wlan_scan_results.append({
                                 "name": name,
@@ -1164,14 +1412,33 @@ class FritzBox:
             print(f"⚠️ Fehler beim Verarbeiten von Netzwerk #{index + 1}:")
 
     @require_login
-    def perform_firmware_update(self, firmware_path: str) -> bool:
-        """Führt ein Firmware-Update durch und stellt vorher einen sauberen UI-Zustand her."""
+    def perform_firmware_update(self, firmware_path: str, erwartete_version: str | None = None) -> bool:
+        """
+        Führt ein Firmware-Update durch und stellt vorher einen sauberen UI-Zustand her.
+        Mit erwartete_version wird nach dem Neustart geprüft, ob die Box diese Version meldet.
+        """
         if not firmware_path or not os.path.exists(firmware_path):
             print(f"❌ Firmware-Datei nicht gefunden unter: {firmware_path}")
             return False
 
+        self._login_vergessen()  # Upload und Neustart beenden die Session
+        if not self.firmware_manager.ist_intakt(firmware_path):
+            print("❌ Firmware-Update abgebrochen: Image hat die Integritätsprüfung nicht bestanden.")
+            return False
+
         print(f"🆙 Firmware-Update wird mit Datei gestartet: {os.path.basename(firmware_path)}")
 
+        # Schneller Weg: direkter, gestreamter Upload ohne Browser
+        if self._firmware_update_per_http(firmware_path):
+            print("📤 Firmware per HTTP hochgeladen... Die Box startet nun neu.")
+            # Das Flashen läuft noch bei erreichbarer Box, daher großzügige Frist bis zum Neustart
+            if self._warte_auf_neustart_beginn(max_wartezeit=180):
+                return self._warte_nach_update(erwartete_version, neustart_begonnen=True)
+            # Upload-Endpunkt und Formularfelder sind nicht an jeder Box belegt: einmal über die Oberfläche
+            print("⚠️ Kein Neustart nach dem direkten Upload – Image wird über die Oberfläche hochgeladen.")
+            if not self.is_logged_in_and_menu_ready(timeout=3) and not self.login(self.password):
+                return False
+
         try:
             print("...navigiere zur Hauptseite für einen sauberen Start.")
             self.browser.klicken('//*[@id="mHome"] | //*[@id="overview"]')
@@ -1213,59 +1480,107 @@ class FritzBox:
                 return False
 
             print("📤 Firmware wird hochgeladen... Die Box startet nun neu.")
-            # --- NEU: Aktiv auf die Box warten ---
-            # Wir geben ihr großzügig Zeit (40 Versuche * 10s = 400s)
-            time.sleep(60)
-            if self.warte_auf_erreichbarkeit(versuche=40, delay=10):
-                # this needs login check for
-                print("✅ Box ist nach dem Update wieder erreichbar.")
-                return True
-            else:
-                print("❌ Box ist nach dem Update nicht wieder erreichbar.")
-                return False
+            return self._warte_nach_update(erwartete_version)
 
         except Exception as e:
             print(f"❌ Unerwarteter Fehler während des Firmware-Updates")
             return False
 
-    def _prepare_version_info(self) -> bool:
-        """Bereitet Versions- und Modellinformationen vor."""
-        current_version_str = self.os_version or "0.0"
-        match = re.search(r'(\d{1,2}\.\d{2})', current_version_str)
-        self._clean_current_version = match.group(1) if match else ""
-        self._major_version = int(self._clean_current_version.split('.')[0]) if self._clean_current_version else 0
-        self._model_info = self.firmware_manager.firmware_mapping.get(self.box_model)
+    def _firmware_update_per_http(self, firmware_path: str) -> bool:
+        """
+        Lädt das Image direkt per HTTP an den Update-Endpunkt hoch (gestreamt, ohne Browser).
+        Gibt False zurück, wenn der Weg nicht möglich ist und noch nichts gesendet wurde – dann wird die Oberfläche genutzt.
+        Bricht der Upload ab, nachdem die Box schon Daten erhalten hat, wird nicht sofort erneut hochgeladen:
+        ob sie das Image übernommen hat, zeigt erst der Neustart (sonst Upload über die Oberfläche).
+        """
+        # Gültige SID weiterverwenden, sonst frisch anmelden
+        try:
+            if not self.login_sid():
+                return False
+        except SidLoginGesperrt as e:
+            print(f"⚠️ {e} – Upload über die bereits angemeldete Oberfläche.")
+            return False
+        try:
+            if not lade_firmware_hoch(self.http, self.url, self.sid, firmware_path):
+                print("⚠️ Box hat den direkten Upload nicht angenommen.")
+                return False
+            return True
+        except UploadAbgebrochen as e:
+            print(f"⚠️ {e} – Box kann das Image übernommen haben, warte auf den Neustart.")
+            return True
+        except Exception as e:
+            print(f"⚠️ Direkter Firmware-Upload fehlgeschlagen: {e}")
+            return False
+
+    def _warte_nach_update(self, erwartete_version: str | None = None, neustart_begonnen: bool = False) -> bool:
+        """
+        Wartet nach dem Upload auf Neustart und Wiedererreichbarkeit der Box und prüft danach
+        per jason_boxinfo.xml, ob die Box die geflashte Version meldet.
+        """
+        # Das Flashen läuft noch bei erreichbarer Box, daher großzügige Frist bis zum Neustart
+        if not neustart_begonnen and not self._warte_auf_neustart_beginn(max_wartezeit=180):
+            print("❌ Box ist nach dem Upload nicht neu gestartet – Image wurde nicht übernommen.")
+            return False
+        self.boxinfo = None  # Version hat sich geändert
+        self.sid = None  # Neustart beendet die Session
+        if not self.warte_auf_erreichbarkeit(versuche=40, delay=10):
+            print("❌ Box ist nach dem Update nicht wieder erreichbar.")
+            return False
+        print("✅ Box ist nach dem Update wieder erreichbar.")
+        if not erwartete_version:
+            return True
+
+        info = self.lade_boxinfo(neu_laden=True)
+        if not info or not info["os_version"]:
+            print(f"⚠️ Version nach dem Update nicht per Boxinfo lesbar – erwarte {erwartete_version}.")
+            return True
+        if FritzOSVersion.parse(info["os_version"]) != FritzOSVersion.parse(erwartete_version):
+            print(f"❌ Box meldet nach dem Update {info['os_version']} statt {erwartete_version}.")
+            return False
+        print(f"✅ Box meldet die geflashte Version {info['os_version']}.")
+        return True
+
+    def bereite_firmware_update_vor(self) -> bool:
+        """
+        Host-seitige Vorbereitung des Firmware-Updates (Pfad planen, Images finden und prüfen).
+        Braucht weder Browser noch Box und kann daher parallel zu Oberflächen-Schritten laufen.
+        """
+        if not self.box_model:
+            return True
+        self.update_vorbereitung = (self.os_version,
+                                    self.firmware_manager.bereite_update_vor(self.box_model, self.os_version,
+                                                                             self.ziel_version))
         return True
 
     @require_login
     def update_firmware(self) -> bool:
-        """Entscheidet und führt das passende Firmware-Update durch."""
-        self._prepare_version_info()
-        if self._major_version < 7 and self._model_info and "bridge" in self._model_info:
-            print("ℹ️ Mehrstufiges Update erforderlich (alt -> bridge -> final).")
-            return self._perform_bridge_update()
-
-        if self._model_info:
-            target_version = self._model_info.get("final", "")
-            if self._clean_current_version and target_version and \
-                    self._clean_current_version.replace("0", "") == target_version.replace("0", ""):
-                print(f"✅ Firmware ist bereits auf Zielversion ({self._clean_current_version}).")
-                return True
-            print(f"ℹ️ Update von {self._clean_current_version} auf {target_version} wird durchgeführt.")
-            final_path = self.firmware_manager.get_firmware_path(self.box_model, "final")
-            return self.perform_firmware_update(final_path) if final_path else False
+        """Plant den kürzesten Update-Pfad zur Zielversion und flasht die nötigen Images nacheinander."""
+        update_pfad = self.firmware_manager.plane_update(self.box_model, self.os_version, self.ziel_version)
+        if update_pfad is None and self.ziel_version:
+            print(f"❌ Zielversion {self.ziel_version} ist für {self.box_model} über keinen erlaubten Update-Pfad erreichbar.")
+            return False
+        if update_pfad is None:
+            print("Keine Update-Regel für dieses Modell gefunden.")
+            return True
+        if not update_pfad:
+            print(f"✅ Firmware ist bereits auf Zielversion ({self.os_version}).")
+            return True
 
-        print("Keine Update-Regel für dieses Modell gefunden.")
+        print(f"ℹ️ Update-Pfad von {self.os_version} : {' -> '.join(update_pfad)} "
+              f"({len(update_pfad)} Neustart{'s' if len(update_pfad) > 1 else ''}).")
+        vorbereitet = {}
+        if self.update_vorbereitung and self.update_vorbereitung[0] == self.os_version:
+            vorbereitet = self.update_vorbereitung[1]
+        for version in update_pfad:
+            firmware_path = vorbereitet.get(version) or self.firmware_manager.get_firmware_path(self.box_model,
+                                                                                              version=version)
+            if not firmware_path or not self.perform_firmware_update(firmware_path, version):
+                return False
+            self.os_version = version
+            if self.bei_update_fortschritt:
+                self.bei_update_fortschritt(version)
         return True
 
-    def _perform_bridge_update(self) -> bool:
-        """Mehrstufiges Update: erst Bridge, dann Final."""
-        bridge_path = self.firmware_manager.get_firmware_path(self.box_model, "bridge")
-        if bridge_path and not self.perform_firmware_update(bridge_path):
-            return False
-        final_path = self.firmware_manager.get_firmware_path(self.box_model, "final")
-        return self.perform_firmware_update(final_path) if final_path else False
-
     def show_wlan_summary(self) -> bool:
         """Zeigt gespeicherte WLAN-Scan-Ergebnisse an."""
         if not self.wlan_scan_results:
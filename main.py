@@ -1,7 +1,31 @@
 # main.py
 
+import sys
 import time
 
+def main_multi(urls):
+    """
+    Mehrplatzbetrieb: bearbeitet alle übergebenen Box-URLs gleichzeitig.
+    Aufruf z.B.: python main.py http://192.168.178.1 http://192.168.179.1
+    """
+    from multi_box_runner import MultiBoxRunner
+
+    password = ""
+    while not password:
+        password = input("🔑 FritzBox-Passwort für alle Boxen eingeben: ").strip()
+    MultiBoxRunner(urls).run(password)
+
+def main_batch(manifest_pfad, ergebnis_datei=None):
+    """
+    Unbeaufsichtigter Batchbetrieb nach Manifest (JSON/CSV), ohne jede Eingabeaufforderung.
+    Aufruf z.B.: python main.py --batch rack.json ergebnisse.csv
+    """
+    from batch_runner import BatchRunner, lade_manifest
+
+    if ergebnis_datei is None:
+        ergebnis_datei = f"ergebnisse_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    BatchRunner(lade_manifest(manifest_pfad), ergebnis_datei).run()
+
 def main():
     """
     Hauptfunktion des Programms zur Verwaltung von FritzBoxen.
@@ -9,9 +33,22 @@ def main():
     """
     print("🚀 Starte FritzBox-Verwaltungsprogramm...")
 
-    # Instanz des Workflow-Orchestrators erstellen
+    # Manifest → Batchbetrieb ohne Rückfragen
+    if len(sys.argv) > 2 and sys.argv[1] == "--batch":
+        main_batch(*sys.argv[2:4])
+        return
+
+    # Box-URLs als Argumente → Mehrplatzbetrieb
+    if len(sys.argv) > 1:
+        main_multi(sys.argv[1:])
+        return
+
+    # Instanz des Workflow-Orchestrators erstellen; der Browser bleibt zwischen den Boxen warm
+    from browser_pool import BrowserPool
     from workflow_orchestrator import WorkflowOrchestrator
-    orchestrator = WorkflowOrchestrator()
+    browser_pool = BrowserPool(groesse=1)
+    browser_pool.vorwaermen()
+    orchestrator = WorkflowOrchestrator(browser_pool=browser_pool)
 
     try:
         while True:
@@ -27,8 +64,8 @@ def main():
 
             if result == "restart":
                 print("\n🔁 Starte den Workflow für eine neue FritzBox...")
-                # Die orchestrator-Instanz kann wiederverwendet werden, da sie den Browser am Ende beendet.
-                # Bei einem "restart" wird im orchestrator ein neuer Browser und FritzBox-Objekt erstellt.
+                # Die orchestrator-Instanz kann wiederverwendet werden, da sie den Browser am Ende an den Pool zurückgibt.
+                # Bei einem "restart" leiht der orchestrator einen warmen Browser aus und erstellt ein neues FritzBox-Objekt.
                 continue
             else:
                 # Workflow beendet oder abgebrochen
@@ -39,6 +76,8 @@ def main():
         print(f"\n catastrophic_error: Ein unerwarteter Fehler ist aufgetreten: {e}")
         print("Das Programm wird in 15 Sekunden beendet.")
         time.sleep(15)
+    finally:
+        browser_pool.schliessen()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
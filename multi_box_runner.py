@@ -0,0 +1,79 @@
+# multi_box_runner.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+from browser_pool import BrowserPool
+from fritzbox_api import FirmwareManager
+from workflow_orchestrator import WorkflowOrchestrator
+
+
+class MultiBoxRunner:
+    """
+    Führt den kompletten Workflow für mehrere FritzBoxen gleichzeitig aus.
+    Jede Box erhält einen eigenen WorkflowOrchestrator (und damit ein eigenes
+    Browser/FritzBox-Paar) mit fester Ziel-URL. Die Abarbeitung läuft in einem
+    Thread-Pool, da die Schritte fast ausschließlich auf Netzwerk/Browser warten.
+    """
+
+    def __init__(self, urls: list[str], max_parallel: int | None = None, browser_profil: str = "lean"):
+        if not urls:
+            raise ValueError("Es muss mindestens eine Box-URL angegeben werden.")
+        self.urls = list(urls)
+        self.max_parallel = max_parallel or len(self.urls)
+        # Ein gemeinsamer FirmwareManager und ein warmer Browser-Pool für alle Boxen
+        self.firmware_manager = FirmwareManager(interaktiv=False)
+        # Standardmäßig das schlanke Headless-Profil, damit ein PC möglichst viele Boxen treiben kann
+        self.browser_pool = BrowserPool(groesse=self.max_parallel, profil=browser_profil)
+
+    def _orchestrator(self, url: str, **optionen) -> WorkflowOrchestrator:
+        """Eigener Orchestrator pro Box, mit gemeinsamem FirmwareManager und Browser-Pool."""
+        return WorkflowOrchestrator(url=url, interaktiv=False, firmware_manager=self.firmware_manager,
+                                    browser_pool=self.browser_pool, **optionen)
+
+    def _bearbeite_box(self, url: str, password: str) -> str | None:
+        """Führt den Workflow für genau eine Box aus (läuft in einem Worker-Thread)."""
+        return self._orchestrator(url).run_full_workflow(password)
+
+    def _parallel_ausfuehren(self, auftraege: list, bearbeiten, bei_ergebnis, thread_name: str = "fritzbox"):
+        """
+        Führt bearbeiten(auftrag) für alle Aufträge im Thread-Pool aus (Browser-Pool vorher aufgewärmt,
+        danach immer geschlossen). bei_ergebnis(auftrag, ergebnis, fehler) läuft im aufrufenden Thread,
+        sobald eine Box fertig ist; fehler ist die Ausnahme des Workers oder None.
+        """
+        self.browser_pool.vorwaermen()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix=thread_name) as pool:
+                futures = {pool.submit(bearbeiten, auftrag): auftrag for auftrag in auftraege}
+                for future in as_completed(futures):
+                    try:
+                        ergebnis, fehler = future.result(), None
+                    except Exception as e:
+                        ergebnis, fehler = None, e
+                    bei_ergebnis(futures[future], ergebnis, fehler)
+        finally:
+            # Auch nach einem Fehler (z.B. Strg+C) keine Chrome-Prozesse zurücklassen
+            self.browser_pool.schliessen()
+
+    def run(self, password: str) -> dict:
+        """
+        Startet alle Boxen parallel und wartet auf deren Abschluss.
+        Gibt ein Dict {url: "ok" | None} zurück.
+        """
+        print(f"🚀 Starte Mehrplatzbetrieb für {len(self.urls)} FritzBoxen (max. {self.max_parallel} parallel)...")
+        start = time.time()
+        ergebnisse = {}
+
+        def bei_ergebnis(url, ergebnis, fehler):
+            if fehler:
+                print(f"❌ [{url}] Unerwarteter Fehler: {fehler}")
+            ergebnisse[url] = ergebnis
+
+        self._parallel_ausfuehren(self.urls, lambda url: self._bearbeite_box(url, password), bei_ergebnis)
+
+        dauer = time.time() - start
+        erfolgreich = sum(1 for r in ergebnisse.values() if r == "ok")
+        print(f"\n🏁 Mehrplatzbetrieb beendet: {erfolgreich}/{len(self.urls)} Boxen erfolgreich in {dauer / 60:.1f} min.")
+        for url in self.urls:
+            status = "✅" if ergebnisse.get(url) == "ok" else "❌"
+            print(f"   {status} {url}")
+        return ergebnisse
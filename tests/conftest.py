@@ -0,0 +1,44 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Die Module liegen flach im Projektverzeichnis
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_fritzbox import FakeFritzBox
+from fritz_http import FritzHttpClient
+
+
+@pytest.fixture
+def fake_box():
+    """Laufende FakeFritzBox ohne Latenz und mit kurzen Neustart-/Flash-Zeiten."""
+    with FakeFritzBox(neustart_dauer=0.5, flash_dauer=0.2) as box:
+        yield box
+
+
+@pytest.fixture
+def http():
+    client = FritzHttpClient()
+    yield client
+    client.schliessen()
+
+
+@pytest.fixture(scope="session")
+def chrome():
+    """Headless Chrome (lean-Profil); ohne Chrome/chromedriver werden die Browser-Tests übersprungen."""
+    pytest.importorskip("selenium")
+    from browser_utils import setup_browser
+    try:
+        driver = setup_browser("lean")
+    except Exception as e:
+        pytest.skip(f"Chrome nicht verfügbar: {e}")
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def browser(chrome):
+    from browser_utils import Browser
+    return Browser(chrome)
@@ -0,0 +1,88 @@
+# tests/test_batch_runner.py
+import json
+
+import pytest
+
+from batch_runner import lade_manifest, STANDARD_POLITIK
+from workflow_orchestrator import WorkflowOrchestrator, WORKFLOW_SCHRITT_IDS
+
+
+def manifest(tmp_path, daten, name="rack.json"):
+    pfad = tmp_path / name
+    pfad.write_text(json.dumps(daten), encoding="utf-8")
+    return pfad
+
+
+def test_vorgaben_und_umwandlung(tmp_path):
+    geladen = lade_manifest(manifest(tmp_path, {
+        "passwoerter": ["standard"],
+        "ziel_firmware": "7.59",
+        "max_parallel": "2",
+        "politik": {"max_versuche": "3", "optionale_schritte": ["wlan_antennen"]},
+        "boxen": [
+            {"slot": 12, "url": "http://192.168.178.1/", "passwoerter": "pw1 | pw2", "ziel_firmware": "08.20"},
+            {"url": "http://192.168.179.1"},
+        ],
+    }))
+    assert geladen["boxen"] == [
+        {"slot": "12", "url": "http://192.168.178.1", "passwoerter": ["pw1", "pw2"], "ziel_firmware": "08.20"},
+        {"slot": "#2", "url": "http://192.168.179.1", "passwoerter": ["standard"], "ziel_firmware": "07.59"},
+    ]
+    assert geladen["max_parallel"] == 2
+    assert geladen["politik"] == {**STANDARD_POLITIK, "max_versuche": 3, "optionale_schritte": ["wlan_antennen"]}
+
+
+@pytest.mark.parametrize("daten, meldung", [
+    ({"ziel_firmware": 7.59}, "als Text"),
+    ({"ziel_firmware": "neueste"}, "keine FRITZ!OS-Version"),
+    ({"politik": {"max_versuche": "drei"}}, "max_versuche"),
+    ({"politik": {"max_versuche": 0}}, "max_versuche"),
+    ({"politik": {"box_wiederholungen": -1}}, "box_wiederholungen"),
+    ({"politik": {"optionale_schritte": ["wlan"]}}, "unbekannte Schritt-ids"),
+    ({"politik": {"optionale_schritte": "wlan_antennen"}}, "Liste"),
+    ({"politik": {"max_versuch": 3}}, "unbekannte Politik-Schlüssel"),
+    ({"max_parallel": 0}, "max_parallel"),
+])
+def test_ungueltige_werte(tmp_path, daten, meldung):
+    daten = {"passwoerter": ["pw"], "boxen": [{"url": "http://192.168.178.1"}], **daten}
+    with pytest.raises(ValueError, match=meldung):
+        lade_manifest(manifest(tmp_path, daten))
+
+
+def test_ungueltige_boxen(tmp_path):
+    with pytest.raises(ValueError, match="keine URL"):
+        lade_manifest(manifest(tmp_path, {"passwoerter": ["pw"], "boxen": [{"slot": "R1"}]}))
+    with pytest.raises(ValueError, match="keine Passwörter"):
+        lade_manifest(manifest(tmp_path, {"boxen": [{"url": "http://a"}]}))
+    with pytest.raises(ValueError, match="eindeutig"):
+        lade_manifest(manifest(tmp_path, {"passwoerter": ["pw"], "boxen": [{"url": "http://a"}, {"url": "http://a/"}]}))
+    with pytest.raises(ValueError, match="'slot' muss Text"):
+        lade_manifest(manifest(tmp_path, {"passwoerter": ["pw"], "boxen": [{"url": "http://a", "slot": 1.5}]}))
+
+
+def test_csv_mit_politik_datei(tmp_path):
+    pfad = tmp_path / "rack.csv"
+    pfad.write_text("slot,url,passwoerter,ziel_firmware\nR1,http://192.168.178.1,pw1|pw2,07.59\n"
+                    "R2,http://192.168.179.1,pw3,\n", encoding="utf-8")
+    assert lade_manifest(pfad)["politik"] == STANDARD_POLITIK
+
+    (tmp_path / "rack.politik.json").write_text(json.dumps({"max_versuche": 1, "box_wiederholungen": 0}),
+                                                encoding="utf-8")
+    geladen = lade_manifest(pfad)
+    assert geladen["politik"]["max_versuche"] == 1
+    assert geladen["boxen"][1] == {"slot": "R2", "url": "http://192.168.179.1", "passwoerter": ["pw3"],
+                                   "ziel_firmware": None}
+
+
+class BeliebigeBox:
+    """Stellt für jedes Attribut eine Methode bereit – genug, um den Schritt-Graphen aufzubauen."""
+
+    def __getattr__(self, name):
+        return lambda *args: True
+
+
+def test_schritt_ids_entsprechen_dem_workflow_graphen():
+    orchestrator = WorkflowOrchestrator.__new__(WorkflowOrchestrator)
+    orchestrator.fritzbox = BeliebigeBox()
+    graph = orchestrator.workflow_graph("pw")
+    assert tuple(schritt.id for schritt in graph.schritte) == WORKFLOW_SCHRITT_IDS
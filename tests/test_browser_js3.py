@@ -0,0 +1,31 @@
+# tests/test_browser_js3.py
+import pytest
+
+from fake_fritzbox import FakeFritzBox
+from fritz_sid import hole_sid
+
+
+@pytest.fixture
+def js3_box():
+    with FakeFritzBox(ui="js3", tasten_dauer=0.2) as box:
+        yield box
+
+
+def system_seite_oeffnen(browser, box, http):
+    sid = hole_sid(http, box.url, "geheim")
+    browser.get_url(f"{box.url}/system?sid={sid}")
+
+
+def test_kachel_ueber_text_im_shadow_root(browser, js3_box, http):
+    system_seite_oeffnen(browser, js3_box, http)
+    assert browser.js3_warten("js3-tile", text="Werkseinstellungen", timeout=5)
+    assert browser.js3_wert("js3-tile", ta_id="ag6vu9") == "Werkseinstellungen"
+
+
+def test_fehltreffer_werden_nicht_gemerkt(browser, js3_box, http):
+    system_seite_oeffnen(browser, js3_box, http)
+    assert browser.js3_finden("js3-button", attribute={"level": "critical"}) is None
+    assert browser.js3_klicken("js3-tile", text="Werkseinstellungen")
+    assert browser.js3_warten("js3-button", attribute={"level": "critical"}, sichtbar=True, timeout=5)
+    assert browser.js3_klicken("js3-button", attribute={"level": "critical"}, sichtbar=True)
+    assert browser.js3_warten("button", attribute={"title": "OK"}, timeout=5)
@@ -0,0 +1,20 @@
+# tests/test_browser_lean.py
+import pytest
+
+# Ruft eine URL per fetch ab und meldet "blockiert" oder den HTTP-Status
+ABRUFEN_JS = """
+const fertig = arguments[arguments.length - 1];
+fetch(arguments[0]).then(r => fertig(r.status), () => fertig('blockiert'));
+"""
+
+
+@pytest.mark.parametrize("pfad, blockiert", [
+    ("/css/logo.png", True),
+    ("/css/logo.png?v=7.59", True),
+    ("/fonts/source.woff2?v=1", True),
+    ("/js/icons.js?v=1", False),
+])
+def test_lean_profil_blockiert_assets_auch_mit_query(browser, fake_box, pfad, blockiert):
+    browser.get_url(fake_box.url)
+    ergebnis = browser.driver.execute_async_script(ABRUFEN_JS, f"{fake_box.url}{pfad}")
+    assert (ergebnis == "blockiert") is blockiert
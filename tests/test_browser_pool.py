@@ -0,0 +1,15 @@
+# tests/test_browser_pool.py
+from browser_pool import BrowserPool
+
+
+def test_zuruecksetzen_leert_cookies_aller_boxen(browser, fake_box):
+    for host in ("127.0.0.1", "localhost"):
+        browser.get_url(f"http://{host}:{fake_box.port}/")
+        browser.driver.add_cookie({"name": "sid", "value": host})
+    navigationen = browser.navigationen
+
+    pool = BrowserPool(groesse=0)
+    assert pool._zuruecksetzen(browser)
+    assert browser.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"] == []
+    assert browser.driver.current_url == "about:blank"
+    assert browser.navigationen == navigationen + 1
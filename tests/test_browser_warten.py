@@ -0,0 +1,59 @@
+# tests/test_browser_warten.py
+import time
+
+import pytest
+
+from browser_utils import Browser
+from fake_fritzbox import FakeFritzBox
+from fritz_sid import hole_sid
+
+# Fügt nach kurzer Verzögerung ein verstecktes und danach ein sichtbares Element mit gleicher Klasse ein
+SPAETE_ELEMENTE_JS = """
+setTimeout(() => {
+    for (const [text, versteckt] of [['versteckt', true], ['sichtbar', false]]) {
+        const el = document.createElement('p');
+        el.className = 'spaet';
+        el.textContent = text;
+        if (versteckt) el.style.display = 'none';
+        document.body.appendChild(el);
+    }
+}, 300);
+"""
+
+
+@pytest.fixture
+def scan_box():
+    with FakeFritzBox(scan_dauer=0.5) as box:
+        yield box
+
+
+@pytest.fixture(params=[True, False], ids=["beobachter", "webdriverwait"])
+def wartender_browser(request, chrome):
+    return Browser(chrome, beobachten=request.param)
+
+
+def seite_oeffnen(browser, box, http, pfad):
+    sid = hole_sid(http, box.url, "geheim")
+    browser.get_url(f"{box.url}{pfad}?sid={sid}")
+
+
+def test_wartet_auf_spaet_erscheinende_scan_ergebnisse(wartender_browser, scan_box, http):
+    seite_oeffnen(wartender_browser, scan_box, http, "/wlan/chan")
+    start = time.time()
+    zeilen = wartender_browser.sicher_warten('//tbody[@id="uiScanResultBody"]/tr', timeout=5, mehrere=True)
+    assert len(zeilen) == len(scan_box.netzwerke)
+    assert time.time() - start < 3
+
+
+def test_erstes_sichtbares_element_in_beiden_wegen(wartender_browser, scan_box, http):
+    seite_oeffnen(wartender_browser, scan_box, http, "/wlan")
+    wartender_browser.driver.execute_script(SPAETE_ELEMENTE_JS)
+    element = wartender_browser.sicher_warten('//p[@class="spaet"]', timeout=5)
+    assert element.text == "sichtbar"
+
+
+def test_css_locator_und_timeout(wartender_browser, scan_box, http):
+    seite_oeffnen(wartender_browser, scan_box, http, "/wlan")
+    assert wartender_browser.sicher_warten(("css selector", "#chan"), timeout=2).text == "Funkkanal"
+    with pytest.raises(Exception):
+        wartender_browser.sicher_warten('//*[@id="gibt-es-nicht"]', timeout=0.5)
@@ -0,0 +1,42 @@
+# tests/test_firmware_catalog.py
+import io
+import tarfile
+
+from benchmark import erzeuge_test_image
+from firmware_catalog import lese_image_info, FirmwareKatalog
+
+
+def schreibe_image(pfad, install: bytes):
+    with tarfile.open(pfad, "w") as tar:
+        info = tarfile.TarInfo("./var/install")
+        info.size = len(install)
+        tar.addfile(info, io.BytesIO(install))
+    return pfad
+
+
+def test_modell_aus_metadaten_bei_umbenanntem_image(tmp_path):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590 AX", "08.20", groesse_mb=0.1)
+    umbenannt = image.rename(tmp_path / "firmware_neu.image")
+    info = lese_image_info(umbenannt)
+    assert (info["modell"], info["version"]) == ("7590_AX", "08.20")
+
+
+def test_metadaten_haben_vorrang_vor_dem_dateinamen(tmp_path):
+    pfad = schreibe_image(tmp_path / "FRITZ.Box_7590-07.59.image",
+                          b"#!/bin/sh\n# FRITZ!Box 7530\nnewFWver=164.08.02\n")
+    info = lese_image_info(pfad)
+    assert (info["modell"], info["version"]) == ("7530", "08.02")
+
+
+def test_dateiname_als_rueckfall_ohne_produktname(tmp_path):
+    pfad = schreibe_image(tmp_path / "FRITZ.Box_6660_Cable-08.03.image", b"#!/bin/sh\nnewFWver=275.08.03\n")
+    info = lese_image_info(pfad)
+    assert (info["modell"], info["version"]) == ("6660", "08.03")
+
+
+def test_katalog_findet_umbenanntes_image(tmp_path):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.1)
+    umbenannt = image.rename(tmp_path / "kopie.image")
+    katalog = FirmwareKatalog(tmp_path)
+    katalog.aktualisieren()
+    assert katalog.pfade() == [umbenannt]
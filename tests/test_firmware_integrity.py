@@ -0,0 +1,54 @@
+# tests/test_firmware_integrity.py
+import os
+import tarfile
+
+from benchmark import erzeuge_test_image
+from firmware_integrity import FirmwarePruefer, sha256_datei, tar_vollstaendig
+
+
+def test_vollstaendiges_image(tmp_path):
+    assert tar_vollstaendig(erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.5)) is None
+
+
+def test_abgeschnittenes_image(tmp_path):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.5)
+    os.truncate(image, image.stat().st_size // 2)
+    assert "Dateiende" in tar_vollstaendig(image)
+
+
+def test_fehlendes_archivende(tmp_path):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.5)
+    with tarfile.open(image) as tar:
+        letztes = tar.getmembers()[-1]
+    # Direkt hinter den Daten des letzten Mitglieds abschneiden: Archivende (zwei leere Blöcke) fehlt
+    os.truncate(image, letztes.offset_data + -(-letztes.size // 512) * 512)
+    assert tar_vollstaendig(image) == "Archivende fehlt"
+
+
+def test_leere_datei(tmp_path):
+    image = tmp_path / "leer.image"
+    image.write_bytes(b"")
+    assert tar_vollstaendig(image) is not None
+
+
+def test_ohne_referenz_nur_struktur_geprueft(tmp_path, capsys, monkeypatch):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.5)
+    gehasht = []
+    monkeypatch.setattr("firmware_integrity.sha256_datei", lambda pfad: gehasht.append(pfad))
+    assert FirmwarePruefer(tmp_path).ist_intakt(image)
+    assert not gehasht
+    assert "nur die tar-Struktur" in capsys.readouterr().out
+
+
+def test_neue_oder_geaenderte_referenz_verwirft_den_cache(tmp_path, capsys):
+    image = erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "07.59", groesse_mb=0.5)
+    assert FirmwarePruefer(tmp_path).ist_intakt(image)
+
+    # Referenz kommt nachträglich hinzu: der Cache-Eintrag ohne Referenz gilt nicht mehr
+    image.with_name(image.name + ".sha256").write_text("0" * 64 + f"  {image.name}\n", encoding="utf-8")
+    assert not FirmwarePruefer(tmp_path).ist_intakt(image)
+    assert "SHA-256 stimmt nicht" in capsys.readouterr().out
+
+    image.with_name(image.name + ".sha256").write_text(f"{sha256_datei(image)}  {image.name}\n", encoding="utf-8")
+    assert FirmwarePruefer(tmp_path).ist_intakt(image)
+    assert "nur die tar-Struktur" not in capsys.readouterr().out
@@ -0,0 +1,43 @@
+# tests/test_firmware_planner.py
+import pytest
+
+from firmware_planner import FritzOSVersion, UpgradePlaner
+
+# Eintrag wie in FirmwareManager.firmware_mapping
+MAPPING = {"7590": {"bridge": "07.59", "final": "08.20", "final_ab": "07.00"}}
+
+
+@pytest.fixture
+def planer():
+    return UpgradePlaner.aus_mapping(MAPPING)
+
+
+@pytest.mark.parametrize("aktuell, pfad", [
+    ("06.83", ["07.59", "08.20"]),
+    ("07.29", ["08.20"]),
+    ("08.20", []),
+    ("08.25", []),
+])
+def test_update_pfad(planer, aktuell, pfad):
+    assert planer.plane("7590", aktuell) == pfad
+
+
+def test_unbekannte_version_beginnt_bei_der_bridge(planer):
+    assert planer.plane("7590", None) == ["07.59", "08.20"]
+
+
+def test_unbekanntes_modell(planer):
+    assert planer.plane("9999", "07.29") is None
+
+
+def test_abweichende_zielversion(planer):
+    assert planer.plane("7590", "06.83", ziel="07.59") == ["07.59"]
+
+
+def test_versionen_vergleichen_zweistellig():
+    assert FritzOSVersion.parse("07.50") != FritzOSVersion.parse("7.5")
+    assert FritzOSVersion.parse("07.29") == FritzOSVersion.parse("7.29")
+    assert FritzOSVersion.parse("154.07.29") == FritzOSVersion.parse("FRITZ!OS 07.29")
+    assert FritzOSVersion.parse("07.29-101234") == FritzOSVersion.parse("07.29")
+    assert FritzOSVersion.parse("07.59") < FritzOSVersion.parse("08.02")
+    assert FritzOSVersion.parse("unbekannt") is None
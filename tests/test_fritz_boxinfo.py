@@ -0,0 +1,35 @@
+# tests/test_fritz_boxinfo.py
+from fritz_boxinfo import parse_boxinfo, hole_boxinfo
+
+BEISPIEL = """<j:BoxInfo xmlns:j="http://jason.avm.de/updatecheck/">
+<j:Name>FRITZ!Box 7590 AX</j:Name><j:HW>256</j:HW><j:Version>154.07.57</j:Version><j:Revision>107231</j:Revision>
+<j:Serial>E0:28:6D:11:22:33</j:Serial><j:OEM>avm</j:OEM><j:Lang>de</j:Lang><j:Annex>B</j:Annex><j:Lab/>
+<j:Country>049</j:Country><j:Flag>mesh_master</j:Flag><j:UpdateConfig>2</j:UpdateConfig></j:BoxInfo>"""
+
+
+def test_beispiel_parsen():
+    assert parse_boxinfo(BEISPIEL) == {
+        "name": "FRITZ!Box 7590 AX",
+        "box_model": "7590_AX",
+        "variante": "AX",
+        "os_version": "07.57",
+        "serial": "E0:28:6D:11:22:33",
+        "hw": "256",
+        "oem": "avm",
+    }
+
+
+def test_labor_version_und_lte_modell():
+    info = parse_boxinfo(BEISPIEL.replace("FRITZ!Box 7590 AX", "FRITZ!Box 6890 LTE")
+                         .replace("154.07.57", "162.07.29-101234"))
+    assert (info["box_model"], info["variante"], info["os_version"]) == ("6890_LTE", "LTE", "07.29")
+
+
+def test_unbrauchbare_antwort():
+    assert parse_boxinfo("<html>kein XML") is None
+    assert parse_boxinfo(BEISPIEL.replace("FRITZ!Box 7590 AX", "Repeater")) is None
+
+
+def test_hole_boxinfo_von_der_fake_box(fake_box, http):
+    info = hole_boxinfo(http, fake_box.url)
+    assert (info["box_model"], info["os_version"], info["serial"]) == ("7590", "07.59", fake_box.serial)
@@ -0,0 +1,55 @@
+# tests/test_fritz_sid.py
+import pytest
+
+from fritz_sid import hole_sid, sid_gueltig, abmelden, berechne_antwort, SidLoginAbgelehnt, SidLoginGesperrt
+
+
+def test_hole_sid_liefert_gueltige_sid(fake_box, http):
+    sid = hole_sid(http, fake_box.url, "geheim")
+    assert fake_box.sid_gueltig(sid)
+    assert sid_gueltig(http, fake_box.url, sid)
+
+
+def test_falsches_passwort_wird_abgelehnt(fake_box, http):
+    with pytest.raises(SidLoginAbgelehnt):
+        hole_sid(http, fake_box.url, "falsch")
+    assert not fake_box.sids
+
+
+def test_lange_sperre_ist_keine_ablehnung(fake_box, http):
+    fake_box.sperrzeit = 120
+    with pytest.raises(SidLoginGesperrt) as fehler:
+        hole_sid(http, fake_box.url, "geheim", max_blockzeit=60)
+    assert not isinstance(fehler.value, SidLoginAbgelehnt)
+    assert fehler.value.block_time == 120
+
+
+def test_kurze_sperre_wird_abgewartet(fake_box, http, monkeypatch):
+    gewartet = []
+    monkeypatch.setattr("fritz_sid.time.sleep", gewartet.append)
+    fake_box.sperrzeit = 5
+    assert fake_box.sid_gueltig(hole_sid(http, fake_box.url, "geheim"))
+    assert gewartet == [5]
+
+
+def test_abmelden_macht_sid_ungueltig(fake_box, http):
+    sid = hole_sid(http, fake_box.url, "geheim")
+    abmelden(http, fake_box.url, sid)
+    assert not sid_gueltig(http, fake_box.url, sid)
+    assert not fake_box.sid_gueltig(sid)
+
+
+def test_sid_gueltig_ohne_sid(fake_box, http):
+    assert not sid_gueltig(http, fake_box.url, None)
+    assert not sid_gueltig(http, fake_box.url, "0000000000000000")
+    assert not sid_gueltig(http, fake_box.url, "abcdef0123456789")
+
+
+# Referenzwerte aus der AVM-Dokumentation zu login_sid.lua
+def test_md5_referenzwert():
+    assert berechne_antwort("1234567z", "äbc") == "1234567z-9e224a41eeefa284df7bb0f26c2913e2"
+
+
+def test_pbkdf2_referenzwert():
+    assert berechne_antwort("2$10000$5A1711$2000$5A1722", "1example!") == \
+        "5A1722$1798a1672bca7c6463d6b245f82b53703b0f50813401b03e4045a5861e689adb"
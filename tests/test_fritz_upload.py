@@ -0,0 +1,71 @@
+# tests/test_fritz_upload.py
+import time
+
+import pytest
+
+from benchmark import erzeuge_test_image
+from fritz_boxinfo import hole_boxinfo
+from fritz_sid import hole_sid
+from fritz_upload import lade_firmware_hoch, upload_angenommen, UploadAbgebrochen
+
+
+@pytest.fixture
+def image(tmp_path):
+    return erzeuge_test_image(tmp_path, "FRITZ!Box 7590", "08.20", groesse_mb=2)
+
+
+def test_upload_ohne_export_und_neustart_auf_neue_version(fake_box, http, image):
+    sid = hole_sid(http, fake_box.url, "geheim")
+    assert lade_firmware_hoch(http, fake_box.url, sid, str(image))
+    assert fake_box.letzter_upload == {"version": "08.20", "export": False}
+
+    frist = time.time() + 5
+    while time.time() < frist and (fake_box.ist_offline() or fake_box.offline_ab is not None):
+        time.sleep(0.1)
+    assert hole_boxinfo(http, fake_box.url)["os_version"] == "08.20"
+
+
+def test_upload_ohne_gueltige_sid_wird_abgelehnt(fake_box, http, image):
+    assert not lade_firmware_hoch(http, fake_box.url, "0123456789abcdef", str(image))
+    assert fake_box.letzter_upload is None
+
+
+class AbbrechenderClient:
+    """Liest einen Teil des Bodys und bricht dann wie eine zurückgesetzte Verbindung ab."""
+
+    def __init__(self, bloecke: int):
+        self.bloecke = bloecke
+
+    def post(self, url, data=None, **kwargs):
+        for i, _ in enumerate(data):
+            if i == self.bloecke:
+                raise ConnectionResetError("Verbindung zurückgesetzt")
+        raise AssertionError("Body vollständig gelesen")
+
+
+def test_abbruch_nach_gesendeten_daten(image):
+    with pytest.raises(UploadAbgebrochen) as fehler:
+        lade_firmware_hoch(AbbrechenderClient(bloecke=2), "http://box", "0123456789abcdef", str(image))
+    assert fehler.value.gesendet > 0
+
+
+def test_abbruch_vor_dem_image_ist_kein_upload(image):
+    with pytest.raises(ConnectionResetError):
+        lade_firmware_hoch(AbbrechenderClient(bloecke=0), "http://box", "0123456789abcdef", str(image))
+
+
+def test_leeres_image_wird_nicht_gesendet(tmp_path, http):
+    leer = tmp_path / "leer.image"
+    leer.write_bytes(b"")
+    assert not lade_firmware_hoch(AbbrechenderClient(bloecke=0), "http://box", "0123456789abcdef", str(leer))
+    assert not lade_firmware_hoch(http, "http://box", "0123456789abcdef", str(tmp_path / "fehlt.image"))
+
+
+@pytest.mark.parametrize("status, text, erwartet", [
+    (200, "<p>Das Update wird durchgeführt. Die FRITZ!Box startet neu.</p>", True),
+    (200, '<form><input id="uiPass" type="password"></form>', False),
+    (200, "<p>Die Datei ist keine gültige Firmware.</p>", False),
+    (403, "Die FRITZ!Box startet neu", False),
+])
+def test_upload_angenommen_nur_mit_erfolgsmeldung(status, text, erwartet):
+    assert upload_angenommen(status, text) is erwartet
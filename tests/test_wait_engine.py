@@ -0,0 +1,92 @@
+# tests/test_wait_engine.py
+
+import pytest
+
+from wait_engine import PollStrategie, warte_bis, wert_stabil, box_offline
+
+
+class Uhr:
+    """Ersetzt time.time/time.sleep in wait_engine: sleep rückt die Uhr nur vor."""
+
+    def __init__(self):
+        self.jetzt = 1000.0
+        self.pausen = []
+
+    def time(self):
+        return self.jetzt
+
+    def sleep(self, sekunden):
+        self.pausen.append(sekunden)
+        self.jetzt += sekunden
+
+
+@pytest.fixture
+def uhr(monkeypatch):
+    uhr = Uhr()
+    monkeypatch.setattr("wait_engine.time.time", uhr.time)
+    monkeypatch.setattr("wait_engine.time.sleep", uhr.sleep)
+    return uhr
+
+
+def test_intervalle_wachsen_bis_zur_obergrenze():
+    intervalle = PollStrategie(intervall=1, faktor=2, max_intervall=5).intervalle()
+    assert [next(intervalle) for _ in range(6)] == [1, 2, 4, 5, 5, 5]
+
+
+def test_liefert_ergebnis_der_bedingung(uhr):
+    werte = iter([None, 0, "treffer"])
+    assert warte_bis(lambda: next(werte), timeout=10) == "treffer"
+
+
+def test_frist_abgelaufen_liefert_none(uhr):
+    assert warte_bis(lambda: False, timeout=3, strategie=PollStrategie(intervall=1, faktor=1)) is None
+    # Die letzte Pause wird auf die Restfrist gekürzt
+    assert sum(uhr.pausen) == pytest.approx(3)
+
+
+def test_pausen_folgen_der_strategie(uhr):
+    warte_bis(lambda: False, timeout=10, strategie=PollStrategie(intervall=1, faktor=2, max_intervall=3))
+    assert uhr.pausen == [1, 2, 3, 3, 1]
+
+
+def test_ausnahme_der_bedingung_gilt_als_nicht_erfuellt(uhr):
+    aufrufe = []
+
+    def bedingung():
+        aufrufe.append(1)
+        if len(aufrufe) < 3:
+            raise ConnectionError("noch nicht")
+        return True
+
+    assert warte_bis(bedingung, timeout=10) is True
+    assert len(aufrufe) == 3
+
+
+def test_wert_stabil_erst_nach_ruhezeit(uhr):
+    werte = iter([1, 2, 2, 2, 2])
+    pruefen = wert_stabil(lambda: next(werte), ruhezeit=2)
+    assert [pruefen() for _ in range(2)] == [False, False]
+    uhr.sleep(1)
+    assert pruefen() is False
+    uhr.sleep(1)
+    assert pruefen() is True
+
+
+def test_wert_stabil_nie_bei_leerem_wert(uhr):
+    pruefen = wert_stabil(lambda: 0, ruhezeit=1)
+    pruefen()
+    uhr.sleep(5)
+    assert pruefen() is False
+
+
+class Erreichbarkeit:
+    def __init__(self, antworten):
+        self.antworten = iter(antworten)
+
+    def ist_erreichbar(self, url, timeout=None):
+        return next(self.antworten)
+
+
+def test_box_offline_erst_nach_mehreren_fehlversuchen_in_folge():
+    pruefen = box_offline(Erreichbarkeit([False, False, True, False, False, False]), "http://box", fehlversuche=3)
+    assert [pruefen() for _ in range(6)] == [False, False, False, False, False, True]
@@ -0,0 +1,42 @@
+# tests/test_workflow_checkpoint.py
+import json
+import time
+
+import pytest
+
+from workflow_checkpoint import CheckpointSpeicher, BoxCheckpoint
+
+
+@pytest.fixture
+def speicher(tmp_path):
+    speicher = CheckpointSpeicher(tmp_path)
+    checkpoint = BoxCheckpoint(speicher, "SERIAL1")
+    checkpoint.daten["box"] = {"os_version": "07.59"}
+    checkpoint.schritt_erledigt("werkseinstellungen")
+    return speicher
+
+
+def test_fortschritt_wird_geladen(speicher):
+    checkpoint = BoxCheckpoint.oeffnen(speicher, "SERIAL1", "07.59")
+    assert checkpoint.erledigt == ["werkseinstellungen"]
+
+
+def test_gleiche_version_in_anderer_schreibweise(speicher):
+    assert BoxCheckpoint.oeffnen(speicher, "SERIAL1", "7.59").erledigt == ["werkseinstellungen"]
+
+
+def test_abweichende_version_verwirft_checkpoint(speicher):
+    assert BoxCheckpoint.oeffnen(speicher, "SERIAL1", "08.20").erledigt == []
+
+
+def test_ohne_live_version_wird_nur_das_alter_geprueft(speicher):
+    assert BoxCheckpoint.oeffnen(speicher, "SERIAL1").erledigt == ["werkseinstellungen"]
+
+
+def test_alter_checkpoint_wird_verworfen(speicher, tmp_path):
+    pfad = tmp_path / "SERIAL1.json"
+    daten = json.loads(pfad.read_text(encoding="utf-8"))
+    daten["aktualisiert"] = time.time() - 13 * 3600
+    pfad.write_text(json.dumps(daten), encoding="utf-8")
+    assert BoxCheckpoint.oeffnen(speicher, "SERIAL1", "07.59").erledigt == []
+    assert BoxCheckpoint.oeffnen(speicher, "SERIAL1", "07.59", max_alter=24 * 3600).erledigt == ["werkseinstellungen"]
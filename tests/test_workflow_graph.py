@@ -0,0 +1,156 @@
+# tests/test_workflow_graph.py
+import threading
+import time
+
+import pytest
+
+from workflow_graph import SchrittGraph, WorkflowSchritt
+
+
+class Protokoll:
+    """Zeichnet Start und Ende jedes Schritts auf und prüft, welche Schritte sich überlappt haben."""
+
+    def __init__(self, dauer: float = 0.05, ergebnisse: dict | None = None):
+        self.dauer = dauer
+        self.ergebnisse = ergebnisse or {}
+        self.lock = threading.Lock()
+        self.reihenfolge = []
+        self.zeiten = {}
+
+    def __call__(self, schritt: WorkflowSchritt) -> bool:
+        start = time.monotonic()
+        with self.lock:
+            self.reihenfolge.append(schritt.id)
+        ergebnis = self.ergebnisse.get(schritt.id, True)
+        if isinstance(ergebnis, BaseException):
+            raise ergebnis
+        time.sleep(self.dauer)
+        with self.lock:
+            self.zeiten[schritt.id] = (start, time.monotonic())
+        return ergebnis
+
+    def ueberlappen(self, a: str, b: str) -> bool:
+        (start_a, ende_a), (start_b, ende_b) = self.zeiten[a], self.zeiten[b]
+        return start_a < ende_b and start_b < ende_a
+
+
+def schritt(schritt_id, **kwargs):
+    return WorkflowSchritt(schritt_id, schritt_id, None, **kwargs)
+
+
+def test_abhaengigkeiten_bestimmen_die_reihenfolge():
+    protokoll = Protokoll(dauer=0.01)
+    graph = SchrittGraph([
+        schritt("c", nach=("b",), ressource="http"),
+        schritt("b", nach=("a",), ressource="http"),
+        schritt("a", ressource="http"),
+    ])
+    assert graph.ausfuehren(protokoll)
+    assert protokoll.reihenfolge == ["a", "b", "c"]
+
+
+def test_unabhaengige_schritte_laufen_parallel():
+    protokoll = Protokoll()
+    graph = SchrittGraph([
+        schritt("ui"),
+        schritt("info", ressource="http"),
+        schritt("vorbereiten", ressource="host"),
+    ])
+    assert graph.ausfuehren(protokoll)
+    assert protokoll.ueberlappen("ui", "info")
+    assert protokoll.ueberlappen("ui", "vorbereiten")
+
+
+def test_hoechstens_ein_browser_schritt():
+    protokoll = Protokoll()
+    graph = SchrittGraph([schritt("a"), schritt("b"), schritt("c")])
+    assert graph.ausfuehren(protokoll)
+    assert not protokoll.ueberlappen("a", "b")
+    assert not protokoll.ueberlappen("b", "c")
+
+
+def test_neustart_schritt_laeuft_exklusiv_ausser_host():
+    protokoll = Protokoll()
+    graph = SchrittGraph([
+        schritt("update", hinterlaesst="neu_gestartet"),
+        schritt("info", ressource="http"),
+        schritt("vorbereiten", ressource="host"),
+    ])
+    assert graph.ausfuehren(protokoll)
+    assert not protokoll.ueberlappen("update", "info")
+    assert protokoll.ueberlappen("update", "vorbereiten")
+
+
+def test_kein_neustart_waehrend_eines_box_zugriffs():
+    protokoll = Protokoll()
+    graph = SchrittGraph([
+        schritt("info", ressource="http"),
+        schritt("reset", ressource="http", hinterlaesst="werkszustand"),
+    ])
+    assert graph.ausfuehren(protokoll)
+    assert not protokoll.ueberlappen("info", "reset")
+
+
+def test_exklusiver_schritt_laeuft_allein_im_aufrufenden_thread():
+    protokoll = Protokoll()
+    threads = {}
+
+    def ausfuehren(schritt):
+        threads[schritt.id] = threading.current_thread()
+        return protokoll(schritt)
+
+    graph = SchrittGraph([
+        schritt("vorbereiten", ressource="host"),
+        schritt("login", exklusiv=True),
+        schritt("info", ressource="http"),
+        schritt("modell", nach=("login",)),
+    ])
+    assert graph.ausfuehren(ausfuehren)
+    assert threads["login"] is threading.current_thread()
+    assert threads["vorbereiten"] is not threading.current_thread()
+    for anderer in ("vorbereiten", "info", "modell"):
+        assert not protokoll.ueberlappen("login", anderer)
+
+
+def test_fehlschlag_stoppt_neue_schritte():
+    protokoll = Protokoll(dauer=0.01, ergebnisse={"b": False})
+    graph = SchrittGraph([
+        schritt("a"),
+        schritt("b", nach=("a",)),
+        schritt("c", nach=("a",), ressource="http"),
+        schritt("d", nach=("b",)),
+    ])
+    assert not graph.ausfuehren(protokoll)
+    assert "d" not in protokoll.reihenfolge
+
+
+def test_ausnahme_wird_nach_laufenden_schritten_weitergereicht():
+    protokoll = Protokoll(dauer=0.1, ergebnisse={"a": RuntimeError("RESTART_NEW_BOX")})
+    graph = SchrittGraph([
+        schritt("a"),
+        schritt("b", ressource="http"),
+        schritt("c", nach=("a",)),
+    ])
+    with pytest.raises(RuntimeError, match="RESTART_NEW_BOX"):
+        graph.ausfuehren(protokoll)
+    # der parallel laufende Schritt durfte zu Ende laufen, der abhängige wurde nicht gestartet
+    assert "b" in protokoll.zeiten
+    assert "c" not in protokoll.reihenfolge
+
+
+def test_uebersprungene_schritte_geben_nachfolger_frei():
+    protokoll = Protokoll(dauer=0.01)
+    graph = SchrittGraph([schritt("a"), schritt("b", nach=("a",)), schritt("c", nach=("b",))])
+    assert graph.ausfuehren(protokoll, ueberspringen=lambda s: s.id in ("a", "b"))
+    assert protokoll.reihenfolge == ["c"]
+
+
+def test_ungueltige_graphen():
+    with pytest.raises(ValueError, match="eindeutig"):
+        SchrittGraph([schritt("a"), schritt("a")])
+    with pytest.raises(ValueError, match="unbekannten"):
+        SchrittGraph([schritt("a", nach=("x",))])
+    with pytest.raises(ValueError, match="Zyklische"):
+        SchrittGraph([schritt("a", nach=("b",)), schritt("b", nach=("a",))])
+    with pytest.raises(ValueError, match="Ressource"):
+        schritt("a", ressource="gpu")
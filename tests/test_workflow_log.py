@@ -0,0 +1,45 @@
+# tests/test_workflow_log.py
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from workflow_log import SchrittProtokoll
+
+BOX = {"box_url": "http://192.168.178.1", "serial": "FAKE0000000001", "box_model": "FRITZ!Box 7590",
+       "os_version": "07.59"}
+
+
+def eintraege(datei: Path) -> list[dict]:
+    return [json.loads(zeile) for zeile in datei.read_text(encoding="utf-8").splitlines()]
+
+
+def test_schritt_und_workflow_eintraege(tmp_path):
+    datei = tmp_path / "schritte.jsonl"
+    protokoll = SchrittProtokoll(datei, station_id="platz-1")
+    protokoll.schritt(BOX, "Login durchführen", 1000.0, 1002.5, 2, "ok", None, extra_feld=1)
+    protokoll.workflow(BOX, 1000.0, 1010.0, "ok")
+    protokoll.schliessen()
+    protokoll.schliessen()
+
+    schritt, workflow = eintraege(datei)
+    assert schritt == {"typ": "schritt", "station": "platz-1", **BOX, "schritt": "Login durchführen",
+                       "start": "1970-01-01T00:16:40.000+00:00", "ende": "1970-01-01T00:16:42.500+00:00",
+                       "dauer_s": 2.5, "versuche": 2, "ergebnis": "ok", "fehler_klasse": None, "extra_feld": 1}
+    assert workflow["typ"] == "workflow"
+    assert workflow["dauer_s"] == 10.0
+    assert workflow["ergebnis"] == "ok"
+
+
+def test_standard_protokoll_schreibt_beim_beenden_alles(tmp_path):
+    # Viele Einträge direkt vor dem Interpreter-Ende: ohne atexit-Stopp gingen die letzten verloren
+    skript = (
+        "import time, workflow_log\n"
+        "p = workflow_log.standard_protokoll()\n"
+        "for i in range(5000):\n"
+        "    p.schritt({}, f's{i}', time.time(), time.time(), 1, 'ok')\n"
+    )
+    wurzel = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "-c", skript], cwd=tmp_path, check=True,
+                   env={"PYTHONPATH": str(wurzel), "FRITZ_STATION_ID": "test"})
+    assert len(eintraege(tmp_path / "logs" / "workflow_schritte.jsonl")) == 5000
@@ -0,0 +1,97 @@
+# wait_engine.py
+import time
+from selenium.webdriver.common.by import By
+
+
+class PollStrategie:
+    """
+    Beschreibt, wie oft eine Bedingung geprüft wird.
+    Das Intervall wächst pro Prüfung um 'faktor' bis maximal 'max_intervall'.
+    """
+
+    def __init__(self, intervall: float = 0.5, faktor: float = 1.5, max_intervall: float = 5.0):
+        self.intervall = intervall
+        self.faktor = faktor
+        self.max_intervall = max_intervall
+
+    def intervalle(self):
+        """Liefert die Folge der Wartezeiten zwischen zwei Prüfungen."""
+        aktuell = self.intervall
+        while True:
+            yield aktuell
+            aktuell = min(aktuell * self.faktor, self.max_intervall)
+
+
+STANDARD_STRATEGIE = PollStrategie()
+
+
+def warte_bis(bedingung, timeout: float, strategie: PollStrategie | None = None, beschreibung: str | None = None):
+    """
+    Prüft 'bedingung' wiederholt, bis sie ein wahres Ergebnis liefert oder die Frist abläuft.
+    Gibt das Ergebnis der Bedingung zurück, bei Ablauf der Frist None.
+    Ausnahmen der Bedingung gelten als "noch nicht erfüllt".
+    """
+    strategie = strategie or STANDARD_STRATEGIE
+    start = time.time()
+    frist = start + timeout
+
+    for pause in strategie.intervalle():
+        try:
+            ergebnis = bedingung()
+            if ergebnis:
+                if beschreibung:
+                    print(f"✅ {beschreibung} nach {time.time() - start:.1f}s erfüllt.")
+                return ergebnis
+        except Exception:
+            pass
+
+        rest = frist - time.time()
+        if rest <= 0:
+            break
+        time.sleep(min(pause, rest))
+
+    if beschreibung:
+        print(f"⏳ {beschreibung} nach {timeout}s nicht erfüllt.")
+    return None
+
+
+# --- Bedingungen ---
+
+def element_vorhanden(browser, *xpaths: str):
+    """DOM-Bedingung: True, sobald eines der Elemente im DOM vorhanden ist (ohne Wartezeit pro Prüfung)."""
+    def pruefen():
+        return any(browser.driver.find_elements(By.XPATH, xpath) for xpath in xpaths)
+    return pruefen
+
+
+def wert_stabil(messen, ruhezeit: float = 2.0):
+    """
+    Bedingung: True, sobald messen() einen wahren Wert liefert, der sich 'ruhezeit' Sekunden
+    lang nicht mehr geändert hat (z.B. Anzahl der Zeilen einer sich noch füllenden Tabelle).
+    """
+    zustand = {"wert": None, "seit": None}
+
+    def pruefen():
+        wert = messen()
+        jetzt = time.time()
+        if zustand["seit"] is None or wert != zustand["wert"]:
+            zustand["wert"], zustand["seit"] = wert, jetzt
+            return False
+        return bool(wert) and jetzt - zustand["seit"] >= ruhezeit
+    return pruefen
+
+
+def box_offline(http, url: str, timeout: float = 1.5, fehlversuche: int = 3):
+    """
+    Boot-Phase: True, sobald die Box 'fehlversuche' Prüfungen in Folge nicht antwortet (Neustart hat begonnen).
+    Eine einzelne ausbleibende Antwort einer beim Flashen oder Reset ausgelasteten Box zählt noch nicht.
+    """
+    zustand = {"fehlversuche": 0}
+
+    def pruefen():
+        if http.ist_erreichbar(url, timeout=timeout):
+            zustand["fehlversuche"] = 0
+            return False
+        zustand["fehlversuche"] += 1
+        return zustand["fehlversuche"] >= fehlversuche
+    return pruefen
@@ -0,0 +1,128 @@
+# webdriver_trace.py
+from collections import defaultdict
+import os
+import sys
+import threading
+import time
+
+# Klassen, deren Methoden als "Aufrufer" eines WebDriver-Kommandos gelten
+AUFRUFER_KLASSEN = ("FritzBox",)
+HILFS_KLASSEN = ("Browser",)
+
+
+def trace_aktiviert() -> bool:
+    """Tracing ist opt-in: FRITZ_TRACE=1 (oder true/ja) schaltet es ein."""
+    return os.environ.get("FRITZ_TRACE", "").strip().lower() in ("1", "true", "ja", "yes")
+
+
+def _aufrufer_ermitteln(start_frame) -> tuple[str | None, str | None]:
+    """
+    Läuft den Stack nach oben und liefert (FritzBox-Methode, Browser-Methode) des Kommandos.
+    Die Browser-Methode ist None, wenn FritzBox direkt auf self.browser.driver zugreift.
+    """
+    aufrufer = None
+    hilfe = None
+    frame = start_frame
+    while frame is not None:
+        obj = frame.f_locals.get("self")
+        if obj is not None:
+            klasse = type(obj).__name__
+            if hilfe is None and klasse in HILFS_KLASSEN:
+                hilfe = f"{klasse}.{frame.f_code.co_name}"
+            elif klasse in AUFRUFER_KLASSEN:
+                aufrufer = f"{klasse}.{frame.f_code.co_name}"
+                break
+        frame = frame.f_back
+    return aufrufer, hilfe
+
+
+class WebDriverTracer:
+    """
+    Zählt jedes WebDriver-Kommando eines Drivers samt Latenz und aufrufender FritzBox-Methode.
+    Dazu wird driver.execute pro Instanz ersetzt – das erfasst auch WebElement-Aufrufe (click, send_keys, …),
+    da diese über den Parent-Driver laufen. abhaengen() stellt den Originalzustand wieder her.
+    """
+
+    def __init__(self):
+        # Schrittname pro Thread, da unabhängige Workflow-Schritte gleichzeitig laufen können
+        self._lokal = threading.local()
+        self._eintraege = []  # (schritt, aufrufer, hilfe, kommando, dauer_s)
+        self._lock = threading.Lock()
+
+    def anhaengen(self, driver):
+        """Installiert den Tracer am Driver (idempotent)."""
+        if driver is None or getattr(driver, "_fritz_tracer", None) is self:
+            return
+        self.abhaengen(driver)
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                dauer = time.perf_counter() - start
+                aufrufer, hilfe = _aufrufer_ermitteln(sys._getframe(1))
+                with self._lock:
+                    self._eintraege.append((self.aktueller_schritt, aufrufer, hilfe, driver_command, dauer))
+
+        driver.execute = execute
+        driver._fritz_tracer = self
+
+    @staticmethod
+    def abhaengen(driver):
+        """Entfernt einen installierten Tracer wieder vom Driver."""
+        if driver is not None and getattr(driver, "_fritz_tracer", None) is not None:
+            del driver.execute
+            del driver._fritz_tracer
+
+    @property
+    def aktueller_schritt(self) -> str:
+        return getattr(self._lokal, "schritt", "-")
+
+    def schritt(self, name: str):
+        """Ordnet alle folgenden Kommandos des aufrufenden Threads dem Workflow-Schritt `name` zu."""
+        self._lokal.schritt = name
+
+    def zuruecksetzen(self):
+        with self._lock:
+            self._eintraege.clear()
+        self._lokal = threading.local()
+
+    def auswertung(self) -> dict:
+        """Liefert {schritt: {"roundtrips", "zeit_s", "aufrufer": {methode: [anzahl, zeit_s]}}} in Schrittreihenfolge."""
+        ergebnis = {}
+        with self._lock:
+            eintraege = list(self._eintraege)
+        for schritt, aufrufer, hilfe, kommando, dauer in eintraege:
+            eintrag = ergebnis.setdefault(schritt, {"roundtrips": 0, "zeit_s": 0.0,
+                                                    "aufrufer": defaultdict(lambda: [0, 0.0])})
+            eintrag["roundtrips"] += 1
+            eintrag["zeit_s"] += dauer
+            name = aufrufer or hilfe or "(außerhalb FritzBox)"
+            if aufrufer and hilfe:
+                name = f"{aufrufer} → {hilfe}"
+            eintrag["aufrufer"][name][0] += 1
+            eintrag["aufrufer"][name][1] += dauer
+        return ergebnis
+
+    def zusammenfassung(self, top: int = 3) -> str:
+        """Tabelle mit Roundtrips und Zeit pro Schritt, darunter die teuersten Aufrufer je Schritt."""
+        auswertung = self.auswertung()
+        if not auswertung:
+            return "WebDriver-Trace: keine Kommandos aufgezeichnet."
+
+        breite = max(len("Schritt"), *(len(s) for s in auswertung))
+        zeilen = [f"{'Schritt':<{breite}}  {'Roundtrips':>10}  {'Zeit [s]':>9}",
+                  "-" * (breite + 23)]
+        summe_rt, summe_zeit = 0, 0.0
+        for schritt, daten in auswertung.items():
+            summe_rt += daten["roundtrips"]
+            summe_zeit += daten["zeit_s"]
+            zeilen.append(f"{schritt:<{breite}}  {daten['roundtrips']:>10}  {daten['zeit_s']:>9.2f}")
+            teuerste = sorted(daten["aufrufer"].items(), key=lambda x: x[1][1], reverse=True)[:top]
+            for name, (anzahl, zeit) in teuerste:
+                zeilen.append(f"    {name}: {anzahl}× / {zeit:.2f}s")
+        zeilen.append("-" * (breite + 23))
+        zeilen.append(f"{'Gesamt':<{breite}}  {summe_rt:>10}  {summe_zeit:>9.2f}")
+        return "\n".join(zeilen)
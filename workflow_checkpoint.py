@@ -0,0 +1,137 @@
+# workflow_checkpoint.py
+from pathlib import Path
+import json
+import os
+import re
+import threading
+import time
+
+from firmware_planner import FritzOSVersion
+
+STANDARD_CHECKPOINT_VERZEICHNIS = Path("checkpoints")
+CHECKPOINT_FORMAT = 1
+# Ältere Checkpoints gelten als verwaist (z.B. Box zwischenzeitlich anderweitig eingerichtet) und werden verworfen
+MAX_CHECKPOINT_ALTER = 12 * 3600
+
+
+class CheckpointSpeicher:
+    """
+    Speichert pro Box (Seriennummer) den Fortschritt des Workflows als kleine JSON-Datei:
+    erledigte Schritte, Modell, Firmware-Version, bereits geflashte Versionen und WLAN-Scan-Ergebnisse.
+    Geschrieben wird atomar (temporäre Datei + os.replace), ein Absturz hinterlässt nie eine halbe Datei.
+    """
+
+    def __init__(self, verzeichnis: str | Path = STANDARD_CHECKPOINT_VERZEICHNIS):
+        self.verzeichnis = Path(verzeichnis)
+        self._lock = threading.Lock()
+
+    def _pfad(self, schluessel: str) -> Path:
+        # Seriennummern/MACs als Dateinamen nur mit unkritischen Zeichen
+        return self.verzeichnis / f"{re.sub(r'[^A-Za-z0-9_-]', '_', schluessel)}.json"
+
+    def laden(self, schluessel: str) -> dict | None:
+        """Liefert den gespeicherten Checkpoint der Box oder None."""
+        try:
+            daten = json.loads(self._pfad(schluessel).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if daten.get("format") != CHECKPOINT_FORMAT:
+            return None
+        return daten
+
+    def speichern(self, schluessel: str, daten: dict):
+        daten = {**daten, "format": CHECKPOINT_FORMAT, "aktualisiert": time.time()}
+        pfad = self._pfad(schluessel)
+        with self._lock:
+            self.verzeichnis.mkdir(parents=True, exist_ok=True)
+            tmp = pfad.with_name(f"{pfad.name}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(daten, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, pfad)
+
+    def loeschen(self, schluessel: str):
+        """Entfernt den Checkpoint, z.B. wenn der Workflow der Box vollständig durchgelaufen ist."""
+        try:
+            self._pfad(schluessel).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class BoxCheckpoint:
+    """Checkpoint einer einzelnen Box; jede Änderung wird sofort im Speicher abgelegt."""
+
+    def __init__(self, speicher: CheckpointSpeicher, schluessel: str, daten: dict | None = None):
+        self.speicher = speicher
+        self.schluessel = schluessel
+        self.daten = daten or {
+            "schluessel": schluessel,
+            "erledigt": [],
+            "geflashte_versionen": [],
+            "box": {},
+            "wlan_scan_results": [],
+        }
+
+    @classmethod
+    def oeffnen(cls, speicher: CheckpointSpeicher, schluessel: str, os_version: str | None = None,
+                max_alter: float = MAX_CHECKPOINT_ALTER) -> "BoxCheckpoint":
+        """
+        Lädt den Checkpoint der Box. Er wird verworfen (frischer Checkpoint), wenn er älter als max_alter
+        Sekunden ist oder die live gelesene os_version nicht zur gespeicherten passt – dann wurde die Box
+        seither außerhalb dieses Workflows verändert und der gemerkte Fortschritt gilt nicht mehr.
+        """
+        daten = speicher.laden(schluessel)
+        if daten:
+            alter = time.time() - daten.get("aktualisiert", 0)
+            gespeichert = daten.get("box", {}).get("os_version")
+            if alter > max_alter:
+                print(f"ℹ️ Checkpoint für {schluessel} ist {alter / 3600:.1f}h alt – wird verworfen.")
+                daten = None
+            elif os_version and gespeichert and FritzOSVersion.parse(os_version) != FritzOSVersion.parse(gespeichert):
+                print(f"ℹ️ Checkpoint für {schluessel} gilt für FRITZ!OS {gespeichert}, "
+                      f"Box meldet {os_version} – wird verworfen.")
+                daten = None
+        return cls(speicher, schluessel, daten)
+
+    @property
+    def erledigt(self) -> list[str]:
+        return self.daten["erledigt"]
+
+    def ist_erledigt(self, schritt_id: str) -> bool:
+        return schritt_id in self.daten["erledigt"]
+
+    def schritt_erledigt(self, schritt_id: str, fritzbox=None):
+        """Markiert einen Schritt als erledigt und übernimmt den aktuellen Stand der Box."""
+        if schritt_id not in self.daten["erledigt"]:
+            self.daten["erledigt"].append(schritt_id)
+        self.aktualisieren(fritzbox)
+
+    def firmware_geflasht(self, version: str, fritzbox=None):
+        """Fortschritt innerhalb des Update-Pfads: nach jedem erfolgreichen Flash aufgerufen."""
+        self.daten["geflashte_versionen"].append(version)
+        self.aktualisieren(fritzbox)
+
+    def aktualisieren(self, fritzbox=None):
+        if fritzbox is not None:
+            self.daten["box"] = {
+                "url": fritzbox.url,
+                "serial": fritzbox.serial,
+                "box_model": fritzbox.box_model,
+                "box_variant": fritzbox.box_variant,
+                "os_version": fritzbox.os_version,
+            }
+            if fritzbox.wlan_scan_results:
+                self.daten["wlan_scan_results"] = fritzbox.wlan_scan_results
+        self.speicher.speichern(self.schluessel, self.daten)
+
+    def wiederherstellen(self, fritzbox):
+        """Überträgt gemerkte Box-Daten auf ein neues FritzBox-Objekt, ohne frisch gelesene Werte zu überschreiben."""
+        box = self.daten.get("box", {})
+        for attribut in ("box_model", "box_variant", "os_version"):
+            if not getattr(fritzbox, attribut, None) and box.get(attribut):
+                setattr(fritzbox, attribut, box[attribut])
+        if self.daten.get("wlan_scan_results") and not fritzbox.wlan_scan_results:
+            fritzbox.wlan_scan_results = list(self.daten["wlan_scan_results"])
+            fritzbox.is_wifi_checked = True
+
+    def abschliessen(self):
+        """Workflow vollständig durchgelaufen – der nächste Durchlauf dieser Box beginnt wieder von vorn."""
+        self.speicher.loeschen(self.schluessel)
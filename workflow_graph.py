@@ -0,0 +1,156 @@
+# workflow_graph.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Ressourcen eines Schritts: die eine Selenium-Sitzung, reiner HTTP-Verkehr zur Box oder nur der eigene Rechner
+RESSOURCEN = ("browser", "http", "host")
+
+
+class WorkflowSchritt:
+    """
+    Ein Schritt des Workflows mit seinen Abhängigkeiten (ids der Vorgänger), der benötigten Ressource
+    und dem Zustand, den er hinterlässt ("neu_gestartet", "werkszustand").
+    Schritte mit immer=True laufen auch dann, wenn ein Checkpoint sie schon als erledigt führt.
+    Schritte mit exklusiv=True (z.B. Login mit Passwortabfrage) laufen allein im aufrufenden Thread.
+    """
+
+    def __init__(self, schritt_id: str, name: str, func, *args, nach: tuple = (), ressource: str = "browser",
+                 hinterlaesst: str | None = None, immer: bool = False, exklusiv: bool = False):
+        if ressource not in RESSOURCEN:
+            raise ValueError(f"Unbekannte Ressource '{ressource}' für Schritt '{schritt_id}'")
+        self.id = schritt_id
+        self.name = name
+        self.func = func
+        self.args = args
+        self.nach = tuple(nach)
+        self.ressource = ressource
+        self.hinterlaesst = hinterlaesst
+        self.immer = immer
+        self.exklusiv = exklusiv
+
+    @property
+    def beruehrt_box(self) -> bool:
+        """Browser- und HTTP-Schritte sprechen mit der Box, Host-Schritte nur mit dem eigenen Rechner."""
+        return self.ressource != "host"
+
+    @property
+    def startet_neu(self) -> bool:
+        """Schritte, nach denen die Box neu startet, laufen exklusiv gegenüber allen anderen Box-Zugriffen."""
+        return self.hinterlaesst is not None
+
+    def __repr__(self):
+        return f"WorkflowSchritt({self.id!r}, nach={self.nach})"
+
+
+class SchrittGraph:
+    """
+    Führt Workflow-Schritte nach ihren Abhängigkeiten aus; unabhängige Schritte laufen gleichzeitig:
+      - höchstens ein Browser-Schritt zur Zeit (eine Selenium-Sitzung),
+      - HTTP- und Host-Schritte parallel dazu,
+      - ein Schritt, der die Box neu startet, läuft allein – nur Host-Schritte (z.B. Vorbereitung
+        der nächsten Firmware) dürfen währenddessen weiterlaufen,
+      - ein exklusiver Schritt wartet, bis nichts anderes mehr läuft, und läuft dann im aufrufenden
+        Thread, damit seine Eingabeabfragen nicht mit Ausgaben anderer Schritte vermischt werden.
+    Bei mehreren startbereiten Schritten gilt die Reihenfolge der Liste.
+    """
+
+    def __init__(self, schritte: list[WorkflowSchritt], max_parallel: int = 4):
+        self.schritte = list(schritte)
+        self.max_parallel = max_parallel
+        ids = [schritt.id for schritt in self.schritte]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Schritt-ids müssen eindeutig sein")
+        for schritt in self.schritte:
+            unbekannt = set(schritt.nach) - set(ids)
+            if unbekannt:
+                raise ValueError(f"Schritt '{schritt.id}' hängt von unbekannten Schritten ab: {sorted(unbekannt)}")
+        self._pruefe_zyklen()
+
+    def _pruefe_zyklen(self):
+        nach = {schritt.id: schritt.nach for schritt in self.schritte}
+        fertig, besucht = set(), set()
+
+        def besuchen(schritt_id, pfad):
+            if schritt_id in fertig:
+                return
+            if schritt_id in besucht:
+                raise ValueError(f"Zyklische Abhängigkeit: {' -> '.join(pfad + [schritt_id])}")
+            besucht.add(schritt_id)
+            for vorgaenger in nach[schritt_id]:
+                besuchen(vorgaenger, pfad + [schritt_id])
+            fertig.add(schritt_id)
+
+        for schritt in self.schritte:
+            besuchen(schritt.id, [])
+
+    @staticmethod
+    def _startbereit(schritt: WorkflowSchritt, erledigt: set, laufend: list[WorkflowSchritt]) -> bool:
+        if not set(schritt.nach) <= erledigt:
+            return False
+        if schritt.ressource == "browser" and any(s.ressource == "browser" for s in laufend):
+            return False
+        if schritt.beruehrt_box and any(s.startet_neu for s in laufend):
+            return False
+        if schritt.startet_neu and any(s.beruehrt_box for s in laufend):
+            return False
+        return True
+
+    def ausfuehren(self, ausfuehren, ueberspringen=None) -> bool:
+        """
+        ausfuehren(schritt) -> bool führt einen Schritt aus; ueberspringen(schritt) -> bool (optional) meldet
+        Schritte, die nicht mehr nötig sind (z.B. laut Checkpoint erledigt).
+        Gibt True zurück, wenn alle Schritte erfolgreich waren. Nach einem Fehlschlag werden keine neuen
+        Schritte mehr gestartet; eine Ausnahme eines Schritts wird nach dem Ende der laufenden Schritte weitergereicht.
+        """
+        offen = list(self.schritte)
+        erledigt = set()
+        laufend = {}
+        fehlgeschlagen = False
+        ausnahme = None
+
+        def abschliessen(schritt, ergebnis):
+            nonlocal fehlgeschlagen, ausnahme
+            try:
+                if ergebnis():
+                    erledigt.add(schritt.id)
+                else:
+                    fehlgeschlagen = True
+            except BaseException as e:
+                fehlgeschlagen = True
+                ausnahme = ausnahme or e
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="workflow") as pool:
+            while True:
+                if not fehlgeschlagen:
+                    exklusiv_gelaufen = False
+                    for schritt in list(offen):
+                        if len(laufend) >= self.max_parallel:
+                            break
+                        if not set(schritt.nach) <= erledigt:
+                            continue
+                        if ueberspringen and ueberspringen(schritt):
+                            offen.remove(schritt)
+                            erledigt.add(schritt.id)
+                            continue
+                        if schritt.exklusiv:
+                            if laufend:
+                                break  # keine weiteren Schritte starten, bis der exklusive an der Reihe ist
+                            offen.remove(schritt)
+                            abschliessen(schritt, lambda: ausfuehren(schritt))
+                            exklusiv_gelaufen = True
+                            break
+                        if self._startbereit(schritt, erledigt, list(laufend.values())):
+                            offen.remove(schritt)
+                            laufend[pool.submit(ausfuehren, schritt)] = schritt
+                    # Übersprungene oder exklusiv gelaufene Schritte können weitere Schritte freigeben
+                    if exklusiv_gelaufen or (not laufend and offen and any(set(s.nach) <= erledigt for s in offen)):
+                        continue
+                if not laufend:
+                    break
+
+                fertig, _ = wait(laufend, return_when=FIRST_COMPLETED)
+                for future in fertig:
+                    abschliessen(laufend.pop(future), future.result)
+
+        if ausnahme:
+            raise ausnahme
+        return not fehlgeschlagen and not offen
@@ -0,0 +1,98 @@
+# workflow_log.py
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
+from pathlib import Path
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+
+STANDARD_LOG_DATEI = Path("logs") / "workflow_schritte.jsonl"
+
+
+class SchrittProtokoll:
+    """
+    Schreibt pro Box und Schritt einen JSON-Lines-Eintrag (Start, Ende, Versuche, Ergebnis, Fehlerklasse,
+    Box-Modell, Firmware, Station) in eine rotierende Datei. Das Schreiben läuft über eine Queue in einem
+    eigenen Thread, der Workflow wartet also nie auf die Festplatte.
+    """
+
+    def __init__(self, datei: str | Path = STANDARD_LOG_DATEI, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, station_id: str | None = None):
+        self.station_id = station_id or os.environ.get("FRITZ_STATION_ID") or socket.gethostname()
+        datei = Path(datei)
+        datei.parent.mkdir(parents=True, exist_ok=True)
+
+        datei_handler = RotatingFileHandler(datei, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        datei_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._datei_handler = datei_handler
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, datei_handler)
+        self._listener.start()
+        self._geschlossen = False
+
+        self._logger = logging.getLogger(f"fritz.schritte.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(self._queue))
+
+    @staticmethod
+    def _zeit(zeitstempel: float) -> str:
+        return datetime.fromtimestamp(zeitstempel, tz=timezone.utc).isoformat(timespec="milliseconds")
+
+    def schritt(self, box: dict, schritt: str, start: float, ende: float, versuche: int, ergebnis: str,
+                fehler_klasse: str | None = None, **extra):
+        """Protokolliert einen abgeschlossenen Schritt."""
+        eintrag = {
+            "typ": "schritt",
+            "station": self.station_id,
+            **box,
+            "schritt": schritt,
+            "start": self._zeit(start),
+            "ende": self._zeit(ende),
+            "dauer_s": round(ende - start, 3),
+            "versuche": versuche,
+            "ergebnis": ergebnis,
+            "fehler_klasse": fehler_klasse,
+            **extra,
+        }
+        self._logger.info(json.dumps(eintrag, ensure_ascii=False))
+
+    def workflow(self, box: dict, start: float, ende: float, ergebnis: str):
+        """Protokolliert das Gesamtergebnis einer Box."""
+        eintrag = {
+            "typ": "workflow",
+            "station": self.station_id,
+            **box,
+            "start": self._zeit(start),
+            "ende": self._zeit(ende),
+            "dauer_s": round(ende - start, 3),
+            "ergebnis": ergebnis,
+        }
+        self._logger.info(json.dumps(eintrag, ensure_ascii=False))
+
+    def schliessen(self):
+        """Schreibt ausstehende Einträge und beendet den Schreib-Thread (mehrfacher Aufruf ist unschädlich)."""
+        if self._geschlossen:
+            return
+        self._geschlossen = True
+        self._listener.stop()
+        self._datei_handler.close()
+
+
+_standard_protokoll = None
+_standard_lock = threading.Lock()
+
+
+def standard_protokoll() -> SchrittProtokoll:
+    """Gemeinsames Protokoll aller Orchestratoren eines Prozesses (eine Datei, eine Rotation)."""
+    global _standard_protokoll
+    with _standard_lock:
+        if _standard_protokoll is None:
+            _standard_protokoll = SchrittProtokoll()
+            # Der Schreib-Thread ist ein Daemon: ohne stop() beim Beenden gingen die letzten Einträge verloren
+            atexit.register(_standard_protokoll.schliessen)
+        return _standard_protokoll
@@ -1,37 +1,109 @@
 # workflow_orchestrator.py
 from fritzbox_api import FritzBox, FirmwareManager
 from browser_utils import setup_browser, Browser
+from workflow_log import standard_protokoll
+from webdriver_trace import WebDriverTracer, trace_aktiviert
+from workflow_checkpoint import BoxCheckpoint, CheckpointSpeicher
+from workflow_graph import SchrittGraph, WorkflowSchritt
+import threading
 import time
-import win32gui
-import win32con
 import ctypes
 import re
 
+# ids der Schritte aus WorkflowOrchestrator.workflow_graph (z.B. für "optionale_schritte" eines Batch-Manifests)
+WORKFLOW_SCHRITT_IDS = ("erreichbarkeit", "login", "modell", "firmware_version", "firmware_vorbereiten",
+                        "erweiterte_ansicht", "firmware_update", "wlan_antennen", "werkseinstellungen",
+                        "wlan_zusammenfassung", "erreichbarkeit_ende")
+
+try:
+    import win32gui  # optional: nur unter Windows, zum Hervorholen des Konsolenfensters
+    import win32con
+except ImportError:
+    win32gui = None
+
+
 class WorkflowOrchestrator:
     """
     Steuert den gesamten Workflow zur Verwaltung einer FritzBox.
     Koordiniert die Schritte, handhabt Retries und Benutzerinteraktion.
     """
-    def __init__(self):
+    def __init__(self, url: str | None = None, interaktiv: bool = True, firmware_manager: FirmwareManager | None = None,
+                 browser_pool=None, browser_profil: str = "standard", protokoll=None,
+                 trace: bool | None = None, checkpoint_speicher: CheckpointSpeicher | None = None,
+                 ziel_firmware: str | None = None, max_versuche: int = 2, optionale_schritte=()):
         self.browser_driver = None
         self.browser = None
         self.fritzbox = None
-        self.firmware_manager = FirmwareManager() # FirmwareManager hier instanziieren
+        # Feste Ziel-URL pro Box (Mehrplatzbetrieb); None = automatische Suche
+        self.url = url
+        # Ohne Interaktion werden keine input()-Abfragen gestellt (z.B. parallele Boxen)
+        self.interaktiv = interaktiv
+        self.firmware_manager = firmware_manager or FirmwareManager() # FirmwareManager hier instanziieren
+        # Optionaler BrowserPool: Browser werden ausgeliehen statt pro Box neu gestartet
+        self.browser_pool = browser_pool
+        # Browser-Profil für selbst gestartete Browser ("standard" oder "lean")
+        self.browser_profil = browser_profil
+        # JSON-Lines-Protokoll pro Schritt (Zeiten, Versuche, Ergebnis)
+        self.protokoll = protokoll or standard_protokoll()
+        # Zähler des laufenden Schritts – pro Thread, da unabhängige Schritte gleichzeitig laufen
+        self._lokal = threading.local()
+        # Optionaler WebDriver-Tracer (Roundtrips/Latenz pro Schritt); None = per FRITZ_TRACE entscheiden
+        self.tracer = WebDriverTracer() if (trace_aktiviert() if trace is None else trace) else None
+        # Fortschritt pro Box (Seriennummer), damit ein abgebrochener Workflow nicht von vorn beginnt
+        self.checkpoint_speicher = checkpoint_speicher or CheckpointSpeicher()
+        self.checkpoint = None
+        self._checkpoint_lock = threading.Lock()
+        # Abweichende Zielversion für diese Box (None = Ziel aus der Firmware-Zuordnung)
+        self.ziel_firmware = ziel_firmware
+        # Fehler-Politik ohne Rückfragen: Versuche pro Schritt und Schritte (ids), deren Fehlschlag nur übersprungen wird
+        self.max_versuche = max_versuche
+        self.optionale_schritte = set(optionale_schritte)
+        # Erster fehlgeschlagener Schritt des letzten Durchlaufs (id) und ggf. die Klasse seiner Ausnahme
+        self.fehler_schritt = None
+        self.fehler_klasse = None
+        self._fehler_lock = threading.Lock()
+        # Rückfragen an den Benutzer nie gleichzeitig aus mehreren Schritten
+        self._eingabe_lock = threading.Lock()
+
+    @property
+    def _schritt_info(self) -> dict:
+        if not hasattr(self._lokal, "schritt_info"):
+            self._lokal.schritt_info = {"versuche": 0, "fehler_klasse": None, "ergebnis": None}
+        return self._lokal.schritt_info
+
+    @_schritt_info.setter
+    def _schritt_info(self, info: dict):
+        self._lokal.schritt_info = info
 
     def ensure_browser(self):
         if self.browser is None or not self.browser_still_alive():
             # alten Browser sauber schließen, falls noch offen
             try:
-                if self.browser:
+                if self.browser and self.browser_pool:
+                    self.browser_pool.zurueckgeben(self.browser)
+                elif self.browser:
                     self.browser.quit()
             except Exception:
                 pass
 
-            self.browser_driver = setup_browser()
-            self.browser = Browser(self.browser_driver)
+            if self.browser_pool:
+                self.browser = self.browser_pool.ausleihen()
+                self.browser_driver = self.browser.driver
+            else:
+                self.browser_driver = setup_browser(self.browser_profil)
+                self.browser = Browser(self.browser_driver)
+
+            if self.tracer:
+                self.tracer.anhaengen(self.browser_driver)
+
+            # Die Schritte des Graphen sind an das FritzBox-Objekt gebunden: nur den Browser tauschen,
+            # damit SID, Modell und Version nicht auf zwei Objekte verteilt werden
+            if self.fritzbox:
+                self.fritzbox.browser_tauschen(self.browser)
 
-            # FritzBox-Objekt immer neu erstellen
-            self.fritzbox = FritzBox(self.browser)
+        if self.fritzbox is None:
+            self.fritzbox = FritzBox(self.browser, url=self.url, firmware_manager=self.firmware_manager)
+            self.fritzbox.ziel_version = self.ziel_firmware
 
     def browser_still_alive(self):
         try:
@@ -43,6 +115,8 @@ class WorkflowOrchestrator:
 
     def _fenster_in_vordergrund_holen(self):
         """Bringt das CMD-Fenster in den Vordergrund."""
+        if not self.interaktiv or win32gui is None:
+            return
         try:
             console_hwnd = ctypes.windll.kernel32.GetConsoleWindow()
             win32gui.ShowWindow(console_hwnd, win32con.SW_SHOWNORMAL)
@@ -51,28 +125,36 @@ class WorkflowOrchestrator:
         except Exception as e:
             print(f"⚠️ Fenster-Fokus fehlgeschlagen")
 
+    def _eingabe(self, frage: str) -> str:
+        """input() für Rückfragen; gleichzeitig laufende Schritte fragen nacheinander."""
+        with self._eingabe_lock:
+            return input(frage)
+
     def _run_step_with_retry(self, description: str, func, *args, **kwargs) -> bool:
         """
         Führt einen Schritt aus mit automatischen Wiederholungen.
         Speziell beim Login:
-          - 1. Fehlschlag → Werkreset
-          - 2. Fehlschlag → Benutzer nach neuem Passwort fragen
+          - 1. Fehlschlag → Werkreset (nur wenn danach noch ein Versuch folgt)
+          - letzter Fehlschlag → Benutzer nach neuem Passwort fragen
+        Ausnahmen (z.B. eine lange Login-Sperre, SidLoginGesperrt) zählen als Fehlversuch ohne Werkreset.
         """
-        print(f"\n➡️ {description}...")
+        print(f"\n➡️ {self._prefix()}{description}...")
 
-        max_attempts = 2
+        max_attempts = self.max_versuche
+        ist_login = description.lower().startswith("login")
         attempt = 0
         while attempt < max_attempts:
             try:
                 self.ensure_browser()
+                self._schritt_info["versuche"] += 1
                 result = func(*args, **kwargs)
 
                 if result is False:
                     attempt += 1
                     print(f"⚠️ Funktion '{description}' meldete Fehlschlag (Versuch {attempt}/{max_attempts}).")
 
-                    if description.lower().startswith("login") and attempt == 1:
-                        # 1️⃣ Werkreset nach erstem Fehlschlag
+                    if ist_login and attempt == 1 and attempt < max_attempts:
+                        # 1️⃣ Werkreset nach erstem Fehlschlag – nur sinnvoll, wenn noch ein Login-Versuch folgt
                         print("\n❗Login fehlgeschlagen. Starte Werkreset, um Standard-PW zu verwenden...")
                         if not self.fritzbox.reset_via_forgot_password():
                             print("❌ Werkseinstellung fehlgeschlagen, Abbruch.")
@@ -80,12 +162,16 @@ class WorkflowOrchestrator:
                         print("✅ Werkseinstellung abgeschlossen, versuche erneut Login...")
                         continue
 
-                    elif attempt >= max_attempts:
+                    elif ist_login and attempt >= max_attempts and not self.interaktiv:
+                        print(f"❌ {self._prefix()}Login erneut fehlgeschlagen, keine Passwortabfrage im Mehrplatzbetrieb.")
+                        return False
+
+                    elif ist_login and attempt >= max_attempts:
                         # 2️⃣ Nach erneutem Fehlschlag Benutzer nach neuem Passwort fragen
                         print("\n⚠️ Login erneut fehlgeschlagen. Benutzer muss neues Passwort eingeben...")
                         letztes_passwort = None
                         while True:
-                            neues_passwort = input("🔑 Bitte neues Passwort für die FritzBox eingeben: ").strip()
+                            neues_passwort = self._eingabe("🔑 Bitte neues Passwort für die FritzBox eingeben: ").strip()
                             if neues_passwort == letztes_passwort:
                                 print("⚠️ Passwort identisch zum letzten Versuch, überprüfe Eingabe...")
                             if self.fritzbox.login(neues_passwort):
@@ -101,12 +187,17 @@ class WorkflowOrchestrator:
 
             except Exception as e:
                 attempt += 1
+                self._schritt_info["fehler_klasse"] = type(e).__name__
                 print(f"⚠️ Fehler bei '{description}' (Versuch {attempt}/{max_attempts}) Error: {e}")
                 time.sleep(2)
 
+        if not self.interaktiv:
+            print(f"⛔ {self._prefix()}'{description}' endgültig fehlgeschlagen, Box wird abgebrochen.")
+            return False
+
         # Wenn andere Schritte fehlschlagen, Benutzer entscheiden lassen
         while True:
-            auswahl = input("🔁 (W)iederholen, (Ü)berspringen, (B)eenden, (N)eue FritzBox? ").strip().lower()
+            auswahl = self._eingabe("🔁 (W)iederholen, (Ü)berspringen, (B)eenden, (N)eue FritzBox? ").strip().lower()
             if auswahl == "b":
                 print("⛔ Vorgang abgebrochen.")
                 return False
@@ -114,53 +205,226 @@ class WorkflowOrchestrator:
                 return self._run_step_with_retry(description, func, *args, **kwargs)
             elif auswahl == "ü":
                 print("⏭️ Schritt übersprungen.")
+                self._schritt_info["ergebnis"] = "uebersprungen"
                 return True
             elif auswahl == "n":
                 raise RuntimeError("RESTART_NEW_BOX")
             else:
                 print("❓ Ungültige Eingabe. Bitte wähle w/ü/b/n.")
 
-    def run_full_workflow(self, password: str) -> str | None:
-        """Führt den gesamten FritzBox-Verwaltungs-Workflow anhand einer flexiblen Schritt-Liste aus."""
-        self.ensure_browser()
+    def _box_kontext(self) -> dict:
+        """Box-Merkmale, die jedem Protokolleintrag beigefügt werden."""
+        fritzbox = self.fritzbox
+        return {
+            "box_url": getattr(fritzbox, "url", self.url),
+            "serial": getattr(fritzbox, "serial", None),
+            "box_model": getattr(fritzbox, "box_model", None),
+            "os_version": getattr(fritzbox, "os_version", None),
+        }
 
+    def _protokollierter_schritt(self, step_name: str, func, *args) -> bool:
+        """Führt einen Schritt über _run_step_with_retry aus und protokolliert Dauer, Versuche und Ergebnis."""
+        self._schritt_info = {"versuche": 0, "fehler_klasse": None, "ergebnis": None}
+        if self.tracer:
+            self.tracer.schritt(step_name)
+        start = time.time()
+        ergebnis = "fehlgeschlagen"
         try:
-            workflow_steps = [
-                ("FritzBox Erreichbarkeit prüfen", self.fritzbox.warte_auf_erreichbarkeit),
-                ("Login durchführen", self.fritzbox.login, password),
-                ("Box-Modell ermitteln", self.fritzbox.get_box_model),
-                ("Firmware-Version ermitteln", self.fritzbox.get_firmware_version),
-                ("Erweiterte Ansicht prüfen/aktivieren", self.fritzbox.activate_expert_mode_if_needed),
-                ("Firmware Update Routine", self.fritzbox.update_firmware),
-                ("WLAN-Antennen prüfen", self.fritzbox.check_wlan_antennas),
-                ("Werkseinstellungen über UI", self.fritzbox.perform_factory_reset_from_ui),
-                ("WLAN-Scan Zusammenfassung", self.fritzbox.show_wlan_summary),
-                ("FritzBox Erreichbarkeit prüfen", self.fritzbox.warte_auf_erreichbarkeit),
-            ]
-
-            for step_name, func, *args in workflow_steps:
-                try:
-                    if not self._run_step_with_retry(step_name, func, *args):
-                        return None
-                    self._fenster_in_vordergrund_holen()
-                except RuntimeError as e:
-                    if str(e) == "RESTART_NEW_BOX":
-                        return "restart"
-                    else:
-                        raise
-                except Exception:
-                    raise Exception
+            ok = self._run_step_with_retry(step_name, func, *args)
+            ergebnis = self._schritt_info["ergebnis"] or ("ok" if ok else "fehlgeschlagen")
+            return ok
+        except RuntimeError as e:
+            ergebnis = "neue_box" if str(e) == "RESTART_NEW_BOX" else "fehler"
+            self._schritt_info["fehler_klasse"] = self._schritt_info["fehler_klasse"] or type(e).__name__
+            raise
+        except Exception as e:
+            ergebnis = "fehler"
+            self._schritt_info["fehler_klasse"] = type(e).__name__
+            raise
+        finally:
+            try:
+                self.protokoll.schritt(self._box_kontext(), step_name, start, time.time(),
+                                       self._schritt_info["versuche"], ergebnis, self._schritt_info["fehler_klasse"])
+            except Exception:
+                pass  # Protokollierung darf den Workflow nie stören
 
+    def _checkpoint_oeffnen(self):
+        """Identifiziert die Box per Seriennummer (Boxinfo, ohne Login) und lädt ihren Checkpoint."""
+        fritzbox = self.fritzbox
+        if not fritzbox.serial:
+            fritzbox.lade_boxinfo()
+        if not fritzbox.serial:
+            print("ℹ️ Seriennummer unbekannt – Fortschritt dieser Box wird nicht gespeichert.")
+            return
+        self.checkpoint = BoxCheckpoint.oeffnen(self.checkpoint_speicher, fritzbox.serial, fritzbox.os_version)
+        # Jeder geflashte Sprung des Update-Pfads wird sofort festgehalten
+        fritzbox.bei_update_fortschritt = lambda version: self.checkpoint.firmware_geflasht(version, self.fritzbox)
+        if self.checkpoint.erledigt:
+            self.checkpoint.wiederherstellen(fritzbox)
+            print(f"♻️ {self._prefix()}Checkpoint für {fritzbox.serial} gefunden, bereits erledigt: "
+                  f"{', '.join(self.checkpoint.erledigt)}")
 
-            print("\n🎉 Workflow für diese FritzBox erfolgreich abgeschlossen!")
+    def _bereits_erledigt(self, schritt: WorkflowSchritt) -> bool:
+        """True, wenn der Schritt laut Checkpoint nicht erneut ausgeführt werden muss."""
+        if self.checkpoint is None:
+            return False
+        if schritt.id == "login":
+            # Nach den Werkseinstellungen gilt das alte Passwort nicht mehr
+            erledigt = self.checkpoint.ist_erledigt("werkseinstellungen")
+        else:
+            erledigt = not schritt.immer and self.checkpoint.ist_erledigt(schritt.id)
+        if erledigt:
+            print(f"\n⏭️ {self._prefix()}{schritt.name}: laut Checkpoint bereits erledigt.")
+        return erledigt
+
+    def _checkpoint_schreiben(self, schritt: WorkflowSchritt):
+        """Hält einen erfolgreich abgeschlossenen Schritt fest; Fehler beim Speichern stoppen den Workflow nicht."""
+        try:
+            with self._checkpoint_lock:
+                if schritt.id == "erreichbarkeit" and self.checkpoint is None:
+                    self._checkpoint_oeffnen()
+                elif self.checkpoint and not schritt.immer and self._schritt_info["ergebnis"] != "uebersprungen":
+                    self.checkpoint.schritt_erledigt(schritt.id, self.fritzbox)
+        except Exception as e:
+            print(f"⚠️ Checkpoint konnte nicht gespeichert werden: {e}")
+
+    def _fehler_merken(self, schritt_id: str | None, fehler_klasse: str | None):
+        """Hält den ersten Fehlschlag eines Durchlaufs fest (für Ergebnisdateien im Batchbetrieb)."""
+        with self._fehler_lock:
+            if self.fehler_schritt is None and self.fehler_klasse is None:
+                self.fehler_schritt = schritt_id
+                self.fehler_klasse = fehler_klasse
+
+    def _graph_schritt_ausfuehren(self, schritt: WorkflowSchritt) -> bool:
+        """Wird vom SchrittGraph (ggf. in einem Worker-Thread) für jeden fälligen Schritt aufgerufen."""
+        try:
+            ok = self._protokollierter_schritt(schritt.name, schritt.func, *schritt.args)
+        except Exception as e:
+            self._fehler_merken(schritt.id, type(e).__name__)
+            raise
+        if not ok:
+            if schritt.id in self.optionale_schritte:
+                print(f"⏭️ {self._prefix()}'{schritt.name}' fehlgeschlagen, laut Fehler-Politik übersprungen.")
+                return True
+            self._fehler_merken(schritt.id, self._schritt_info["fehler_klasse"])
+            return False
+        self._checkpoint_schreiben(schritt)
+        self._fenster_in_vordergrund_holen()
+        return True
+
+    def _prefix(self) -> str:
+        """Kennzeichnet Ausgaben im Mehrplatzbetrieb mit der Box-URL."""
+        return f"[{self.url}] " if self.url and not self.interaktiv else ""
+
+    def _login_mit_kandidaten(self, passwoerter: list[str]) -> bool:
+        """Versucht die Kandidaten-Passwörter nacheinander (Batchbetrieb ohne Passwortabfrage)."""
+        for nummer, passwort in enumerate(passwoerter, start=1):
+            if self.fritzbox.login(passwort):
+                return True
+            if nummer < len(passwoerter):
+                print(f"🔑 {self._prefix()}Passwort {nummer}/{len(passwoerter)} abgelehnt, versuche das nächste...")
+        return False
+
+    def workflow_graph(self, password: str | list[str]) -> SchrittGraph:
+        """
+        Liefert den Schritt-Graphen des Workflows für die aktuelle FritzBox.
+        Die Boxinfo (Seriennummer, Modell, Version) wird nach der Erreichbarkeitsprüfung beim Öffnen des
+        Checkpoints gelesen, die Firmware-Vorbereitung (Pfad, Images, Prüfsummen) läuft auf dem Rechner
+        parallel zur Oberfläche; die Reihenfolge der Box-Schritte bleibt unverändert.
+        """
+        fritzbox = self.fritzbox
+        if isinstance(password, (list, tuple)):
+            login = (self._login_mit_kandidaten, list(password))
+        else:
+            login = (fritzbox.login, password)
+        return SchrittGraph([
+            WorkflowSchritt("erreichbarkeit", "FritzBox Erreichbarkeit prüfen", fritzbox.warte_auf_erreichbarkeit,
+                            ressource="http", immer=True),
+            # Exklusiv im Hauptthread: Werkreset und Passwortabfrage beim Login laufen neben keinem anderen Schritt
+            WorkflowSchritt("login", "Login durchführen", *login, nach=("erreichbarkeit",), immer=True,
+                            exklusiv=True),
+            WorkflowSchritt("modell", "Box-Modell ermitteln", fritzbox.get_box_model, nach=("login",)),
+            WorkflowSchritt("firmware_version", "Firmware-Version ermitteln", fritzbox.get_firmware_version,
+                            nach=("modell",)),
+            WorkflowSchritt("firmware_vorbereiten", "Firmware-Update vorbereiten", fritzbox.bereite_firmware_update_vor,
+                            nach=("modell", "firmware_version"), ressource="host", immer=True),
+            WorkflowSchritt("erweiterte_ansicht", "Erweiterte Ansicht prüfen/aktivieren",
+                            fritzbox.activate_expert_mode_if_needed, nach=("firmware_version",)),
+            WorkflowSchritt("firmware_update", "Firmware Update Routine", fritzbox.update_firmware,
+                            nach=("erweiterte_ansicht", "firmware_vorbereiten"), hinterlaesst="neu_gestartet"),
+            WorkflowSchritt("wlan_antennen", "WLAN-Antennen prüfen", fritzbox.check_wlan_antennas,
+                            nach=("firmware_update",)),
+            WorkflowSchritt("werkseinstellungen", "Werkseinstellungen über UI", fritzbox.perform_factory_reset_from_ui,
+                            nach=("wlan_antennen",), hinterlaesst="werkszustand"),
+            WorkflowSchritt("wlan_zusammenfassung", "WLAN-Scan Zusammenfassung", fritzbox.show_wlan_summary,
+                            nach=("werkseinstellungen",), ressource="host"),
+            WorkflowSchritt("erreichbarkeit_ende", "FritzBox Erreichbarkeit prüfen", fritzbox.warte_auf_erreichbarkeit,
+                            nach=("werkseinstellungen",), ressource="http", immer=True),
+        ])
+
+    def run_full_workflow(self, password: str | list[str]) -> str | None:
+        """
+        Führt den gesamten FritzBox-Verwaltungs-Workflow anhand des Schritt-Graphen aus.
+        Statt eines Passworts kann eine Liste von Kandidaten übergeben werden.
+        Im nicht-interaktiven Modus wird "ok" bei Erfolg und None bei Abbruch zurückgegeben.
+        """
+        if self.tracer:
+            self.tracer.zuruecksetzen()
+        self.fehler_schritt = self.fehler_klasse = None
+        # Jeder Durchlauf beginnt mit einem frischen FritzBox-Objekt (das vorige wurde am Ende geschlossen)
+        self.fritzbox = None
+        self.ensure_browser()
+        self.checkpoint = None
+        workflow_start = time.time()
+        workflow_ergebnis = "abgebrochen"
+
+        try:
+            graph = self.workflow_graph(password)
+            try:
+                if not graph.ausfuehren(self._graph_schritt_ausfuehren, ueberspringen=self._bereits_erledigt):
+                    return None
+            except RuntimeError as e:
+                if str(e) == "RESTART_NEW_BOX":
+                    workflow_ergebnis = "neue_box"
+                    return "restart"
+                else:
+                    raise
+            except Exception:
+                raise Exception
+
+            print(f"\n🎉 {self._prefix()}Workflow für diese FritzBox erfolgreich abgeschlossen!")
+            workflow_ergebnis = "ok"
+            if self.checkpoint:
+                self.checkpoint.abschliessen()
+            if not self.interaktiv:
+                return "ok"
             auswahl = input("\n(B)eenden oder (N)eue FritzBox bearbeiten? ").strip().lower()
             return None if auswahl == 'b' else "restart"
 
         except Exception as e:
-            print(f"\n❌ Schwerwiegender Fehler im Workflow: {e}")
+            print(f"\n❌ {self._prefix()}Schwerwiegender Fehler im Workflow: {e}")
+            if not self.interaktiv:
+                return None
             time.sleep(10)
             raise Exception
 
         finally:
-            if self.browser:
+            try:
+                self.protokoll.workflow(self._box_kontext(), workflow_start, time.time(), workflow_ergebnis)
+            except Exception:
+                pass
+            if self.tracer:
+                print(f"\n📊 {self._prefix()}WebDriver-Trace:\n{self.tracer.zusammenfassung()}")
+                if self.browser:
+                    WebDriverTracer.abhaengen(self.browser.driver)
+            if self.fritzbox:
+                try:
+                    self.fritzbox.schliessen()
+                except Exception:
+                    pass
+            if self.browser and self.browser_pool:
+                # Browser warm halten und für die nächste Box zurückgeben
+                self.browser_pool.zurueckgeben(self.browser)
+                self.browser = None
+            elif self.browser:
                 self.browser.quit()
\ No newline at end of file